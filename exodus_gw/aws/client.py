@@ -25,22 +25,37 @@ class S3ClientWrapper:
     Clients may be wrapped with additional config and event handlers.
     """
 
-    def __init__(self, profile: str):
+    def __init__(self, profile: str, max_connections: int = 10):
         """Prepare a client for the given profile. This object must be used
         via 'async with' in order to obtain access to the client.
 
+        max_connections is the size of the client's connection pool, which
+        limits how many requests the client can have in flight at once.
+
         Note: Session creation will fail if provided profile cannot be found.
         """
 
         session = aioboto_session(profile_name=profile)
 
-        self._client_context = session.client(
-            "s3",
-            endpoint_url=os.environ.get("EXODUS_GW_S3_ENDPOINT_URL") or None,
+        config = Config(
             # We don't allow any retries - it's not possible since we're streaming
             # request bodies directly to S3, we don't buffer it anywhere, so we
             # can't send it more than once.
-            config=Config(retries={"total_max_attempts": 1}),
+            retries={"total_max_attempts": 1},
+            max_pool_connections=max_connections,
+        )
+        if "request_checksum_calculation" in Config.OPTION_DEFAULTS:
+            # Newer botocore calculates checksums of request bodies by default,
+            # which requires reading the body before sending it and so is not
+            # possible with streamed bodies. We provide Content-MD5 instead.
+            config = config.merge(
+                Config(request_checksum_calculation="when_required")
+            )
+
+        self._client_context = session.client(
+            "s3",
+            endpoint_url=os.environ.get("EXODUS_GW_S3_ENDPOINT_URL") or None,
+            config=config,
         )
 
     async def __aenter__(self):
@@ -1,7 +1,9 @@
 import gzip
+import hashlib
 import json
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from itertools import islice
 from threading import Lock
 from typing import Any
@@ -340,3 +342,48 @@ class DynamoDB:
         # so that methods using the config are consistent with what
         # we've just written.
         self._definitions = config
+        # And make sure nothing in this process keeps serving the old config.
+        invalidate_cached_config(self.env)
+
+
+class CachedConfig:
+    """Config of an environment as loaded at some point in time."""
+
+    def __init__(self, config: dict[str, Any], expires: float):
+        self.config = config
+        self.expires = expires
+        digest = hashlib.sha256(
+            json.dumps(config, sort_keys=True, separators=(",", ":")).encode()
+        ).hexdigest()
+        self.etag = f'"{digest}"'
+
+
+_CONFIG_CACHE: dict[str, CachedConfig] = {}
+_CONFIG_CACHE_LOCK = Lock()
+
+
+def cached_config(env: str, settings: Settings) -> CachedConfig:
+    """Returns the current config of an environment.
+
+    Config is loaded from DynamoDB at most once per ``config_get_cache_ttl``
+    seconds, and is shared by everything in the current process.
+    """
+    ttl = min(settings.config_get_cache_ttl, settings.config_cache_ttl * 60)
+
+    # Loads happen under the lock so that concurrent requests for an expired
+    # config result in a single query.
+    with _CONFIG_CACHE_LOCK:
+        now = time.monotonic()
+        cached = _CONFIG_CACHE.get(env)
+        if cached is None or cached.expires <= now:
+            from_date = str(datetime.now(timezone.utc))
+            config = dict(DynamoDB(env, settings, from_date).definitions)
+            cached = CachedConfig(config, now + ttl)
+            if ttl > 0:
+                _CONFIG_CACHE[env] = cached
+        return cached
+
+
+def invalidate_cached_config(env: str):
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE.pop(env, None)
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from ..dramatiq.metrics import Histogram
+from .client import S3ClientWrapper
+
+LOG = logging.getLogger("exodus-gw")
+
+
+class S3ClientPool:
+    """A pool of S3 clients for a single AWS profile.
+
+    Each client is used by at most one request at a time. Clients are
+    created lazily, as demand requires, up to ``maxsize``; once that many
+    clients are in use, requests wait for a client to be released.
+
+    Clients left unused for longer than ``idle_timeout`` seconds are closed,
+    though at least ``minsize`` clients are kept. Clients which fail are
+    discarded rather than returned to the pool.
+
+    The time spent waiting to obtain a client is recorded.
+    """
+
+    def __init__(
+        self,
+        profile: str,
+        maxsize: int,
+        minsize: int = 0,
+        idle_timeout: float = 300,
+        max_connections: int = 10,
+    ):
+        self.profile = profile
+        self.maxsize = max(maxsize, 1)
+        self.minsize = min(minsize, self.maxsize)
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+
+        # Idle clients with the time they were last released, most recently
+        # used at the end.
+        self._idle: list[tuple[Any, float]] = []
+        # Number of clients which exist, whether idle or in use.
+        self._size = 0
+        self._waiting = 0
+        self._cond = asyncio.Condition()
+
+        self.created = 0
+        self.discarded = 0
+        self.wait = Histogram()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    async def __new_client(self):
+        client = await S3ClientWrapper(
+            profile=self.profile, max_connections=self.max_connections
+        ).__aenter__()
+        self.created += 1
+        LOG.debug(
+            "Created S3 client %s for profile %s (%s/%s)",
+            client,
+            self.profile,
+            self._size,
+            self.maxsize,
+            extra={"event": "deps"},
+        )
+        return client
+
+    async def __close(self, clients, exc_info=(None, None, None)):
+        for client in clients:
+            try:
+                await client.__aexit__(*exc_info)
+            except Exception:  # pylint: disable=broad-except
+                LOG.warning(
+                    "Error closing S3 client for profile %s",
+                    self.profile,
+                    exc_info=True,
+                    extra={"event": "deps"},
+                )
+
+    def __take_expired(self) -> list[Any]:
+        # Must be called with the lock held. Removes and returns those idle
+        # clients which should be closed.
+        cutoff = time.monotonic() - self.idle_timeout
+        out = []
+        while (
+            self._idle
+            and self._size > self.minsize
+            and self._idle[0][1] < cutoff
+        ):
+            out.append(self._idle.pop(0)[0])
+            self._size -= 1
+        return out
+
+    async def acquire(self):
+        """Obtain a client from the pool, creating it if needed and allowed.
+
+        The client must later be passed to :meth:`release`.
+        """
+        start = time.monotonic()
+        create = False
+
+        async with self._cond:
+            expired = self.__take_expired()
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        client = self._idle.pop()[0]
+                        break
+                    if self._size < self.maxsize:
+                        self._size += 1
+                        create = True
+                        break
+                    await self._cond.wait()
+            finally:
+                self._waiting -= 1
+
+        await self.__close(expired)
+
+        if create:
+            # Created outside of the lock, so that many clients can be
+            # created concurrently in response to a burst of requests.
+            try:
+                client = await self.__new_client()
+            except Exception:
+                async with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        self.wait.observe((time.monotonic() - start) * 1000)
+        return client
+
+    async def release(self, client, exc_info=None):
+        """Return a client to the pool.
+
+        If ``exc_info`` is provided, the client is assumed to be broken and
+        is closed rather than reused.
+        """
+        if exc_info:
+            await self.__close([client], exc_info)
+            self.discarded += 1
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            return
+
+        async with self._cond:
+            self._idle.append((client, time.monotonic()))
+            self._cond.notify()
+
+    async def warm(self, count: int):
+        """Ensure at least ``count`` clients exist, so that early requests
+        need not wait for clients to be created.
+        """
+        clients: list[Any] = []
+        try:
+            while len(clients) < count:
+                async with self._cond:
+                    if self._size >= min(count, self.maxsize):
+                        break
+                    self._size += 1
+                try:
+                    clients.append(await self.__new_client())
+                except Exception:
+                    async with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+        finally:
+            for client in clients:
+                await self.release(client)
+
+    async def close(self):
+        """Close all idle clients."""
+        async with self._cond:
+            clients = [client for (client, _) in self._idle]
+            self._size -= len(clients)
+            self._idle = []
+        await self.__close(clients)
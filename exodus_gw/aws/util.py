@@ -1,8 +1,11 @@
+import hashlib
 import io
 import logging
 import re
-from collections.abc import Iterable
-from typing import AnyStr
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import Any, AnyStr
 from xml.etree.ElementTree import Element, ElementTree, SubElement
 
 from defusedxml.ElementTree import fromstring
@@ -143,22 +146,267 @@ class RequestReader:
     This wrapper makes the request stream look like a file-like object so
     that boto will accept it (though note that actually *using it* as a file
     would raise an error).
+
+    If ``buffer_size`` is provided, small chunks of the request stream are
+    coalesced into chunks of at least that many bytes (except the last),
+    reducing the number of writes made when sending the content onwards.
+
+    If ``sha256`` is provided, the content is hashed as it is streamed,
+    continuing from the given hash state. The completed hash is passed
+    to ``on_digest``, if provided.
+
+    If ``expected_sha256`` is also provided, the final chunk of the content
+    is held back until the digest has been checked. If the digest doesn't
+    match, :class:`DigestMismatch` is raised before the content is fully
+    written, preventing S3 from completing the request.
     """
 
-    def __init__(self, request):
+    def __init__(
+        self,
+        request,
+        buffer_size: int = 0,
+        sha256=None,
+        expected_sha256: str | None = None,
+        on_digest: Callable[[Any], None] | None = None,
+    ):
         self._req = request
+        self._buffer_size = buffer_size
+        self._sha256 = sha256
+        self._expected_sha256 = expected_sha256
+        self._on_digest = on_digest
+        self.digest_mismatch = False
 
     def __aiter__(self):
+        if self._sha256 is not None:
+            return self._hashed_stream()
+        if self._buffer_size > 0:
+            return self._buffered_stream()
         return self._req.stream().__aiter__()
 
+    async def _buffered_stream(self):
+        if self._buffer_size <= 0:
+            async for chunk in self._req.stream():
+                yield chunk
+            return
+
+        # Chunks are collected and joined once enough have arrived, so
+        # each byte is copied only once. The joined chunk is a new object,
+        # so it's safe for the consumer to hold on to it.
+        chunks: list[bytes] = []
+        size = 0
+
+        async for chunk in self._req.stream():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self._buffer_size:
+                yield b"".join(chunks)
+                chunks = []
+                size = 0
+
+        if size:
+            yield b"".join(chunks)
+
+    async def _hashed_stream(self):
+        # Start from a copy of the given state each time, as the stream
+        # may be iterated more than once (e.g. if boto retries a request).
+        hasher = self._sha256.copy()
+        pending = None
+
+        async for chunk in self._buffered_stream():
+            hasher.update(chunk)
+            if pending:
+                yield pending
+            pending = chunk
+
+        digest = hasher.hexdigest()
+        if self._expected_sha256 and digest != self._expected_sha256:
+            self.digest_mismatch = True
+            raise DigestMismatch(
+                "Content has SHA256 %s, expected %s"
+                % (digest, self._expected_sha256)
+            )
+
+        if self._on_digest:
+            self._on_digest(hasher)
+
+        if pending:
+            yield pending
+
     def read(self, *_, **__):
         raise NotImplementedError()
 
     @classmethod
-    def get_reader(cls, request):
+    def get_reader(cls, request, **kwargs):
         # a helper to make tests easier to write.
         # tests can patch over this to effectively disable streaming.
-        return cls(request)
+        return cls(request, **kwargs)
+
+
+class DigestMismatch(Exception):
+    """Raised when streamed content does not match its expected checksum."""
+
+
+class UploadDigests:
+    """A bounded, in-process record of running SHA256 digests of multipart
+    uploads.
+
+    SHA256 digests of separate parts can't be combined, so the digest of an
+    object uploaded in parts can only be calculated by hashing each part in
+    order, continuing from the state left by the previous part. This class
+    tracks that state for uploads whose parts arrive in order. Any upload
+    whose parts arrive out of order or concurrently is marked as
+    unverifiable.
+
+    The least recently used uploads are forgotten once ``maxsize`` is reached.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        # upload ID => {"parts": <parts hashed>, "hasher": <hash state>,
+        #               "busy": <part in progress?>, "broken": <unverifiable?>}
+        self._uploads: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start_part(self, upload_id: str, part_number: int):
+        """Called when a part begins uploading.
+
+        Returns the hash state from which the part should continue, or None
+        if the upload can't be verified.
+        """
+        if self.maxsize <= 0:
+            return None
+
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                if part_number != 1:
+                    # Earlier parts were not seen by this process.
+                    return None
+                upload = {
+                    "parts": 0,
+                    "hasher": hashlib.sha256(),
+                    "busy": False,
+                    "broken": False,
+                }
+                self._uploads[upload_id] = upload
+                while len(self._uploads) > self.maxsize:
+                    self._uploads.popitem(last=False)
+
+            self._uploads.move_to_end(upload_id)
+
+            if (
+                upload["broken"]
+                or upload["busy"]
+                or part_number != upload["parts"] + 1
+            ):
+                upload["broken"] = True
+                return None
+
+            upload["busy"] = True
+            return upload["hasher"]
+
+    def end_part(self, upload_id: str, part_number: int, hasher=None):
+        """Called when a part has finished uploading, with the resulting hash
+        state if the part was uploaded successfully.
+        """
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None or upload["broken"]:
+                return
+
+            upload["busy"] = False
+            if hasher is not None:
+                upload["hasher"] = hasher
+                upload["parts"] = part_number
+
+    def pop(self, upload_id: str, part_count: int) -> str | None:
+        """Stop tracking an upload and return its digest, if it is known to
+        consist of exactly ``part_count`` parts.
+        """
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+
+        if (
+            upload is None
+            or upload["broken"]
+            or upload["busy"]
+            or upload["parts"] != part_count
+        ):
+            return None
+
+        return upload["hasher"].hexdigest()
+
+
+_UPLOAD_DIGESTS: dict[str, UploadDigests] = {}
+_UPLOAD_DIGESTS_LOCK = threading.Lock()
+
+
+def upload_digests(bucket: str, settings: Settings) -> UploadDigests:
+    """Returns the record of running digests of multipart uploads to a bucket.
+
+    The record is shared by everything in the current process using
+    the same bucket.
+    """
+    with _UPLOAD_DIGESTS_LOCK:
+        if bucket not in _UPLOAD_DIGESTS:
+            _UPLOAD_DIGESTS[bucket] = UploadDigests(
+                settings.upload_verify_max_uploads
+            )
+        return _UPLOAD_DIGESTS[bucket]
+
+
+class KnownObjects:
+    """A bounded, in-process record of object keys known to exist in a bucket.
+
+    Since objects are content-addressed and never deleted or modified by
+    exodus-gw, once an object is known to exist it's safe to assume that
+    it continues to exist. This can be used to skip redundant HEAD requests.
+
+    The least recently used keys are forgotten once ``maxsize`` is reached.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._keys: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str):
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._keys[key] = None
+            self._keys.move_to_end(key)
+            while len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+
+
+_KNOWN_OBJECTS: dict[str, KnownObjects] = {}
+_KNOWN_OBJECTS_LOCK = threading.Lock()
+
+
+def known_objects(bucket: str, settings: Settings) -> KnownObjects:
+    """Returns the record of object keys known to exist in a bucket.
+
+    The record is shared by everything in the current process using
+    the same bucket.
+    """
+    with _KNOWN_OBJECTS_LOCK:
+        if bucket not in _KNOWN_OBJECTS:
+            _KNOWN_OBJECTS[bucket] = KnownObjects(
+                settings.known_objects_max_keys
+            )
+        return _KNOWN_OBJECTS[bucket]
 
 
 def uri_alias(uri: str, aliases: list[tuple[str, str]]) -> list[str]:
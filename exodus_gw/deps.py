@@ -2,14 +2,14 @@
 
 import logging
 import sys
-from asyncio import LifoQueue
 from datetime import datetime, timedelta
 
+from botocore.exceptions import ClientError
 from fastapi import Depends, HTTPException, Path, Query, Request
 
 from .auth import call_context as get_call_context
 from .auth import caller_roles as get_caller_roles
-from .aws.client import S3ClientWrapper
+from .aws.pool import S3ClientPool
 from .settings import Environment, Settings, get_environment
 
 LOG = logging.getLogger("exodus-gw")
@@ -39,19 +39,23 @@ async def get_environment_from_path(
     return get_environment(env, settings)
 
 
-async def queue_for_profile(profile: str, maxsize: int):
-    # Create a queue of duplicate s3 clients for the given AWS profile.
-    # Client duplication is a procautionary measure against potential
-    # overwriting at runtime.
-
-    # mypy and pylint have trouble agreeing on how to handle LifoQueue type...
-    queue = LifoQueue(maxsize=maxsize)  # type: ignore
-
-    while not queue.full():
-        client = await S3ClientWrapper(profile=profile).__aenter__()
-        queue.put_nowait(client)
+def s3_pool_for_profile(app, profile: str, settings: Settings) -> S3ClientPool:
+    # Get the pool of s3 clients for the given AWS profile, creating it
+    # if needed.
+    pools = app.state.s3_pools
+
+    if profile not in pools:
+        pools[profile] = S3ClientPool(
+            profile,
+            maxsize=settings.s3_pool_size,
+            minsize=settings.s3_pool_warm_size,
+            idle_timeout=settings.s3_pool_idle_timeout,
+            # A single request may use a client for this many concurrent
+            # S3 requests, so it needs as many connections.
+            max_connections=settings.upload_exists_concurrency,
+        )
 
-    return queue
+    return pools[profile]
 
 
 async def get_s3_client(
@@ -59,34 +63,31 @@ async def get_s3_client(
     env: Environment = Depends(get_environment_from_path),
     settings: Settings = Depends(get_settings),
 ):
-    # Produce an active s3 client from the queue for the given environment.
-
-    profile = env.aws_profile
-    queue_size = settings.s3_pool_size
-    queues = request.app.state.s3_queues
+    # Produce an active s3 client from the pool for the given environment.
 
-    if profile not in queues:
-        queues[profile] = await queue_for_profile(profile, queue_size)
+    pool = s3_pool_for_profile(request.app, env.aws_profile, settings)
+    client = await pool.acquire()
 
-    queue = queues[profile]
-    client = await queue.get()
+    LOG.debug(
+        "Request %s using S3 client %s",
+        request.scope.get("path"),
+        client,
+        extra={"event": "deps"},
+    )
 
     try:
-        LOG.debug(
-            "Request %s using S3 client %s",
-            request.scope.get("path"),
-            client,
-            extra={"event": "deps"},
-        )
         yield client
+    except (ClientError, HTTPException):
+        # The client worked, though the request did not succeed.
+        await pool.release(client)
+        raise
     except Exception:
-        # When an exception is raised, assume the client broke.
-        # Close the client and replace it before raising.
-        await client.__aexit__(*sys.exc_info())
-        client = await S3ClientWrapper(profile=profile).__aenter__()
+        # Otherwise, assume the client broke. It'll be closed rather than
+        # reused.
+        await pool.release(client, sys.exc_info())
         raise
-    finally:
-        await queue.put(client)
+    else:
+        await pool.release(client)
 
 
 async def get_deadline_from_query(
@@ -7,15 +7,18 @@ from threading import Event
 import dramatiq
 from dramatiq.common import current_millis, dq_name
 from dramatiq.middleware import CurrentMessage
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from exodus_gw.database import db_engine
 from exodus_gw.dramatiq.consumer import Consumer
+from exodus_gw.dramatiq.metrics import Metrics
 from exodus_gw.dramatiq.middleware import (
     CorrelationIdMiddleware,
     DatabaseReadyMiddleware,
     LocalNotifyMiddleware,
     LogActorMiddleware,
+    MetricsMiddleware,
     PostgresNotifyMiddleware,
     SchedulerMiddleware,
     SettingsMiddleware,
@@ -38,6 +41,7 @@ class Broker(dramatiq.Broker):  # pylint: disable=abstract-method
         self.__shared_session = ContextVar("shared_session")
         self.__broker_id = uuid.uuid4()
         self.__queue_events = defaultdict(Event)
+        self.__metrics = Metrics()
 
         loggers_init(self.__settings)
 
@@ -65,6 +69,9 @@ class Broker(dramatiq.Broker):  # pylint: disable=abstract-method
 
         self.add_middleware(LocalNotifyMiddleware())
 
+        # Record timing of actors, published by consumers for monitoring.
+        self.add_middleware(MetricsMiddleware(self.__metrics))
+
         # Enable Database readycheck when booting up a worker.
         self.add_middleware(DatabaseReadyMiddleware(get_db_engine))
 
@@ -99,16 +106,22 @@ class Broker(dramatiq.Broker):  # pylint: disable=abstract-method
     def session(self):
         return self.__shared_session.get(None)
 
-    def notify(self):
-        """Notify all consumers that something might have changed.
+    def notify(self, queue_name: str | None = None):
+        """Notify consumers that something might have changed.
 
         Consumers are called in a loop and they will sleep between iterations.
-        Calling this method will wake any sleeping consumers so that new messages
+        Calling this method will wake sleeping consumers so that new messages
         can be found earlier.
+
+        If ``queue_name`` is provided, only consumers of that queue are
+        notified; otherwise, consumers of all queues are notified.
         """
-        queues = self.get_declared_queues().union(
-            self.get_declared_delay_queues()
-        )
+        if queue_name is not None:
+            queues = {queue_name}
+        else:
+            queues = self.get_declared_queues().union(
+                self.get_declared_delay_queues()
+            )
         for queue_name in queues:
             self.__queue_events[queue_name].set()
 
@@ -132,6 +145,17 @@ class Broker(dramatiq.Broker):  # pylint: disable=abstract-method
         # to let all of them do this.
         master = queue_name == list(self.queues.keys())[0]
 
+        # Each pending message may be processed by a worker thread, so
+        # limiting the consumer's prefetch also limits concurrency.
+        # Delay queues are exempt since their messages are never processed
+        # directly.
+        limit = self.__settings.worker_queue_concurrency.get(queue_name)
+        if limit is not None and limit < prefetch:
+            LOG.info(
+                "Limiting concurrency of queue %s to %s", queue_name, limit
+            )
+            prefetch = limit
+
         return Consumer(
             queue_name,
             db_engine=self.__db_engine,
@@ -139,20 +163,24 @@ class Broker(dramatiq.Broker):  # pylint: disable=abstract-method
             prefetch=prefetch,
             master=master,
             queue_event=self.__queue_events[queue_name],
+            notify=self.notify,
+            metrics=self.__metrics,
             settings=self.__settings,
         )
 
-    def enqueue_using_session(self, db, message, delay=None):
-        # Given a dramatiq message, saves it to the queue in the DB.
+    def __message_row(self, message, delay):
+        # Given a dramatiq message, returns the values for its row in the DB.
         queue_name = message.queue_name
+        eta = None
+        enqueued = current_millis()
 
         if delay is not None:
             queue_name = dq_name(queue_name)
-            message.options["eta"] = current_millis() + delay
+            eta = enqueued + delay
+            message.options["eta"] = eta
 
-        db_message = DramatiqMessage(
-            id=message.message_id, actor=message.actor_name, queue=queue_name
-        )
+            # Delayed messages are not considered to be waiting until due.
+            enqueued = eta
 
         message_dict = message.asdict()
 
@@ -161,15 +189,90 @@ class Broker(dramatiq.Broker):  # pylint: disable=abstract-method
         del message_dict["queue_name"]
         del message_dict["actor_name"]
 
-        db_message.body = message_dict
+        return dict(
+            id=message.message_id,
+            actor=message.actor_name,
+            queue=queue_name,
+            eta=eta,
+            enqueued=enqueued,
+            body=message_dict,
+            consumer_id=None,
+        )
+
+    def enqueue_using_session(self, db, message, delay=None):
+        # Given a dramatiq message, saves it to the queue in the DB.
+        db_message = DramatiqMessage(**self.__message_row(message, delay))
 
         # Use merge rather than add since the message may already exist;
         # for instance this happens in case of retry.
-        db_message = db.merge(db_message)
+        #
+        # Note the consumer is explicitly wiped out in that case, since if
+        # we've updated an existing message it'll have to be consumed again.
+        db.merge(db_message)
+
+    def enqueue_many_using_session(self, db, messages, delay=None):
+        # Given any number of dramatiq messages, saves them to the queue in
+        # the DB using a single statement.
+        statement = insert(DramatiqMessage).values(
+            [self.__message_row(message, delay) for message in messages]
+        )
+
+        # As with enqueue_using_session, messages may already exist and
+        # should be fully replaced if so. This includes wiping out the
+        # consumer, since an updated message will have to be consumed again.
+        statement = statement.on_conflict_do_update(
+            index_elements=["id"],
+            set_={c.name: c for c in statement.excluded if not c.primary_key},
+        )
+
+        db.execute(statement)
+
+    def __emit_after_enqueue_many(self, messages, delay):
+        # Middleware may implement 'after_enqueue_many' to handle a batch of
+        # messages at once (e.g. to notify consumers only once). For any
+        # other middleware, 'after_enqueue' is invoked per message as usual.
+        for middleware in reversed(self.middleware):
+            try:
+                if hook := getattr(middleware, "after_enqueue_many", None):
+                    hook(self, messages, delay)
+                else:
+                    for message in messages:
+                        middleware.after_enqueue(self, message, delay)
+            except Exception:  # pylint: disable=broad-except
+                LOG.critical(
+                    "Unexpected failure in after_enqueue of %r.",
+                    middleware,
+                    exc_info=True,
+                )
+
+    def enqueue_many(self, messages, *, delay=None):
+        """Enqueue any number of messages in a single round trip to the DB.
+
+        This behaves the same as calling :meth:`enqueue` for each message,
+        but is considerably more efficient when enqueuing many messages at
+        once.
+        """
+        messages = list(messages)
+        if not messages:
+            return messages
+
+        for message in messages:
+            self.emit_before("enqueue", message, delay)
+
+        if db := self.session:
+            self.enqueue_many_using_session(db, messages, delay)
+            self.__emit_after_enqueue_many(messages, delay)
+            return messages
+
+        db = Session(bind=self.__db_engine)
+        try:
+            self.enqueue_many_using_session(db, messages, delay)
+            db.commit()
+            self.__emit_after_enqueue_many(messages, delay)
+        finally:
+            db.close()
 
-        # Explicitly wipe out the consumer, since if we've updated an existing
-        # message it'll have to be consumed again.
-        db_message.consumer_id = None
+        return messages
 
     def enqueue(self, message, *, delay=None):
         self.emit_before("enqueue", message, delay)
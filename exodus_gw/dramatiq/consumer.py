@@ -1,11 +1,15 @@
 import logging
+import threading
 import time
 import uuid
+from collections import deque
 from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 import dramatiq
 from dramatiq import Message, MessageProxy
+from dramatiq.common import current_millis, q_name
+from sqlalchemy import func, select, text, update
 from sqlalchemy.orm import Session
 
 from exodus_gw.models import DramatiqConsumer, DramatiqMessage, Task
@@ -15,9 +19,25 @@ from exodus_gw.settings import Settings
 LOG = logging.getLogger("exodus-gw")
 
 
+class DbMessageProxy(MessageProxy):
+    """A message consumed from the DB.
+
+    In addition to the message itself, this holds the time (in
+    milliseconds) since which the message has been waiting in the queue.
+    """
+
+    def __init__(self, message, enqueued):
+        super().__init__(message)
+        self.enqueued = enqueued
+
+
 class Consumer(dramatiq.Consumer):
     """Consumer which keeps track of messages in a table using
     sqlalchemy.
+
+    A consumer of a delay queue never hands out any messages. Instead, it
+    acts as a scheduler, moving messages over to the corresponding ready
+    queue once they become due.
     """
 
     def __init__(
@@ -28,9 +48,15 @@ class Consumer(dramatiq.Consumer):
         consumer_id=None,
         prefetch=1,
         master=False,
+        notify=None,
+        metrics=None,
         settings=None,
     ):
         self.__queue_name = queue_name
+        self.__ready_queue_name = q_name(queue_name)
+        self.__is_delay_queue = queue_name != self.__ready_queue_name
+        self.__notify = notify or (lambda _queue_name: None)
+        self.__metrics = metrics
         self.__db_engine = db_engine
         self.__consumer_id = consumer_id or uuid.uuid4()
         self.__prefetch = prefetch
@@ -41,6 +67,22 @@ class Consumer(dramatiq.Consumer):
         self.__last_consume = 0
         self.__started = False
 
+        # Longest time (in milliseconds) any message claimed since the last
+        # heartbeat had been waiting in the queue.
+        self.__max_wait = 0
+
+        # For delay queues: earliest known eta (in milliseconds) of any
+        # message not yet moved to the ready queue.
+        self.__next_eta: int | None = None
+
+        # Messages claimed from the DB but not yet handed out.
+        self.__claimed: deque[DbMessageProxy] = deque()
+
+        # IDs of messages claimed from the DB and not yet acked/nacked.
+        # Accessed both from the consumer thread and worker threads.
+        self.__pending_ids: set[str] = set()
+        self.__pending_lock = threading.Lock()
+
     # Helper for scoped session.
     # Note: this can be refactored with sqlalchemy >= 14 which supports
     # 'with' statements natively.
@@ -79,11 +121,46 @@ class Consumer(dramatiq.Consumer):
                 # can be picked up again.
                 self.__reset_lost_messages(db)
 
+            if not self.__is_delay_queue:
+                self.__report_queue(db)
+
+                # Publish metrics on actors we've processed.
+                if self.__metrics:
+                    db_consumer.metrics = self.__metrics.snapshot(
+                        self.__queue_name
+                    )
+
             # Commit these changes
             db.commit()
 
             self.__last_heartbeat = time.monotonic()
 
+    def __report_queue(self, db):
+        # Log some stats on our queue, to help determine whether the
+        # queue is keeping up with the messages sent to it.
+        depth = db.scalar(
+            select(func.count(DramatiqMessage.id)).where(
+                DramatiqMessage.queue == self.__queue_name,
+                DramatiqMessage.consumer_id == None,
+            )
+        )
+        max_wait = self.__max_wait / 1000
+        self.__max_wait = 0
+
+        LOG.info(
+            "%s: queue %s has %s waiting message(s), max wait %.02f second(s)",
+            self.__consumer_id,
+            self.__queue_name,
+            depth,
+            max_wait,
+            extra={
+                "event": "queue",
+                "queue": self.__queue_name,
+                "depth": depth,
+                "max_wait": max_wait,
+            },
+        )
+
     def __reset_lost_messages(self, db):
         # Reset any messages belonging to nonexistent consumers so that they
         # can be picked up again by an alive consumer.
@@ -130,49 +207,106 @@ class Consumer(dramatiq.Consumer):
 
         return self
 
-    def __consume_one(self, db):
-        # First check if we're still allowed to fetch more.
-        have_count = (
-            db.query(DramatiqMessage)
-            .filter(DramatiqMessage.consumer_id == self.__consumer_id)
-            .count()
-        )
-        if have_count >= self.__prefetch:
+    def __claim(self, db):
+        # Claim as many messages as we're allowed to, in a single statement.
+        with self.__pending_lock:
+            want = self.__prefetch - len(self.__pending_ids)
+
+        if want <= 0:
             LOG.debug(
                 "Too many pending messages (%s), not consuming more",
-                have_count,
+                self.__prefetch - want,
             )
-            return
+            return []
 
-        # Take any message in the queue not yet assigned to a consumer.
-        db_message = (
-            db.query(DramatiqMessage)
-            .with_for_update()
-            .filter(DramatiqMessage.consumer_id == None)
-            .filter(DramatiqMessage.queue == self.__queue_name)
-            .first()
+        # Take any messages in the queue not yet assigned to a consumer.
+        #
+        # SKIP LOCKED means that messages being claimed concurrently by other
+        # consumers are passed over rather than waited for, so consumers
+        # don't serialize on the same rows.
+        claimable = (
+            select(DramatiqMessage.id)
+            .where(
+                DramatiqMessage.consumer_id == None,
+                DramatiqMessage.queue == self.__queue_name,
+            )
+            .limit(want)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(DramatiqMessage)
+            .where(
+                DramatiqMessage.id.in_(claimable),
+                DramatiqMessage.consumer_id == None,
+            )
+            .values(consumer_id=self.__consumer_id)
+            .returning(
+                DramatiqMessage.id,
+                DramatiqMessage.queue,
+                DramatiqMessage.actor,
+                DramatiqMessage.body,
+                DramatiqMessage.enqueued,
+            )
+            .execution_options(synchronize_session=False)
         )
 
-        if db_message:
-            LOG.info("%s: consumed %s", self.__consumer_id, db_message.id)
+        out = []
+        now = current_millis()
+        for message_id, queue, actor, body, enqueued in db.execute(statement):
+            LOG.info("%s: consumed %s", self.__consumer_id, message_id)
+
+            # A message has been waiting since it was sent, or since it
+            # became due if it was delayed. The time is normally recorded
+            # by the broker, but may be missing on older messages.
+            options = body.get("options") or {}
+            if not enqueued:
+                enqueued = max(
+                    body.get("message_timestamp") or now,
+                    options.get("eta") or 0,
+                )
+            self.__max_wait = max(self.__max_wait, now - enqueued)
+
+            # A message which was delayed still has its eta in the body, but
+            # it's due by the time it reaches this queue. Drop the eta so
+            # that dramatiq doesn't try to delay it again.
+            if "eta" in options:
+                body = {
+                    **body,
+                    "options": {
+                        k: v
+                        for (k, v) in body["options"].items()
+                        if k != "eta"
+                    },
+                }
 
-            body = db_message.body
-            out = Message(
-                queue_name=db_message.queue,
-                actor_name=db_message.actor,
-                message_id=db_message.id,
-                **body,
+            out.append(
+                DbMessageProxy(
+                    Message(
+                        queue_name=queue,
+                        actor_name=actor,
+                        message_id=message_id,
+                        **body,
+                    ),
+                    enqueued=enqueued,
+                )
             )
 
-            # Mark it as ours.
-            db_message.consumer_id = self.__consumer_id
+        if not out:
+            LOG.debug("%s: did not find any messages", self.__consumer_id)
 
-            return MessageProxy(out)
+        return out
 
-        LOG.debug("%s: did not find any messages", self.__consumer_id)
+    def __release(self, message_id):
+        # Called when we're done with a message.
+        with self.__pending_lock:
+            self.__pending_ids.discard(message_id)
 
     def __try_consume(self):
-        # Consume one message if enough time has passed since the last one.
+        # Return any message claimed earlier.
+        if self.__claimed:
+            return self.__claimed.popleft()
+
+        # Claim more messages if enough time has passed since the last time.
         now = time.monotonic()
         if (
             now - self.__last_consume
@@ -184,30 +318,104 @@ class Consumer(dramatiq.Consumer):
         self.__last_consume = now
 
         with self.__db_session() as db:
-            message = self.__consume_one(db)
-            if message:
+            messages = self.__claim(db)
+            if messages:
                 db.commit()
-                return message
+                with self.__pending_lock:
+                    self.__pending_ids.update(m.message_id for m in messages)
+                self.__claimed.extend(messages)
+                return self.__claimed.popleft()
 
         # Event is only cleared if we didn't find anything, because if
         # we *did* find something then it's appropriate to recheck again ASAP
         # since there could be more messages.
         self.__queue_event.clear()
 
+    def __schedule(self):
+        # Move any due messages from the delay queue to the ready queue.
+        #
+        # This is done regularly, when notified of a newly delayed message,
+        # or as soon as the earliest known message becomes due.
+        now = time.monotonic()
+        now_millis = current_millis()
+        if (
+            now - self.__last_consume
+            < self.__settings.worker_keepalive_interval
+            and not self.__queue_event.is_set()
+            and (self.__next_eta is None or self.__next_eta > now_millis)
+        ):
+            return
+
+        self.__last_consume = now
+
+        # Cleared before querying so that a message delayed while we're
+        # busy here will cause us to look again.
+        self.__queue_event.clear()
+
+        with self.__db_session() as db:
+            moved = db.execute(
+                update(DramatiqMessage)
+                .where(
+                    DramatiqMessage.queue == self.__queue_name,
+                    DramatiqMessage.eta <= now_millis,
+                )
+                .values(
+                    queue=self.__ready_queue_name, eta=None, consumer_id=None
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+            self.__next_eta = db.scalar(
+                select(func.min(DramatiqMessage.eta)).where(
+                    DramatiqMessage.queue == self.__queue_name
+                )
+            )
+
+            if moved and db.get_bind().dialect.name == "postgresql":
+                # Wake up consumers of the ready queue in other processes.
+                db.execute(
+                    text("SELECT pg_notify('dramatiq', :queue)"),
+                    {"queue": self.__ready_queue_name},
+                )
+
+            db.commit()
+
+        if moved:
+            LOG.info(
+                "%s: moved %s due message(s) to %s",
+                self.__consumer_id,
+                moved,
+                self.__ready_queue_name,
+            )
+            self.__notify(self.__ready_queue_name)
+
     def __next__(self):
         # dramatiq calls this method repeatedly to get messages.
 
         # let everyone know we're still alive
         self.__heartbeat()
 
+        if self.__is_delay_queue:
+            # Delayed messages are never handed out to the worker; they
+            # only become available once moved to the ready queue.
+            self.__schedule()
+
         # get a message if we can
-        if out := self.__try_consume():
+        elif out := self.__try_consume():
             return out
 
-        # Nothing to consume, wait a second, or possibly less if we're notified.
-        self.__queue_event.wait(1.0)
+        # Nothing to consume, wait a second, or possibly less if we're notified
+        # or a delayed message is about to become due.
+        timeout = 1.0
+        if self.__next_eta is not None:
+            timeout = min(
+                timeout, max(self.__next_eta - current_millis(), 0) / 1000
+            )
+        self.__queue_event.wait(timeout)
 
     def ack(self, message):
+        self.__release(message.message_id)
+
         if "eta" in message.options:
             # This is a delayed message - we should not do anything on ack
             # since it's not really executed yet. We will be called again
@@ -232,6 +440,8 @@ class Consumer(dramatiq.Consumer):
         #
         # We'll clean it up, and can't really do anything else except
         # mark any associated task as failed and log an error.
+        self.__release(message.message_id)
+
         with self.__db_session() as db:
             LOG.error(
                 "%s: message failed: %s\n%s",
@@ -277,6 +487,18 @@ class Consumer(dramatiq.Consumer):
         LOG.info("%s: closing", self.__consumer_id)
 
         with self.__db_session() as db:
+            # Give back any messages we claimed but never handed out, so
+            # another consumer can pick them up right away.
+            if unused_ids := [m.message_id for m in self.__claimed]:
+                db.query(DramatiqMessage).filter(
+                    DramatiqMessage.id.in_(unused_ids),
+                    DramatiqMessage.consumer_id == self.__consumer_id,
+                ).update(
+                    {DramatiqMessage.consumer_id: None},
+                    synchronize_session=False,
+                )
+                self.__claimed.clear()
+
             db.query(DramatiqConsumer).filter(
                 DramatiqConsumer.id == self.__consumer_id
             ).delete()
@@ -0,0 +1,121 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any
+
+# Upper bounds (in milliseconds) of histogram buckets.
+#
+# These are fixed so that histograms recorded by any number of workers
+# can be merged by simply adding up the counts per bucket.
+BUCKETS = (
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+    30000,
+    60000,
+    120000,
+    300000,
+    600000,
+    1800000,
+    3600000,
+)
+
+
+class Histogram:
+    """A lightweight histogram of durations, in milliseconds."""
+
+    def __init__(self, counts: list[int] | None = None):
+        # One count per bucket, plus one for values exceeding the last bucket.
+        self.counts = [0] * (len(BUCKETS) + 1)
+        for i, count in enumerate((counts or [])[: len(self.counts)]):
+            self.counts[i] = count
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+
+    def merge(self, other: "Histogram"):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+
+    def percentile(self, pct: float) -> int | None:
+        """Returns an estimate of the given percentile (0 - 100), as the
+        upper bound of the bucket in which it falls.
+
+        Returns None if nothing was observed.
+        """
+        total = self.count
+        if not total:
+            return None
+
+        target = total * pct / 100
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                break
+
+        # Values beyond the last bucket are reported as the last bucket.
+        return BUCKETS[min(i, len(BUCKETS) - 1)]
+
+
+class Metrics:
+    """Collects timing of actors processed within this process.
+
+    For each actor, this records how long messages waited before being
+    processed and how long processing took. Metrics are grouped by queue
+    so that each consumer can publish those relevant to its own queue.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__histograms: dict[str, dict[str, dict[str, Histogram]]] = (
+            defaultdict(dict)
+        )
+
+    def __observe(self, queue_name: str, actor_name: str, key: str, value):
+        with self.__lock:
+            actor = self.__histograms[queue_name].setdefault(
+                actor_name, {"wait": Histogram(), "run": Histogram()}
+            )
+            actor[key].observe(value)
+
+    def observe_wait(self, queue_name: str, actor_name: str, value_ms):
+        self.__observe(queue_name, actor_name, "wait", value_ms)
+
+    def observe_run(self, queue_name: str, actor_name: str, value_ms):
+        self.__observe(queue_name, actor_name, "run", value_ms)
+
+    def snapshot(self, queue_name: str) -> dict[str, Any]:
+        """Returns metrics for all actors on a queue, in a form suitable
+        for serialization, e.g.
+
+            {
+                "queue": "<queue>",
+                "actors": {
+                    "<actor>": {"wait": [<counts>...], "run": [<counts>...]}
+                }
+            }
+        """
+        with self.__lock:
+            actors = self.__histograms[queue_name]
+            return {
+                "queue": queue_name,
+                "actors": {
+                    actor_name: {
+                        key: list(histogram.counts)
+                        for (key, histogram) in histograms.items()
+                    }
+                    for (actor_name, histograms) in actors.items()
+                },
+            }
@@ -2,6 +2,7 @@ from .correlation_id import CorrelationIdMiddleware
 from .db_ready import DatabaseReadyMiddleware
 from .local_notify import LocalNotifyMiddleware
 from .log_actor import LogActorMiddleware
+from .metrics import MetricsMiddleware
 from .pg_notify import PostgresNotifyMiddleware
 from .scheduler import SchedulerMiddleware
 from .settings import SettingsMiddleware
@@ -14,4 +15,5 @@ __all__ = [
     "CorrelationIdMiddleware",
     "DatabaseReadyMiddleware",
     "SettingsMiddleware",
+    "MetricsMiddleware",
 ]
@@ -1,4 +1,5 @@
 from dramatiq import Middleware
+from dramatiq.common import dq_name
 
 
 class LocalNotifyMiddleware(Middleware):
@@ -8,13 +9,27 @@ class LocalNotifyMiddleware(Middleware):
     Note this only achieves local in-process notifies, so it's mainly useful
     in cases where enqueue and consume are happening in the same process,
     for example due to retry middleware or from within tests.
+
+    Only consumers of the affected queue are notified.
     """
 
     def after_ack(self, broker, message):
-        broker.notify()
+        # A consumer may have been waiting for its pending messages to be
+        # processed before it can consume more.
+        broker.notify(message.queue_name)
 
     def after_nack(self, broker, message):
-        broker.notify()
+        broker.notify(message.queue_name)
 
     def after_enqueue(self, broker, message, delay):
-        broker.notify()
+        queue_name = message.queue_name
+        if delay is not None:
+            queue_name = dq_name(queue_name)
+        broker.notify(queue_name)
+
+    def after_enqueue_many(self, broker, messages, delay):
+        queue_names = set(m.queue_name for m in messages)
+        if delay is not None:
+            queue_names = set(dq_name(q) for q in queue_names)
+        for queue_name in queue_names:
+            broker.notify(queue_name)
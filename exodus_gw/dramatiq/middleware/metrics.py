@@ -0,0 +1,37 @@
+import threading
+
+from dramatiq import Middleware
+from dramatiq.common import current_millis
+
+from exodus_gw.dramatiq.metrics import Metrics
+
+
+class MetricsMiddleware(Middleware):
+    """Middleware recording how long each message waited before being
+    processed, and how long processing took.
+    """
+
+    def __init__(self, metrics: Metrics):
+        self.__metrics = metrics
+        self.__local = threading.local()
+
+    def before_process_message(self, broker, message):
+        now = current_millis()
+        self.__local.start = now
+
+        # Set by our consumer; may be missing for messages from elsewhere.
+        if enqueued := getattr(message, "enqueued", None):
+            self.__metrics.observe_wait(
+                message.queue_name, message.actor_name, now - enqueued
+            )
+
+    def after_process_message(
+        self, broker, message, *, result=None, exception=None
+    ):
+        if start := getattr(self.__local, "start", None):
+            self.__metrics.observe_run(
+                message.queue_name,
+                message.actor_name,
+                current_millis() - start,
+            )
+            self.__local.start = None
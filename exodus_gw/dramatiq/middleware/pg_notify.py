@@ -5,6 +5,7 @@ from collections.abc import Callable
 
 import backoff
 from dramatiq import Middleware
+from dramatiq.common import dq_name
 from sqlalchemy import Engine, text
 
 LOG = logging.getLogger("exodus-gw")
@@ -12,7 +13,10 @@ LOG = logging.getLogger("exodus-gw")
 
 class PostgresNotifyMiddleware(Middleware):
     """Middleware using postgres LISTEN/NOTIFY to notify all connected consumers
-    on certain events.
+    whenever a message is enqueued.
+
+    Each notification carries the name of the queue to which a message was
+    enqueued, so that only consumers of that queue need to wake up.
     """
 
     def __init__(self, db_engine: Callable[[], Engine], interval=5.0):
@@ -39,20 +43,23 @@ class PostgresNotifyMiddleware(Middleware):
         )
         self.__listener_thread.start()
 
-    def do_pg_notify(self, broker):
+    def do_pg_notify(self, broker, queue_name: str):
         if not self.using_postgres:
             return
 
         # Do a NOTIFY either using the broker's current session, or our
         # own if needed.
         if broker.session:
-            return self.do_notify_with_db(broker.session)
+            return self.do_notify_with_db(broker.session, queue_name)
 
         with self.__db_engine().connect() as connection:
-            return self.do_notify_with_db(connection)
+            return self.do_notify_with_db(connection, queue_name)
 
-    def do_notify_with_db(self, db):
-        db.execute(text("NOTIFY dramatiq"))
+    def do_notify_with_db(self, db, queue_name: str):
+        db.execute(
+            text("SELECT pg_notify('dramatiq', :queue)"),
+            {"queue": queue_name},
+        )
 
     def before_worker_shutdown(self, broker, worker):
         # As worker shuts down we should shut down the listener thread.
@@ -60,14 +67,21 @@ class PostgresNotifyMiddleware(Middleware):
             self.__listener.running = False
             self.__listener_thread.join()
 
-    def after_ack(self, broker, message):
-        self.do_pg_notify(broker)
-
-    def after_nack(self, broker, message):
-        self.do_pg_notify(broker)
-
     def after_enqueue(self, broker, message, delay):
-        self.do_pg_notify(broker)
+        # Note there's no need to notify on ack or nack, since those don't
+        # make any new messages available for other consumers.
+        queue_name = message.queue_name
+        if delay is not None:
+            queue_name = dq_name(queue_name)
+        self.do_pg_notify(broker, queue_name)
+
+    def after_enqueue_many(self, broker, messages, delay):
+        # Notify once per affected queue rather than once per message.
+        queue_names = set(m.queue_name for m in messages)
+        if delay is not None:
+            queue_names = set(dq_name(q) for q in queue_names)
+        for queue_name in sorted(queue_names):
+            self.do_pg_notify(broker, queue_name)
 
 
 class Listener:
@@ -101,8 +115,16 @@ class Listener:
                 if readable:
                     # Got some notifications
                     c.poll()
-                    # There is no payload so just drop the notifications
+                    queue_names = set(n.payload for n in c.notifies)
                     c.notifies = []
 
-                    LOG.debug("PG listen notifying broker")
-                    self.broker.notify()
+                    if not queue_names or "" in queue_names:
+                        # Notification without any queue, e.g. from an older
+                        # version; wake up everything.
+                        LOG.debug("PG listen notifying broker")
+                        self.broker.notify()
+                        continue
+
+                    for queue_name in sorted(queue_names):
+                        LOG.debug("PG listen notifying broker: %s", queue_name)
+                        self.broker.notify(queue_name)
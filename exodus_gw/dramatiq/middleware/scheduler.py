@@ -2,7 +2,7 @@ import functools
 import logging
 import uuid
 from collections.abc import Callable
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pycron
 from dramatiq import Middleware
@@ -15,6 +15,22 @@ from exodus_gw.settings import Settings
 
 LOG = logging.getLogger("exodus-gw")
 
+# How far ahead we'll look for the next time a cron rule fires.
+NEXT_FIRE_HORIZON = timedelta(days=366)
+
+
+def next_fire(cron_rule: str, after: datetime) -> datetime | None:
+    """Returns the first time (at minute precision) strictly after ``after``
+    at which ``cron_rule`` fires, or None if it won't fire within a year.
+    """
+    when = after.replace(second=0, microsecond=0)
+    end = after + NEXT_FIRE_HORIZON
+    while when < end:
+        when += timedelta(minutes=1)
+        if pycron.is_now(cron_rule, when):
+            return when
+    return None
+
 
 class SchedulerMiddleware(Middleware):
     """Middleware allowing for scheduled actors with cron-style rules."""
@@ -43,7 +59,8 @@ class SchedulerMiddleware(Middleware):
         #   if the cron rule has been hit since the last run
         #
         # - whenever the scheduled callable completes, it schedules itself again
-        #   after Settings.scheduler_interval
+        #   for the next time the cron rule will be hit (or, if that can't be
+        #   determined, after Settings.scheduler_interval)
         #
         # Note, scheduled callable doesn't do anything in particular with errors, so
         # those will be processed via the usual retry mechanism.
@@ -108,14 +125,25 @@ class SchedulerMiddleware(Middleware):
                     now,
                 )
 
-            # Call ourselves again soon.
+            # Call ourselves again next time the rule is hit.
             actor.send_with_options(
                 kwargs=dict(last_run=now.timestamp()),
-                delay=settings.scheduler_interval * 60 * 1000,
+                delay=self.__delay_until_next_fire(cron_rule, now),
             )
 
         actor.fn = new_fn
 
+    def __delay_until_next_fire(self, cron_rule: str, now: datetime) -> int:
+        # Returns the delay (in milliseconds) until the next time cron_rule
+        # is hit after 'now'.
+        when = next_fire(cron_rule, now)
+        if when is None:
+            # Rule doesn't fire any time soon. Keep checking in at the usual
+            # interval, in case settings change.
+            return self.__settings().scheduler_interval * 60 * 1000
+
+        return max(int((when - now).total_seconds() * 1000), 0)
+
     def before_declare_actor(self, broker, actor):
         if not actor.options.get("scheduled"):
             # nothing to do
@@ -123,27 +151,44 @@ class SchedulerMiddleware(Middleware):
 
         self.__wrap_with_schedule(broker, actor)
 
-    def __ensure_enqueued(self, broker, actor, *args, **kwargs):
-        msg = actor.message(*args, **kwargs)
+    def __ensure_enqueued(self, broker, actors):
+        settings = self.__settings()
 
-        # Use a fixed message ID for this actor; this ensures there's only one
-        # scheduler message in the system for this actor.
-        msg = msg.copy(message_id=actor.options["scheduled_message_id"])
+        # Scheduled actors will not run any earlier than this.
+        now = datetime.utcnow()
+        earliest = now + timedelta(minutes=settings.scheduler_delay)
 
         session = Session(bind=self.__db_engine())
         try:
             broker.set_session(session)
 
-            # Enqueue ourselves
-            broker.enqueue(msg, delay=Settings().scheduler_delay * 60 * 1000)
+            for actor in actors:
+                # Use a fixed message ID for this actor; this ensures there's
+                # only one scheduler message in the system for this actor.
+                msg = actor.message().copy(
+                    message_id=actor.options["scheduled_message_id"]
+                )
+
+                # Enqueue ourselves, for the first time the rule is hit.
+                cron_rule = getattr(settings, "cron_" + actor.actor_name)
+                delay = (earliest - now).total_seconds() * 1000
+                delay += self.__delay_until_next_fire(cron_rule, earliest)
+                broker.enqueue(msg, delay=int(delay))
+
+                LOG.info(
+                    "Scheduled actor %s will next run in %s",
+                    actor.actor_name,
+                    timedelta(milliseconds=delay),
+                )
 
-            # Clean any other messages to same actor & queue which are NOT this one
-            queues = [actor.queue_name, dq_name(actor.queue_name)]
-            session.query(DramatiqMessage).filter(
-                DramatiqMessage.actor == actor.actor_name,
-                DramatiqMessage.queue.in_(queues),
-                DramatiqMessage.id != msg.message_id,
-            ).delete(synchronize_session=False)
+                # Clean any other messages to same actor & queue which are NOT
+                # this one
+                queues = [actor.queue_name, dq_name(actor.queue_name)]
+                session.query(DramatiqMessage).filter(
+                    DramatiqMessage.actor == actor.actor_name,
+                    DramatiqMessage.queue.in_(queues),
+                    DramatiqMessage.id != msg.message_id,
+                ).delete(synchronize_session=False)
 
             # And commit
             session.commit()
@@ -152,7 +197,12 @@ class SchedulerMiddleware(Middleware):
             broker.set_session(None)
 
     def after_process_boot(self, broker):
-        for actor_name in broker.get_declared_actors():
-            actor = broker.get_actor(actor_name)
-            if actor.options.get("scheduled"):
-                self.__ensure_enqueued(broker, actor)
+        actors = [
+            broker.get_actor(actor_name)
+            for actor_name in broker.get_declared_actors()
+        ]
+        scheduled = [
+            actor for actor in actors if actor.options.get("scheduled")
+        ]
+        if scheduled:
+            self.__ensure_enqueued(broker, scheduled)
@@ -66,6 +66,9 @@ class JsonFormatter(logging.Formatter):
             "duration_ms": "duration_ms",
             "url": "url",
             "response": "response",
+            "queue": "queue",
+            "depth": "depth",
+            "max_wait": "max_wait",
         }
         self.datefmt = datefmt
 
@@ -37,6 +37,7 @@ of an operation.
 {ENVIRONMENTS}
 """
 
+import asyncio
 import logging
 import re
 from uuid import uuid4
@@ -58,6 +59,7 @@ from . import docs
 from .auth import log_login
 from .aws.util import xml_response
 from .database import db_engine
+from .deps import s3_pool_for_profile
 from .logging import loggers_init
 from .migrate import db_migrate
 from .routers import cdn, config, deploy, publish, service, upload
@@ -215,29 +217,49 @@ def settings_init() -> None:
     app.state.settings = load_settings()
 
 
-def s3_queues_init() -> None:
-    app.state.s3_queues = {}
+async def s3_pools_warm() -> None:
+    settings = app.state.settings
+    profiles = sorted(set(env.aws_profile for env in settings.environments))
 
+    for profile in profiles:
+        pool = s3_pool_for_profile(app, profile, settings)
+        try:
+            await pool.warm(settings.s3_pool_warm_size)
+        except Exception:  # pylint: disable=broad-except
+            # Not fatal; clients will be created on demand instead.
+            LOG.warning(
+                "Unable to create S3 clients for profile %s",
+                profile,
+                exc_info=True,
+            )
+
+
+def s3_pools_init() -> None:
+    app.state.s3_pools = {}
+    # Create clients in the background so that startup is not delayed.
+    app.state.s3_pools_warm = asyncio.ensure_future(s3_pools_warm())
+
+
+async def s3_pools_shutdown() -> None:
+    app.state.s3_pools_warm.cancel()
+    await asyncio.gather(app.state.s3_pools_warm, return_exceptions=True)
 
-async def s3_queues_shutdown() -> None:
-    for q in app.state.s3_queues.values():
-        while not q.empty():
-            client = q.get_nowait()
-            await client.__aexit__(None, None, None)
+    for pool in app.state.s3_pools.values():
+        await pool.close()
 
 
 @app.on_event("startup")
-def on_startup() -> None:
+async def on_startup() -> None:
     settings_init()
     loggers_init(app.state.settings)
     db_init()
-    s3_queues_init()
+    s3_pools_init()
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
     db_shutdown()
-    await s3_queues_shutdown()
+    await s3_pools_shutdown()
 
 
 def new_db_session(engine):
@@ -0,0 +1,38 @@
+"""Add autoindex_memos table
+
+Revision ID: 3e0a9c4b8d21
+Revises: 979ec567eb91
+Create Date: 2026-10-18 09:12:40.511208
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "3e0a9c4b8d21"
+down_revision = "979ec567eb91"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "autoindex_memos",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("env", sa.String(), nullable=False),
+        sa.Column("base_uri", sa.String(), nullable=False),
+        sa.Column("entry_point_key", sa.String(), nullable=False),
+        sa.Column(
+            "items", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+        ),
+        sa.Column("updated", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "env", "base_uri", name="autoindex_memos_env_base_uri_key"
+        ),
+    )
+
+
+def downgrade():
+    op.drop_table("autoindex_memos")
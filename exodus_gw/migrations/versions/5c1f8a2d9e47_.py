@@ -0,0 +1,43 @@
+"""Add cdn_flush_requests table
+
+Revision ID: 5c1f8a2d9e47
+Revises: b7d2e51f0c9a
+Create Date: 2026-10-18 14:21:05.118342
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "5c1f8a2d9e47"
+down_revision = "b7d2e51f0c9a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cdn_flush_requests",
+        sa.Column("id", sa.Uuid(as_uuid=False), nullable=False),
+        sa.Column("env", sa.String(), nullable=False),
+        sa.Column(
+            "paths", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+        ),
+        sa.Column("task_id", sa.Uuid(as_uuid=False), nullable=True),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "cdn_flush_requests_env_idx",
+        "cdn_flush_requests",
+        ["env"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "cdn_flush_requests_env_idx", table_name="cdn_flush_requests"
+    )
+    op.drop_table("cdn_flush_requests")
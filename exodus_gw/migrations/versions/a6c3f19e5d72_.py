@@ -0,0 +1,58 @@
+"""Add eta column to dramatiq_messages
+
+Revision ID: a6c3f19e5d72
+Revises: e2a94c7d3b18
+Create Date: 2026-10-18 17:25:51.318904
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "a6c3f19e5d72"
+down_revision = "e2a94c7d3b18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "dramatiq_messages", sa.Column("eta", sa.BigInteger(), nullable=True)
+    )
+    op.create_index(
+        "dramatiq_messages_queue_eta_idx",
+        "dramatiq_messages",
+        ["queue", "eta"],
+        unique=False,
+    )
+
+    # Any delayed messages already queued only have their eta within
+    # the message body; copy it over to the new column.
+    messages = sa.table(
+        "dramatiq_messages",
+        sa.column("id", sa.String),
+        sa.column("queue", sa.String),
+        sa.column("body", postgresql.JSONB),
+        sa.column("eta", sa.BigInteger),
+    )
+    conn = op.get_bind()
+    delayed = conn.execute(
+        sa.select(messages.c.id, messages.c.body).where(
+            messages.c.queue.like("%.DQ")
+        )
+    ).all()
+    for message_id, body in delayed:
+        eta = (body.get("options") or {}).get("eta") or 0
+        conn.execute(
+            sa.update(messages)
+            .where(messages.c.id == message_id)
+            .values(eta=eta)
+        )
+
+
+def downgrade():
+    op.drop_index(
+        "dramatiq_messages_queue_eta_idx", table_name="dramatiq_messages"
+    )
+    op.drop_column("dramatiq_messages", "eta")
@@ -0,0 +1,33 @@
+"""Add index on items basename
+
+Revision ID: b7d2e51f0c9a
+Revises: 3e0a9c4b8d21
+Create Date: 2026-10-18 11:03:27.904215
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7d2e51f0c9a"
+down_revision = "3e0a9c4b8d21"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Must match models.publish.web_uri_basename.
+    op.create_index(
+        "items_publish_id_basename_idx",
+        "items",
+        [
+            "publish_id",
+            sa.text(
+                "replace(web_uri, rtrim(web_uri, replace(web_uri, '/', '')), '')"
+            ),
+        ],
+    )
+
+
+def downgrade():
+    op.drop_index("items_publish_id_basename_idx", table_name="items")
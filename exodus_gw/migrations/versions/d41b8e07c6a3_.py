@@ -0,0 +1,34 @@
+"""Add columns for worker metrics
+
+Revision ID: d41b8e07c6a3
+Revises: a6c3f19e5d72
+Create Date: 2026-10-18 19:02:44.170395
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "d41b8e07c6a3"
+down_revision = "a6c3f19e5d72"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "dramatiq_messages",
+        sa.Column("enqueued", sa.BigInteger(), nullable=True),
+    )
+    op.add_column(
+        "dramatiq_consumers",
+        sa.Column(
+            "metrics", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column("dramatiq_consumers", "metrics")
+    op.drop_column("dramatiq_messages", "enqueued")
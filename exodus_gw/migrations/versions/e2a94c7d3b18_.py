@@ -0,0 +1,30 @@
+"""Add prefix index on published_paths
+
+Revision ID: e2a94c7d3b18
+Revises: 5c1f8a2d9e47
+Create Date: 2026-10-18 15:40:12.604117
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e2a94c7d3b18"
+down_revision = "5c1f8a2d9e47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "published_paths_env_web_uri_prefix_idx",
+        "published_paths",
+        ["env", "web_uri"],
+        unique=False,
+        postgresql_ops={"web_uri": "text_pattern_ops"},
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "published_paths_env_web_uri_prefix_idx", table_name="published_paths"
+    )
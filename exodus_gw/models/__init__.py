@@ -1,12 +1,15 @@
 from . import sqlite_compat  # noqa
+from .autoindex import AutoindexMemo
 from .base import Base
 from .dramatiq import DramatiqConsumer, DramatiqMessage
-from .path import PublishedPath
+from .path import CdnFlushRequest, PublishedPath
 from .publish import Item, Publish
 from .service import CommitModes, CommitTask, Task
 
 __all__ = [
+    "AutoindexMemo",
     "Base",
+    "CdnFlushRequest",
     "DramatiqConsumer",
     "DramatiqMessage",
     "Item",
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+# Avoid pylint complaining about:
+# E1136: Value 'Mapped' is unsubscriptable
+# pylint: disable=unsubscriptable-object
+
+
+class AutoindexMemo(Base):
+    """Remembers the index items most recently generated for a repository.
+
+    Autoindex output is fully determined by the content of a repository's
+    entry points (repomd.xml, PULP_MANIFEST, etc). If a later publish
+    contains the same entry points, the index items recorded here can be
+    reused without fetching or parsing any repository metadata.
+    """
+
+    __tablename__ = "autoindex_memos"
+    __table_args__ = (
+        UniqueConstraint(
+            "env", "base_uri", name="autoindex_memos_env_base_uri_key"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+
+    env: Mapped[str] = mapped_column(String)
+    """Env on which the index was generated (e.g. 'pre', 'live')"""
+
+    base_uri: Mapped[str] = mapped_column(String)
+    """Base URI of an indexed repository, e.g. /content/dist/some/repo"""
+
+    entry_point_key: Mapped[str] = mapped_column(String)
+    """A key identifying the entry points from which the index was generated.
+
+    This is derived from the object_key of each entry point found under
+    ``base_uri`` at the time of generation.
+    """
+
+    items: Mapped[list[dict[str, Any]]] = mapped_column(JSONB)
+    """The generated index items, as a list of dicts with 'web_uri'
+    and 'object_key'.
+    """
+
+    updated: Mapped[datetime] = mapped_column(DateTime)
+    """Last time this memo was generated or reused."""
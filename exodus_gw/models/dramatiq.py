@@ -1,7 +1,7 @@
 import datetime
 from typing import Any
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import BigInteger, DateTime, Index, String
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import Uuid
@@ -19,6 +19,9 @@ class DramatiqMessage(Base):
     # Messages are deleted from the queue once successfully processed.
 
     __tablename__ = "dramatiq_messages"
+    __table_args__ = (
+        Index("dramatiq_messages_queue_eta_idx", "queue", "eta"),
+    )
 
     # ID of message
     id: Mapped[str] = mapped_column(
@@ -47,6 +50,16 @@ class DramatiqMessage(Base):
     # Full message body.
     body: Mapped[dict[str, Any]] = mapped_column(JSONB)
 
+    # For delayed messages, the time (in milliseconds since epoch) at which
+    # the message becomes due. Null for messages which can be consumed
+    # immediately.
+    eta: Mapped[int | None] = mapped_column(BigInteger)
+
+    # Time (in milliseconds since epoch) at which the message became ready
+    # to be consumed, i.e. when it was enqueued, or when it was moved to its
+    # ready queue if delayed.
+    enqueued: Mapped[int | None] = mapped_column(BigInteger)
+
 
 class DramatiqConsumer(Base):
     # This table holds one record for each live consumer.
@@ -64,3 +77,7 @@ class DramatiqConsumer(Base):
 
     # Last time this consumer reported itself to be alive.
     last_alive: Mapped[datetime.datetime] = mapped_column(DateTime)
+
+    # Metrics on actors processed by this consumer, as recorded by
+    # exodus_gw.dramatiq.metrics.Metrics.
+    metrics: Mapped[dict[str, Any] | None] = mapped_column(JSONB)
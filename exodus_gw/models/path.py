@@ -1,10 +1,16 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String, UniqueConstraint
+from sqlalchemy import DateTime, Index, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import Uuid
 
 from .base import Base
 
+# Avoid pylint complaining about:
+# E1136: Value 'Mapped' is unsubscriptable
+# pylint: disable=unsubscriptable-object
+
 
 class PublishedPath(Base):
     """Represents a path updated on the CDN at some point.
@@ -20,6 +26,15 @@ class PublishedPath(Base):
         UniqueConstraint(
             "env", "web_uri", name="published_paths_env_web_uri_key"
         ),
+        # Supports prefix matching on web_uri (e.g. LIKE '/some/dir/%'),
+        # which the unique constraint's index can't be used for unless the
+        # DB happens to use the C collation.
+        Index(
+            "published_paths_env_web_uri_prefix_idx",
+            "env",
+            "web_uri",
+            postgresql_ops={"web_uri": "text_pattern_ops"},
+        ),
     )
 
     id: Mapped[int] = mapped_column(
@@ -34,3 +49,32 @@ class PublishedPath(Base):
 
     updated: Mapped[datetime] = mapped_column(DateTime)
     """Last time this path was updated."""
+
+
+class CdnFlushRequest(Base):
+    """Represents a pending request to flush CDN cache for some paths.
+
+    Requests for an environment are collected over a short window and then
+    processed together, so that paths requested by many tasks at around
+    the same time are flushed only once.
+    """
+
+    __tablename__ = "cdn_flush_requests"
+    __table_args__ = (Index("cdn_flush_requests_env_idx", "env"),)
+
+    id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
+
+    env: Mapped[str] = mapped_column(String)
+    """Env for which cache should be flushed (e.g. 'pre', 'live')"""
+
+    paths: Mapped[list[str]] = mapped_column(JSONB)
+    """Paths to be flushed, with aliases already resolved."""
+
+    task_id: Mapped[str | None] = mapped_column(Uuid(as_uuid=False))
+    """ID of a task to be completed once the flush has been done, if any.
+
+    Not a foreign key since tasks may be cleaned up independently.
+    """
+
+    created: Mapped[datetime] = mapped_column(DateTime)
+    """Time at which flush was requested."""
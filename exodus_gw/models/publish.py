@@ -8,6 +8,7 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     String,
     UniqueConstraint,
     event,
@@ -22,6 +23,20 @@ from exodus_gw.schemas import ItemBase
 from .base import Base
 
 
+def web_uri_basename(web_uri):
+    """Returns an SQL expression evaluating to the basename of a web_uri,
+    e.g. "/some/repo/PULP_MANIFEST" => "PULP_MANIFEST".
+
+    This is written using only functions common to postgres and sqlite,
+    and it matches an index on the items table, so that items can be
+    efficiently looked up by basename.
+    """
+    # rtrim removes all trailing non-'/' characters, leaving the dirname
+    # with a trailing '/', which is then removed from the front.
+    dirname = func.rtrim(web_uri, func.replace(web_uri, "/", ""))
+    return func.replace(web_uri, dirname, "")
+
+
 class Publish(Base):
     __tablename__ = "publishes"
 
@@ -177,6 +192,15 @@ class Item(Base):
     publish = relationship("Publish", back_populates="items")
 
 
+# Supports looking up particular files in a publish (e.g. repo entry points)
+# by name, without scanning every item in the publish.
+Index(
+    "items_publish_id_basename_idx",
+    Item.publish_id,
+    web_uri_basename(Item.web_uri),
+)
+
+
 @event.listens_for(Publish, "before_update")
 @event.listens_for(Item, "before_update")
 def set_updated(_mapper, _connection, entity: Publish | Item):
@@ -4,7 +4,9 @@ import base64
 import json
 import logging
 import os
+import threading
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from urllib.parse import quote, urlparse
 
@@ -36,12 +38,71 @@ def build_policy(url: str, expiration: datetime):
     return json.dumps(policy, separators=(",", ":")).encode("utf-8")
 
 
-def rsa_signer(private_key: str, policy: bytes):
-    bytes_key = bytes(private_key, "utf-8")
-    loaded_key = serialization.load_pem_private_key(
-        bytes_key, password=None, backend=default_backend()
-    )
-    return loaded_key.sign(policy, padding.PKCS1v15(), hashes.SHA1())  # type: ignore # nosec
+class SigningKey:
+    """A CDN private key, parsed once and reused for any number of signatures.
+
+    Also holds signed cookies which may be reused across requests, so that
+    these are discarded whenever the key is rotated.
+    """
+
+    def __init__(self, pem: str):
+        self.pem = pem
+        self.key = serialization.load_pem_private_key(
+            bytes(pem, "utf-8"), password=None, backend=default_backend()
+        )
+        self.cookies: dict[tuple[str, int], dict[str, str]] = {}
+        self.lock = threading.Lock()
+
+    def sign(self, policy: bytes) -> bytes:
+        return self.key.sign(policy, padding.PKCS1v15(), hashes.SHA1())  # type: ignore # nosec
+
+    def cookie(self, url: str, expires: datetime, generate):
+        """Returns the cookie for ``url`` expiring at ``expires``, calling
+        ``generate`` only if no such cookie was previously generated.
+
+        Cookies expiring earlier than ``expires`` are forgotten, as callers
+        are expected to request cookies with non-decreasing expiry.
+        """
+        expires_ts = int(datetime2timestamp(expires))
+        with self.lock:
+            for cache_key in list(self.cookies):
+                if cache_key[1] < expires_ts:
+                    del self.cookies[cache_key]
+            out = self.cookies.get((url, expires_ts))
+        if out is None:
+            out = generate()
+            with self.lock:
+                self.cookies[(url, expires_ts)] = out
+        return out
+
+
+# Parsed keys per environment name.
+SIGNING_KEYS: dict[str, SigningKey] = {}
+SIGNING_KEYS_LOCK = threading.Lock()
+
+
+def signing_key(env: Environment) -> SigningKey | None:
+    """Returns the parsed private key for an environment, or None if the
+    environment has no private key.
+
+    The key is parsed only on first use and again whenever the configured
+    key changes.
+    """
+    pem = env.cdn_private_key
+    if not pem:
+        return None
+
+    with SIGNING_KEYS_LOCK:
+        key = SIGNING_KEYS.get(env.name)
+        if key is None or key.pem != pem:
+            LOG.debug(
+                "Loading CDN private key for %s",
+                env.name,
+                extra={"event": "cdn"},
+            )
+            key = SigningKey(pem)
+            SIGNING_KEYS[env.name] = key
+        return key
 
 
 def cf_b64(data: bytes):
@@ -53,11 +114,28 @@ def cf_b64(data: bytes):
     )
 
 
-def cf_cookie(url: str, env: Environment, expires: datetime, username: str):
-    policy = build_policy(url, expires)
-    signature = rsa_signer(env.cdn_private_key, policy)
-    policy_encoded = cf_b64(policy).decode("utf-8")
-    signature_encoded = cf_b64(signature).decode("utf-8")
+def cf_cookie(
+    url: str,
+    env: Environment,
+    expires: datetime,
+    username: str,
+    key: SigningKey | None = None,
+    reuse: bool = False,
+):
+    key = key or signing_key(env)
+    assert key
+
+    def generate():
+        policy = build_policy(url, expires)
+        signature = key.sign(policy)
+        return {
+            "CloudFront-Key-Pair-Id": env.cdn_key_id,
+            "CloudFront-Policy": cf_b64(policy).decode("utf-8"),
+            "CloudFront-Signature": cf_b64(signature).decode("utf-8"),
+        }
+
+    cookie = key.cookie(url, expires, generate) if reuse else generate()
+    policy_encoded = cookie["CloudFront-Policy"]
 
     LOG.info(
         "Generated cookie for: user=%s, key=%s, resource=%s, expires=%s, policy=%s",
@@ -69,14 +147,36 @@ def cf_cookie(url: str, env: Environment, expires: datetime, username: str):
         extra={"event": "cdn", "success": True},
     )
 
-    return {
-        "CloudFront-Key-Pair-Id": env.cdn_key_id,
-        "CloudFront-Policy": policy_encoded,
-        "CloudFront-Signature": signature_encoded,
-    }
+    return dict(cookie)
 
 
-def sign_url(url: str, settings: Settings, env: Environment, username: str):
+def reuse_cookies(settings: Settings) -> bool:
+    window = settings.cdn_cookie_reuse_window
+    return 0 < window < settings.cdn_cookie_ttl
+
+
+def cookie_expiry(now: datetime, settings: Settings) -> datetime:
+    """Returns the expiry time for cookies generated by ``cdn-redirect``.
+
+    If cookie reuse is enabled, the expiry time is rounded down to a multiple
+    of the reuse window, so that every request within the window obtains
+    cookies with the same expiry (and the same signature).
+    """
+    expires = now + timedelta(seconds=settings.cdn_cookie_ttl)
+    if not reuse_cookies(settings):
+        return expires
+
+    window = settings.cdn_cookie_reuse_window
+    timestamp = int(datetime2timestamp(expires))
+    return datetime.fromtimestamp(timestamp - timestamp % window, timezone.utc)
+
+
+def signing_context(settings: Settings, env: Environment, username: str):
+    """Validates the CDN signing settings of an environment and generates
+    the cookies to be embedded in signed redirect URLs.
+
+    Returns a tuple of (key, encoded cookies, signature expiry).
+    """
     if not env.cdn_url:
         LOG.error(
             "Missing cdn_url in exodus-gw environment settings",
@@ -94,7 +194,8 @@ def sign_url(url: str, settings: Settings, env: Environment, username: str):
         raise HTTPException(
             status_code=500, detail="Missing key ID for CDN access"
         )
-    if not env.cdn_private_key:
+    key = signing_key(env)
+    if not key:
         LOG.error(
             "CDN_PRIVATE_KEY_%s is unset",
             env.name.upper(),
@@ -104,38 +205,46 @@ def sign_url(url: str, settings: Settings, env: Environment, username: str):
             status_code=500, detail="Missing private key for CDN access"
         )
 
-    dest_url = os.path.join(env.cdn_url, url)
-    signature_expires = datetime.now(timezone.utc) + timedelta(
-        seconds=settings.cdn_signature_timeout
-    )
-    cookie_expires = datetime.now(timezone.utc) + timedelta(
-        seconds=settings.cdn_cookie_ttl
-    )
-
-    LOG.info(
-        "redirecting %s to %s. . .",
-        url,
-        dest_url,
-        extra={"event": "cdn", "success": True},
-    )
+    now = datetime.now(timezone.utc)
+    signature_expires = now + timedelta(seconds=settings.cdn_signature_timeout)
+    cookie_expires = cookie_expiry(now, settings)
+    cookie_max_age = int((cookie_expires - now).total_seconds())
 
     cookies = []
     for resource in ("/content/", "/origin/"):
         parsed_url = urlparse(env.cdn_url)
         policy_url = f"{parsed_url.scheme}://{parsed_url.netloc}{resource}*"
-        cookie = cf_cookie(policy_url, env, cookie_expires, username)
+        cookie = cf_cookie(
+            policy_url,
+            env,
+            cookie_expires,
+            username,
+            key=key,
+            reuse=reuse_cookies(settings),
+        )
         append = (
             f"; Secure; HttpOnly; SameSite=lax; Domain={parsed_url.netloc}; "
-            f"Path={resource}; Max-Age={settings.cdn_cookie_ttl}"
+            f"Path={resource}; Max-Age={cookie_max_age}"
         )
         cookies.extend([f"{k}={v}{append}" for k, v in cookie.items()])
 
     cookies_bytes = bytes(json.dumps(cookies), "utf-8")
     cookies_encoded = cf_b64(cookies_bytes).decode("utf-8")
 
+    return (key, cookies_encoded, signature_expires)
+
+
+def sign_redirect_url(
+    url: str,
+    env: Environment,
+    key: SigningKey,
+    cookies_encoded: str,
+    signature_expires: datetime,
+):
+    dest_url = os.path.join(env.cdn_url, url)
     dest_url = f"{dest_url}?CloudFront-Cookies={cookies_encoded}"
     policy = build_policy(dest_url, signature_expires)
-    signature = rsa_signer(env.cdn_private_key, policy)
+    signature = key.sign(policy)
 
     params = [
         f"Expires={int(datetime2timestamp(signature_expires))}",
@@ -145,6 +254,38 @@ def sign_url(url: str, settings: Settings, env: Environment, username: str):
     return f"{dest_url}&{'&'.join(params)}"
 
 
+def sign_url(url: str, settings: Settings, env: Environment, username: str):
+    key, cookies_encoded, signature_expires = signing_context(
+        settings, env, username
+    )
+
+    LOG.info(
+        "redirecting %s to %s. . .",
+        url,
+        os.path.join(env.cdn_url, url),
+        extra={"event": "cdn", "success": True},
+    )
+
+    return sign_redirect_url(url, env, key, cookies_encoded, signature_expires)
+
+
+# Executor used for signing URLs in bulk, created on first use.
+SIGN_EXECUTOR: ThreadPoolExecutor | None = None
+SIGN_EXECUTOR_LOCK = threading.Lock()
+
+
+def sign_executor(settings: Settings) -> ThreadPoolExecutor:
+    global SIGN_EXECUTOR  # pylint: disable=global-statement
+
+    with SIGN_EXECUTOR_LOCK:
+        if SIGN_EXECUTOR is None:
+            SIGN_EXECUTOR = ThreadPoolExecutor(
+                max_workers=max(settings.cdn_sign_workers, 1),
+                thread_name_prefix="cdn-sign",
+            )
+        return SIGN_EXECUTOR
+
+
 Url = Path(
     ...,
     title="URL",
@@ -208,6 +349,81 @@ def cdn_redirect(
     )
 
 
+@router.post(
+    "/{env}/cdn-sign",
+    summary="Sign URLs",
+    status_code=200,
+    response_model=schemas.SignResponse,
+)
+def cdn_sign(
+    urls: list[str] = Body(
+        ...,
+        description="URLs of pieces of content relative to CDN root.",
+        examples=[
+            [
+                "content/dist/rhel8/8/x86_64/baseos/os/repodata/repomd.xml",
+                "content/dist/rhel8/8/x86_64/appstream/os/repodata/repomd.xml",
+            ]
+        ],
+    ),
+    settings: Settings = deps.settings,
+    env: Environment = deps.env,
+    call_context: auth.CallContext = deps.call_context,
+):
+    """Obtain signed, temporary URLs for any number of pieces of content
+    on the CDN.
+
+    This endpoint returns the same URLs as would be used by the redirect
+    endpoint, but for many pieces of content at once. It should be preferred
+    over the redirect endpoint when accessing large amounts of content.
+
+    The returned URLs are in the same order as the requested URLs and will
+    become invalid after a server-defined timeout, typically less than one
+    hour.
+    """
+    if len(urls) > settings.cdn_sign_max_urls:
+        raise HTTPException(
+            400,
+            detail=(
+                f"Cannot sign more than {settings.cdn_sign_max_urls} "
+                "URLs in a single request"
+            ),
+        )
+
+    username = (
+        call_context.client.serviceAccountId
+        or call_context.user.internalUsername
+        or "<unknown user>"
+    )
+
+    key, cookies_encoded, signature_expires = signing_context(
+        settings, env, username
+    )
+
+    def sign(url: str):
+        return sign_redirect_url(
+            quote(url), env, key, cookies_encoded, signature_expires
+        )
+
+    signed_urls = list(sign_executor(settings).map(sign, urls))
+
+    LOG.info(
+        "Signed %s URL(s) (%s, ...) for %s",
+        len(urls),
+        urls[0] if urls else "<empty>",
+        username,
+        extra={"event": "cdn", "success": True},
+    )
+
+    return {
+        "expires": signature_expires.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "urls": [
+            {"url": url, "signed_url": signed_url}
+            for (url, signed_url) in zip(urls, signed_urls)
+        ],
+    }
+
+
 @router.get(
     "/{env}/cdn-access",
     summary="Access",
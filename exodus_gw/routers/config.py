@@ -5,10 +5,10 @@ from datetime import datetime, timezone
 from typing import Any
 
 import jsonschema
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from exodus_gw.aws.dynamodb import DynamoDB
+from exodus_gw.aws.dynamodb import cached_config
 
 from .. import auth, deps, models, schemas, worker
 from ..settings import Environment, Settings
@@ -197,6 +197,14 @@ def config_post(
     return task
 
 
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    # Weak comparison, as If-None-Match requires.
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(
+        c.removeprefix("W/") == etag for c in candidates
+    )
+
+
 @router.get(
     "/{env}/config",
     response_model=schemas.Config,
@@ -226,19 +234,33 @@ def config_post(
                     "src": "/content/dist/rhel8/rhui",
                 },
             ],
-        }
+        },
+        304: {"description": "Config has not changed since last retrieved"},
     },
     dependencies=[auth.needs_role("config-consumer")],
 )
 def config_get(
-    settings: Settings = deps.settings, env: Environment = deps.env
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    settings: Settings = deps.settings,
+    env: Environment = deps.env,
 ):
     """Retrieves current CDN configuration data for use by Exodus components.
 
+    Responses include an `ETag` header. Clients may send this value back
+    in an `If-None-Match` header, in which case a 304 response with no body
+    is returned if the config has not changed.
+
+    Config may be cached by exodus-gw for a short time, typically less than
+    a minute.
+
     **Required roles**: `{env}-config-consumer`
     """
 
-    from_date = str(datetime.now(timezone.utc))
-    ddb = DynamoDB(env.name, settings, from_date)
+    cached = cached_config(env.name, settings)
+
+    if if_none_match and etag_matches(cached.etag, if_none_match):
+        return Response(status_code=304, headers={"ETag": cached.etag})
 
-    return dict(ddb.definitions.items())
+    response.headers["ETag"] = cached.etag
+    return cached.config
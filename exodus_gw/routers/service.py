@@ -2,13 +2,18 @@
 
 import logging
 from datetime import datetime, timedelta
+from typing import Any
 
-from fastapi import APIRouter, Header, HTTPException, Response
+import dramatiq
+from dramatiq.common import current_millis, q_name
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
 from .. import deps, models, schemas
 from ..auth import CallContext
-from ..models import DramatiqConsumer
+from ..dramatiq.metrics import Histogram
+from ..models import DramatiqConsumer, DramatiqMessage
 from ..settings import Settings
 
 LOG = logging.getLogger("exodus-gw")
@@ -73,6 +78,138 @@ def healthcheck_worker(
     return {"detail": "background worker is running"}
 
 
+def duration_summary(histogram: Histogram) -> schemas.DurationSummary:
+    percentiles = {}
+    for pct in (50, 90, 99):
+        value = histogram.percentile(pct)
+        percentiles["p%s" % pct] = value / 1000 if value is not None else None
+    return schemas.DurationSummary(count=histogram.count, **percentiles)
+
+
+@router.get(
+    "/worker-metrics",
+    response_model=schemas.WorkerMetrics,
+    responses={200: {"description": "Metrics retrieved"}},
+)
+def worker_metrics(db: Session = deps.db, settings: Settings = deps.settings):
+    """Returns metrics on the state of background workers.
+
+    This includes the number of messages in each queue, the time for which
+    messages have waited before being processed and the time taken to process
+    them (per actor), and the liveness of each consumer.
+
+    Actor metrics are periodically reported by each worker and only cover
+    workers which are currently alive.
+    """
+
+    # consumer is alive if it was last seen at least this recently.
+    threshold = datetime.utcnow() - timedelta(
+        seconds=settings.worker_keepalive_timeout
+    )
+
+    # Start with all known queues, so that empty queues are also reported.
+    queues: dict[str, dict[str, Any]] = {
+        q_name(name): dict(waiting=0, in_progress=0, delayed=0)
+        for name in dramatiq.get_broker().get_declared_queues()
+    }
+
+    query = select(
+        DramatiqMessage.queue,
+        func.sum(case((DramatiqMessage.consumer_id == None, 1), else_=0)),
+        func.sum(case((DramatiqMessage.consumer_id != None, 1), else_=0)),
+        func.min(
+            case(
+                (DramatiqMessage.consumer_id == None, DramatiqMessage.enqueued)
+            )
+        ),
+    ).group_by(DramatiqMessage.queue)
+
+    now = current_millis()
+    for name, unclaimed, claimed, oldest in db.execute(query):
+        queue = queues.setdefault(
+            q_name(name), dict(waiting=0, in_progress=0, delayed=0)
+        )
+        if name != q_name(name):
+            # Delay queue; messages there are never claimed.
+            queue["delayed"] += unclaimed + claimed
+            continue
+
+        queue["waiting"] += unclaimed
+        queue["in_progress"] += claimed
+        if oldest:
+            queue["oldest_wait"] = max(now - oldest, 0) / 1000
+
+    # Merge actor metrics from all live consumers.
+    actors: dict[tuple[str, str], dict[str, Histogram]] = {}
+    consumers = db.query(DramatiqConsumer).order_by(DramatiqConsumer.id).all()
+    for consumer in consumers:
+        if consumer.last_alive < threshold or not consumer.metrics:
+            continue
+        queue_name = consumer.metrics["queue"]
+        for actor_name, histograms in consumer.metrics["actors"].items():
+            merged = actors.setdefault(
+                (queue_name, actor_name),
+                {"wait": Histogram(), "run": Histogram()},
+            )
+            for key, counts in histograms.items():
+                merged[key].merge(Histogram(counts))
+
+    return schemas.WorkerMetrics(
+        queues=[
+            schemas.QueueMetrics(name=name, **queues[name])
+            for name in sorted(queues)
+        ],
+        actors=[
+            schemas.ActorMetrics(
+                name=actor_name,
+                queue=queue_name,
+                wait=duration_summary(
+                    actors[(queue_name, actor_name)]["wait"]
+                ),
+                run=duration_summary(actors[(queue_name, actor_name)]["run"]),
+            )
+            for (queue_name, actor_name) in sorted(actors)
+        ],
+        consumers=[
+            schemas.ConsumerMetrics(
+                id=consumer.id,
+                last_alive=consumer.last_alive,
+                alive=consumer.last_alive >= threshold,
+            )
+            for consumer in consumers
+        ],
+    )
+
+
+@router.get(
+    "/s3-pool-metrics",
+    response_model=list[schemas.S3PoolMetrics],
+    responses={200: {"description": "Metrics retrieved"}},
+)
+async def s3_pool_metrics(request: Request):
+    """Returns metrics on the pools of S3 clients used to serve requests.
+
+    Note that metrics are specific to the exodus-gw process serving this
+    request, and cover only the period since it started.
+    """
+
+    pools = request.app.state.s3_pools
+
+    return [
+        schemas.S3PoolMetrics(
+            profile=profile,
+            size=pool.size,
+            max_size=pool.maxsize,
+            idle=pool.idle,
+            waiting=pool.waiting,
+            created=pool.created,
+            discarded=pool.discarded,
+            wait=duration_summary(pool.wait),
+        )
+        for (profile, pool) in sorted(pools.items())
+    ]
+
+
 @router.get(
     "/whoami",
     response_model=CallContext,
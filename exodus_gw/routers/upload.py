@@ -21,6 +21,9 @@ Differences from the AWS S3 API include:
 - Object keys should always be SHA256 checksums of the objects being stored,
   in lowercase hex digest form. This allows the object store to be used
   as content-addressable storage.
+  Content is checked against the key while being uploaded, and uploads of
+  content not matching the key are rejected. Multipart uploads can only be
+  checked if parts are uploaded sequentially, in order.
 
 - When uploading content, the Content-MD5 and Content-Length headers are mandatory;
   chunked encoding is not supported.
@@ -28,6 +31,14 @@ Differences from the AWS S3 API include:
 - The API may enforce stricter limits or policies on uploads than those imposed
   by the AWS API.
 
+- Large objects uploaded via a single PUT may be written to S3 by exodus-gw as
+  a multipart upload. In this case, the returned ETag is that of a multipart
+  upload rather than an MD5 checksum of the object.
+
+- If enabled by the server, clients may obtain presigned URLs to upload content
+  directly to S3, via the `POST /upload/{env}/{key}/presign` API.
+  Multi-part uploads must still be created and completed via exodus-gw.
+
 ## Using boto3 with the upload API
 
 As the upload API is partially compatible with S3, it is possible to use
@@ -68,9 +79,17 @@ bucket.upload_file('/tmp/hello.txt',
 ```
 """
 
+import asyncio
+import base64
+import hashlib
 import logging
 import textwrap
+from datetime import datetime, timedelta, timezone
+from tempfile import SpooledTemporaryFile
+from typing import Any
 
+import backoff
+from botocore.exceptions import ClientError
 from fastapi import (
     APIRouter,
     Depends,
@@ -81,13 +100,16 @@ from fastapi import (
     Response,
 )
 
-from .. import auth, deps
+from .. import auth, deps, schemas
 from ..aws.client import S3ClientWrapper
 from ..aws.util import (
     RequestReader,
     content_md5,
     extract_mpu_parts,
     extract_request_metadata,
+    known_objects,
+    upload_digests,
+    validate_metadata,
     validate_object_key,
     xml_response,
 )
@@ -100,6 +122,196 @@ openapi_tag = {"name": "upload", "description": __doc__}
 router = APIRouter(tags=[openapi_tag["name"]])
 
 
+# Note: must be declared before routes using "/upload/{env}/{key}", which
+# would otherwise match this path.
+@router.post(
+    "/upload/{env}/exists",
+    summary="Check existence of objects",
+    response_model=schemas.ObjectsExistResponse,
+    dependencies=[auth.needs_role("blob-uploader")],
+)
+async def objects_exist(
+    body: schemas.ObjectKeys,
+    env: Environment = deps.env,
+    s3: S3ClientWrapper = deps.s3_client,
+    settings: Settings = deps.settings,
+):
+    """Determine which of a set of objects already exist.
+
+    **Required roles**: `{env}-blob-uploader`
+
+    This is equivalent to a `HEAD` request for each object key, but allows
+    clients to check many objects at once; for example, to determine which
+    files must be uploaded before a publish.
+
+    This API is not part of the S3 API.
+    """
+
+    keys = sorted(set(body.keys))
+
+    if len(keys) > settings.upload_exists_max_keys:
+        raise HTTPException(
+            400,
+            detail="Too many object keys (%s > %s)"
+            % (len(keys), settings.upload_exists_max_keys),
+        )
+
+    for key in keys:
+        validate_object_key(key)
+
+    known = known_objects(env.bucket, settings)
+    sem = asyncio.Semaphore(settings.upload_exists_concurrency)
+
+    async def exists(key: str) -> bool:
+        if key in known:
+            # Already seen to exist, no need to ask S3 again.
+            return True
+
+        async with sem:
+            try:
+                await s3.head_object(Bucket=env.bucket, Key=key)  # type: ignore
+            except ClientError as exc_info:
+                if client_error_status(exc_info) == 404:
+                    return False
+                raise
+
+        known.add(key)
+        return True
+
+    results = await asyncio.gather(*[exists(key) for key in keys])
+
+    present = [key for (key, result) in zip(keys, results) if result]
+    missing = [key for (key, result) in zip(keys, results) if not result]
+
+    LOG.debug(
+        "Checked %s object(s) in %s: %s present, %s missing",
+        len(keys),
+        env.bucket,
+        len(present),
+        len(missing),
+        extra={"event": "upload"},
+    )
+
+    return schemas.ObjectsExistResponse(present=present, missing=missing)
+
+
+@router.post(
+    "/upload/{env}/{key}/presign",
+    summary="Get presigned upload URLs",
+    response_model=schemas.PresignResponse,
+    dependencies=[auth.needs_role("blob-uploader")],
+)
+async def presign_upload(
+    body: schemas.PresignRequest,
+    env: Environment = deps.env,
+    s3: S3ClientWrapper = deps.s3_client,
+    key: str = Path(..., description="S3 object key"),
+    settings: Settings = deps.settings,
+    caller_name: str = Depends(auth.caller_name),
+):
+    """Get presigned URLs for uploading content directly to S3.
+
+    **Required roles**: `{env}-blob-uploader`
+
+    This API allows clients to upload content without passing it through
+    exodus-gw, and is only available if enabled by the server.
+
+    To upload an entire object:
+    - omit ``upload_id`` and ``part_numbers``
+    - `PUT` the object's content to the returned URL, including the returned
+      headers; S3 will reject content not matching the object key
+
+    To upload parts of an object:
+    - create a multi-part upload using this API as usual
+    - provide the upload's ID in ``upload_id`` and the desired part numbers
+      in ``part_numbers``
+    - `PUT` each part's content to the corresponding URL
+    - complete the multi-part upload using this API as usual
+
+    Note that the content of multi-part uploads using presigned URLs can't
+    be checked against the object key.
+
+    This API is not part of the S3 API.
+    """
+
+    if not settings.upload_presign_enabled:
+        raise HTTPException(403, detail="Presigned uploads are not enabled")
+
+    validate_object_key(key)
+
+    if body.upload_id and not body.part_numbers:
+        raise HTTPException(
+            400, detail="part_numbers must be provided with upload_id"
+        )
+    if not body.upload_id and body.part_numbers:
+        raise HTTPException(
+            400, detail="part_numbers must not be provided without upload_id"
+        )
+    if body.upload_id and body.metadata:
+        raise HTTPException(
+            400, detail="metadata must not be provided with upload_id"
+        )
+    for part_number in body.part_numbers:
+        if not 1 <= part_number <= 10000:
+            raise HTTPException(
+                400, detail="Invalid part number: %s" % part_number
+            )
+
+    expires_in = settings.upload_presign_expiry
+    expires = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+
+    headers: dict[str, str] = {}
+    urls: list[schemas.PresignedUrl] = []
+
+    if body.upload_id:
+        for part_number in sorted(set(body.part_numbers)):
+            url = await s3.generate_presigned_url(  # type: ignore
+                "upload_part",
+                Params={
+                    "Bucket": env.bucket,
+                    "Key": key,
+                    "UploadId": body.upload_id,
+                    "PartNumber": part_number,
+                },
+                ExpiresIn=expires_in,
+            )
+            urls.append(schemas.PresignedUrl(part_number=part_number, url=url))
+    else:
+        validate_metadata(body.metadata, settings)
+        metadata = {**body.metadata, "gw-uploader": caller_name}
+
+        # Signing the checksum means S3 itself will verify that uploaded
+        # content matches the object key.
+        checksum = base64.b64encode(bytes.fromhex(key)).decode()
+
+        url = await s3.generate_presigned_url(  # type: ignore
+            "put_object",
+            Params={
+                "Bucket": env.bucket,
+                "Key": key,
+                "ChecksumSHA256": checksum,
+                "Metadata": metadata,
+            },
+            ExpiresIn=expires_in,
+        )
+        urls.append(schemas.PresignedUrl(part_number=None, url=url))
+
+        headers["x-amz-checksum-sha256"] = checksum
+        for k, v in metadata.items():
+            headers["x-amz-meta-%s" % k] = v
+
+    LOG.info(
+        "Presigned %s upload URL(s) for %s in %s for %s",
+        len(urls),
+        key,
+        env.bucket,
+        caller_name,
+        extra={"event": "upload"},
+    )
+
+    return schemas.PresignResponse(expires=expires, headers=headers, urls=urls)
+
+
 @router.post(
     "/upload/{env}/{key}",
     summary="Create/complete multipart upload",
@@ -159,7 +371,9 @@ async def multipart_upload(
 
     if uploads is None and uploadId:
         # Given an existing upload to complete
-        return await complete_multipart_upload(s3, env, key, uploadId, request)
+        return await complete_multipart_upload(
+            s3, env, key, uploadId, request, settings
+        )
 
     # Caller did something wrong
     raise HTTPException(
@@ -210,13 +424,35 @@ async def upload(
         metadata = extract_request_metadata(request, settings)
         # add uploader info in the metadata to track the object modifying entity
         metadata["gw-uploader"] = caller_name
-        return await object_put(s3, env, key, request, metadata)
+
+        threshold = settings.upload_split_threshold
+        if threshold and int(request.headers["Content-Length"]) > threshold:
+            return await object_put_split(
+                s3, env, key, request, metadata, settings
+            )
+
+        return await object_put(s3, env, key, request, metadata, settings)
 
     # If either is set, both must be set.
     assert uploadId and partNumber
 
     # Multipart upload
-    return await multipart_put(s3, env, key, uploadId, partNumber, request)
+    return await multipart_put(
+        s3, env, key, uploadId, partNumber, request, settings
+    )
+
+
+def client_error_status(exc: BaseException) -> int | None:
+    # Returns the HTTP status of an error response from S3, if known.
+    if not isinstance(exc, ClientError):
+        return None
+    return exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+
+
+def digest_mismatch(key: str) -> HTTPException:
+    return HTTPException(
+        400, detail="Content does not match object key '%s'" % key
+    )
 
 
 async def object_put(
@@ -225,21 +461,222 @@ async def object_put(
     key: str,
     request: Request,
     metadata: dict[str, str],
+    settings: Settings,
 ):
     # Single-part upload handler: entire object is written via one PUT.
-    reader = RequestReader.get_reader(request)
+    if settings.upload_verify_sha256:
+        # The reader checks content against the key as it streams, failing
+        # the PUT before S3 receives all content if it doesn't match.
+        reader = RequestReader.get_reader(
+            request,
+            buffer_size=settings.upload_buffer_size,
+            sha256=hashlib.sha256(),
+            expected_sha256=key,
+        )
+    else:
+        reader = RequestReader.get_reader(
+            request, buffer_size=settings.upload_buffer_size
+        )
 
     validate_object_key(key)
 
-    response = await s3.put_object(  # type: ignore
-        Bucket=env.bucket,
-        Key=key,
-        Body=reader,
-        ContentMD5=content_md5(request),
-        ContentLength=int(request.headers["Content-Length"]),
-        Metadata=metadata,
+    try:
+        response = await s3.put_object(  # type: ignore
+            Bucket=env.bucket,
+            Key=key,
+            Body=reader,
+            ContentMD5=content_md5(request),
+            ContentLength=int(request.headers["Content-Length"]),
+            Metadata=metadata,
+        )
+    except Exception:
+        # However the failure surfaced from the S3 client, report it as a
+        # bad upload if it was caused by a mismatch.
+        if getattr(reader, "digest_mismatch", False):
+            LOG.warning(
+                "Rejected upload of %s: content does not match key",
+                key,
+                extra={"event": "upload", "success": False},
+            )
+            raise digest_mismatch(key) from None
+        raise
+
+    # The object now exists, which may save some later HEAD requests.
+    known_objects(env.bucket, settings).add(key)
+
+    return Response(headers={"ETag": response["ETag"]})
+
+
+async def object_put_split(
+    s3: S3ClientWrapper,
+    env: Environment,
+    key: str,
+    request: Request,
+    metadata: dict[str, str],
+    settings: Settings,
+):
+    # Large single-part upload handler: the object is split into parts as
+    # it's received and written via a multipart upload managed by us.
+    #
+    # Each part is spooled to a buffer, so that it can be retried, and
+    # uploaded while later parts are being received. The number of parts
+    # in flight is bounded by a semaphore, so a slow S3 applies
+    # backpressure to the client.
+    validate_object_key(key)
+
+    part_size = settings.upload_split_part_size
+    expected_md5 = content_md5(request)
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+
+    response = await s3.create_multipart_upload(  # type: ignore
+        Bucket=env.bucket, Key=key, Metadata=metadata
+    )
+    upload_id = response["UploadId"]
+
+    LOG.debug(
+        "Splitting upload of %s into mpu %s",
+        key,
+        upload_id,
+        extra={"event": "upload"},
+    )
+
+    sem = asyncio.Semaphore(settings.upload_split_concurrency)
+    tasks: list[asyncio.Future[dict[str, Any]]] = []
+
+    @backoff.on_exception(
+        wait_gen=backoff.expo,
+        exception=Exception,
+        max_tries=settings.upload_split_max_tries,
+        # Errors reported by S3 for bad requests won't get any better.
+        giveup=lambda exc: (client_error_status(exc) or 500) < 500,
+        logger=LOG,
+        backoff_log_level=logging.DEBUG,
+    )
+    async def put_part_once(part_number, spool, size, part_md5):
+        spool.seek(0)
+        return await s3.upload_part(  # type: ignore
+            Body=spool,
+            Bucket=env.bucket,
+            Key=key,
+            PartNumber=part_number,
+            UploadId=upload_id,
+            ContentMD5=part_md5,
+            ContentLength=size,
+        )
+
+    async def put_part(part_number, spool, size, part_md5):
+        try:
+            response = await put_part_once(part_number, spool, size, part_md5)
+            return {"ETag": response["ETag"], "PartNumber": part_number}
+        finally:
+            spool.close()
+            sem.release()
+
+    def start_part(spool, size, part_md5):
+        tasks.append(
+            asyncio.ensure_future(
+                put_part(
+                    len(tasks) + 1,
+                    spool,
+                    size,
+                    base64.b64encode(part_md5.digest()).decode(),
+                )
+            )
+        )
+
+    async def new_spool():
+        await sem.acquire()
+        # Fail early if any earlier part couldn't be uploaded.
+        for task in tasks:
+            if task.done() and task.exception():
+                sem.release()
+                await task
+        return SpooledTemporaryFile(max_size=settings.upload_split_spool_size)
+
+    spool = None
+    try:
+        spool = await new_spool()
+        size = 0
+        part_md5 = hashlib.md5()
+
+        async for chunk in request.stream():
+            md5.update(chunk)
+            sha256.update(chunk)
+
+            while chunk:
+                if size == part_size:
+                    start_part(spool, size, part_md5)
+                    spool = None
+                    spool = await new_spool()
+                    size = 0
+                    part_md5 = hashlib.md5()
+
+                piece = chunk[: part_size - size]
+                chunk = chunk[len(piece) :]
+                spool.write(piece)
+                part_md5.update(piece)
+                size += len(piece)
+
+        # The final part, which may be smaller (or empty, for an empty object).
+        start_part(spool, size, part_md5)
+        spool = None
+
+        parts = await asyncio.gather(*tasks)
+
+        if base64.b64encode(md5.digest()).decode() != expected_md5:
+            raise HTTPException(
+                400, detail="Content does not match Content-MD5"
+            )
+        if settings.upload_verify_sha256 and sha256.hexdigest() != key:
+            raise digest_mismatch(key)
+
+        response = await s3.complete_multipart_upload(  # type: ignore
+            Bucket=env.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        if spool is not None:
+            # A part not yet handed over for upload.
+            spool.close()
+            sem.release()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        LOG.warning(
+            "Aborting split upload of %s (mpu %s)",
+            key,
+            upload_id,
+            exc_info=True,
+            extra={"event": "upload", "success": False},
+        )
+        try:
+            await s3.abort_multipart_upload(  # type: ignore
+                Bucket=env.bucket, Key=key, UploadId=upload_id
+            )
+        except Exception:  # pylint: disable=broad-except
+            # Incomplete uploads are anyway expected to be cleaned up by
+            # a bucket lifecycle rule.
+            LOG.warning(
+                "Failed to abort mpu %s",
+                upload_id,
+                exc_info=True,
+                extra={"event": "upload", "success": False},
+            )
+        raise
+
+    LOG.debug(
+        "Completed split upload of %s in %s part(s)",
+        key,
+        len(parts),
+        extra={"event": "upload", "success": True},
     )
 
+    known_objects(env.bucket, settings).add(key)
+
     return Response(headers={"ETag": response["ETag"]})
 
 
@@ -249,6 +686,7 @@ async def complete_multipart_upload(
     key: str,
     uploadId: str,
     request: Request,
+    settings: Settings,
 ):
     body = await request.body()
     parts = extract_mpu_parts(body)
@@ -257,6 +695,33 @@ async def complete_multipart_upload(
 
     validate_object_key(key)
 
+    # If all parts were hashed in order by this process, we can check the
+    # content against the key before completing the upload.
+    part_numbers = sorted(part["PartNumber"] for part in parts)
+    digest = upload_digests(env.bucket, settings).pop(
+        uploadId, len(part_numbers)
+    )
+    if part_numbers != list(range(1, len(part_numbers) + 1)):
+        digest = None
+
+    if digest is None:
+        LOG.debug(
+            "Unable to verify content of mpu %s",
+            uploadId,
+            extra={"event": "upload"},
+        )
+    elif digest != key:
+        LOG.warning(
+            "Rejected mpu %s: content of %s does not match key",
+            uploadId,
+            key,
+            extra={"event": "upload", "success": False},
+        )
+        await s3.abort_multipart_upload(  # type: ignore
+            Bucket=env.bucket, Key=key, UploadId=uploadId
+        )
+        raise digest_mismatch(key)
+
     response = await s3.complete_multipart_upload(  # type: ignore
         Bucket=env.bucket,
         Key=key,
@@ -269,6 +734,9 @@ async def complete_multipart_upload(
         response,
         extra={"event": "upload", "success": True},
     )
+
+    known_objects(env.bucket, settings).add(key)
+
     return xml_response(
         "CompleteMultipartUploadOutput",
         Location=response["Location"],
@@ -303,20 +771,47 @@ async def multipart_put(
     uploadId: str,
     partNumber: int,
     request: Request,
+    settings: Settings,
 ):
-    reader = RequestReader.get_reader(request)
-
     validate_object_key(key)
 
-    response = await s3.upload_part(  # type: ignore
-        Body=reader,
-        Bucket=env.bucket,
-        Key=key,
-        PartNumber=partNumber,
-        UploadId=uploadId,
-        ContentMD5=content_md5(request),
-        ContentLength=int(request.headers["Content-Length"]),
-    )
+    digests = upload_digests(env.bucket, settings)
+    sha256 = None
+    if settings.upload_verify_sha256:
+        # Continue hashing from the end of the previous part, if possible.
+        sha256 = digests.start_part(uploadId, partNumber)
+
+    hashed: list[Any] = []
+    if sha256 is None:
+        reader = RequestReader.get_reader(
+            request, buffer_size=settings.upload_buffer_size
+        )
+    else:
+        reader = RequestReader.get_reader(
+            request,
+            buffer_size=settings.upload_buffer_size,
+            sha256=sha256,
+            on_digest=hashed.append,
+        )
+
+    try:
+        response = await s3.upload_part(  # type: ignore
+            Body=reader,
+            Bucket=env.bucket,
+            Key=key,
+            PartNumber=partNumber,
+            UploadId=uploadId,
+            ContentMD5=content_md5(request),
+            ContentLength=int(request.headers["Content-Length"]),
+        )
+    except Exception:
+        if sha256 is not None:
+            digests.end_part(uploadId, partNumber)
+        raise
+
+    if sha256 is not None:
+        # Only a successfully uploaded part advances the digest.
+        digests.end_part(uploadId, partNumber, hashed[-1] if hashed else None)
 
     return Response(headers={"ETag": response["ETag"]})
 
@@ -302,6 +302,29 @@ class AccessResponse(BaseModel):
     )
 
 
+class SignedUrl(BaseModel):
+    url: str = Field(
+        description="URL of a piece of content relative to CDN root.",
+        examples=["content/dist/rhel8/8/x86_64/baseos/os/repodata/repomd.xml"],
+    )
+    signed_url: str = Field(
+        description="An absolute, signed, temporary URL of CDN content.",
+    )
+
+
+class SignResponse(BaseModel):
+    expires: str = Field(
+        description=(
+            "Expiration time of the signed URLs included in this response. "
+            "ISO8601 UTC timestamp."
+        ),
+        examples=["2024-04-18T05:30:00Z"],
+    )
+    urls: list[SignedUrl] = Field(
+        description="Signed URLs, in the same order as requested.",
+    )
+
+
 class MessageResponse(BaseModel):
     detail: str = Field(
         ..., description="A human-readable message with additional info."
@@ -312,6 +335,163 @@ class EmptyResponse(BaseModel):
     """An empty object."""
 
 
+class ObjectKeys(BaseModel):
+    keys: list[str] = Field(
+        ...,
+        description="Object keys (SHA256 checksums) of objects.",
+        examples=[
+            [
+                "aec070645fe53ee3b3763059376134f058cc337247c978add178b6ccdfb0019f"
+            ]
+        ],
+    )
+
+
+class ObjectsExistResponse(BaseModel):
+    present: list[str] = Field(
+        ..., description="Object keys of objects which already exist."
+    )
+    missing: list[str] = Field(
+        ..., description="Object keys of objects which do not exist."
+    )
+
+
+class PresignRequest(BaseModel):
+    upload_id: str | None = Field(
+        None,
+        description=(
+            "ID of an existing multipart upload. If omitted, a URL for "
+            "uploading an entire object is requested."
+        ),
+    )
+    part_numbers: list[int] = Field(
+        [],
+        description=(
+            "Part numbers (1 to 10,000) for which URLs are requested. "
+            "Required if and only if `upload_id` is provided."
+        ),
+        examples=[[1, 2, 3]],
+    )
+    metadata: dict[str, str] = Field(
+        {},
+        description=(
+            "Metadata to be stored with an entire object, equivalent to "
+            "`x-amz-meta-*` headers. Not applicable to multipart uploads."
+        ),
+    )
+
+
+class PresignedUrl(BaseModel):
+    part_number: int | None = Field(
+        None, description="Part number, for multipart uploads."
+    )
+    url: str = Field(..., description="A presigned URL for a PUT request.")
+
+
+class PresignResponse(BaseModel):
+    expires: datetime = Field(
+        ..., description="Time after which the URLs can no longer be used."
+    )
+    headers: dict[str, str] = Field(
+        ...,
+        description=(
+            "Headers which must be included, unmodified, in each PUT request "
+            "using the presigned URLs."
+        ),
+    )
+    urls: list[PresignedUrl] = Field(..., description="Presigned URLs.")
+
+
+class DurationSummary(BaseModel):
+    count: int = Field(..., description="Number of durations recorded.")
+    p50: float | None = Field(
+        None, description="50th percentile duration, in seconds."
+    )
+    p90: float | None = Field(
+        None, description="90th percentile duration, in seconds."
+    )
+    p99: float | None = Field(
+        None, description="99th percentile duration, in seconds."
+    )
+
+
+class QueueMetrics(BaseModel):
+    name: str = Field(..., description="Name of queue.")
+    waiting: int = Field(
+        ..., description="Number of messages waiting to be processed."
+    )
+    in_progress: int = Field(
+        ..., description="Number of messages claimed by a worker."
+    )
+    delayed: int = Field(
+        ..., description="Number of messages not yet due to be processed."
+    )
+    oldest_wait: float | None = Field(
+        None,
+        description="Time, in seconds, for which the oldest waiting message "
+        "has been waiting.",
+    )
+
+
+class ActorMetrics(BaseModel):
+    name: str = Field(..., description="Name of actor.")
+    queue: str = Field(..., description="Name of actor's queue.")
+    wait: DurationSummary = Field(
+        ...,
+        description="Time messages for this actor waited before being processed.",
+    )
+    run: DurationSummary = Field(
+        ..., description="Time taken to process messages for this actor."
+    )
+
+
+class ConsumerMetrics(BaseModel):
+    id: str = Field(..., description="Unique ID of consumer.")
+    last_alive: datetime = Field(
+        ..., description="Last time this consumer reported itself alive."
+    )
+    alive: bool = Field(
+        ..., description="Whether this consumer is considered alive."
+    )
+
+
+class WorkerMetrics(BaseModel):
+    queues: list[QueueMetrics] = Field(
+        ..., description="Metrics for each queue."
+    )
+    actors: list[ActorMetrics] = Field(
+        ...,
+        description="Metrics for each actor, as recorded by all live workers "
+        "since they started.",
+    )
+    consumers: list[ConsumerMetrics] = Field(
+        ..., description="All consumers known to the system."
+    )
+
+
+class S3PoolMetrics(BaseModel):
+    profile: str = Field(..., description="AWS profile used by clients.")
+    size: int = Field(
+        ..., description="Number of clients currently open (idle or in use)."
+    )
+    max_size: int = Field(
+        ..., description="Maximum number of clients which may be open."
+    )
+    idle: int = Field(..., description="Number of clients not in use.")
+    waiting: int = Field(
+        ..., description="Number of requests currently waiting for a client."
+    )
+    created: int = Field(..., description="Number of clients ever created.")
+    discarded: int = Field(
+        ..., description="Number of clients discarded due to errors."
+    )
+    wait: DurationSummary = Field(
+        ...,
+        description="Time for which requests waited to obtain a client, "
+        "including time spent creating clients.",
+    )
+
+
 class Alias(BaseModel):
     src: str = Field(
         ..., description="Path being aliased from, relative to CDN root."
@@ -1,8 +1,9 @@
 import configparser
+import functools
 import os
 import re
 from collections.abc import Iterable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
@@ -29,6 +30,21 @@ def split_ini_list(raw: str | None) -> list[str]:
     return [elem.strip() for elem in raw.split("\n") if elem.strip()]
 
 
+def combine_patterns(patterns: list[re.Pattern[str]]) -> list[re.Pattern[str]]:
+    # Given a list of patterns, returns an equivalent list for the purpose
+    # of search(), where possible combined into a single alternation so
+    # that each string can be checked with one call.
+    if len(patterns) <= 1:
+        return patterns
+
+    try:
+        return [re.compile("|".join(f"(?:{p.pattern})" for p in patterns))]
+    except re.error:
+        # Can happen for patterns which can't be combined, e.g. those
+        # using global flags. Fall back to checking them one at a time.
+        return patterns
+
+
 @dataclass
 class CacheFlushRule:
     name: str
@@ -75,6 +91,17 @@ class CacheFlushRule:
     excludes are applied after includes.
     """
 
+    _includes: list[re.Pattern[str]] = field(
+        init=False, repr=False, compare=False
+    )
+    _excludes: list[re.Pattern[str]] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self._includes = combine_patterns(self.includes)
+        self._excludes = combine_patterns(self.excludes)
+
     def matches(self, path: str) -> bool:
         """True if this rule matches the given path."""
 
@@ -83,14 +110,14 @@ class CacheFlushRule:
         path = "/" + path.removeprefix("/")
 
         # Must match at least one 'includes'.
-        for pattern in self.includes:
+        for pattern in self._includes:
             if pattern.search(path):
                 break
         else:
             return False
 
         # Must not match any 'excludes'.
-        for pattern in self.excludes:
+        for pattern in self._excludes:
             if pattern.search(path):
                 return False
 
@@ -159,6 +186,27 @@ class CacheFlushRule:
         return out
 
 
+class CacheFlushMatcher:
+    """Finds the templates applicable to paths, using a list of CacheFlushRule.
+
+    Results are remembered per path, as the same paths tend to be flushed
+    repeatedly.
+    """
+
+    def __init__(self, rules: list[CacheFlushRule], maxsize: int = 50000):
+        self.rules = rules
+        self.templates_for = functools.lru_cache(maxsize=maxsize)(
+            self._templates_for
+        )
+
+    def _templates_for(self, path: str) -> tuple[str, ...]:
+        out: list[str] = []
+        for rule in self.rules:
+            if rule.matches(path):
+                out.extend(rule.templates)
+        return tuple(out)
+
+
 class Environment(object):
     def __init__(
         self,
@@ -179,6 +227,7 @@ class Environment(object):
         self.cdn_url = cdn_url
         self.cdn_key_id = cdn_key_id
         self.cache_flush_rules: list[CacheFlushRule] = cache_flush_rules or []
+        self.cache_flush_matcher = CacheFlushMatcher(self.cache_flush_rules)
 
     @property
     def cdn_private_key(self):
@@ -388,6 +437,38 @@ class Settings(BaseSettings):
     any of these values.
     """
 
+    autoindex_memo_timeout: int = 30
+    """Maximum amount of time (in days) to retain the results of an earlier
+    autoindex for reuse, after they were last generated or reused.
+    """
+
+    known_objects_max_keys: int = 200000
+    """Maximum number of object keys, per bucket, which each process remembers
+    as known to exist.
+
+    Known objects don't need to be checked for existence (e.g. by HEAD request)
+    before uploading generated content such as autoindex pages.
+
+    Can be set to 0 to disable this behavior.
+    """
+
+    cache_flush_chunk_size: int = 500
+    """Maximum number of URLs to include in a single cache flush request."""
+
+    cache_flush_concurrency: int = 4
+    """Maximum number of cache flush requests in progress at once, per flush."""
+
+    cache_flush_rate_limit: float = 5.0
+    """Maximum number of cache flush requests to start per second, per flush.
+
+    Can be set to 0 to disable rate limiting.
+    """
+
+    cache_flush_retries: int = 3
+    """Number of times a failed cache flush request will be retried before
+    the flush is considered failed.
+    """
+
     config_cache_ttl: int = 2
     """Time (in minutes) config is expected to live in components that consume it.
 
@@ -395,6 +476,17 @@ class Settings(BaseSettings):
     existing caches to expire and the newly deployed config to take effect.
     """
 
+    config_get_cache_ttl: int = 30
+    """Time (in seconds) config is cached by exodus-gw when serving
+    ``GET /{env}/config``.
+
+    Cannot exceed ``config_cache_ttl``. Deployment task completion is delayed
+    by this long in addition to ``config_cache_ttl``, since components
+    may obtain config from exodus-gw just before the cache expires.
+
+    Can be set to 0 to disable caching.
+    """
+
     worker_health_filepath: str = (
         "/tmp/exodus-gw-last-healthy"  # nosec - Bandit doesn't like that /tmp is used.
     )
@@ -411,6 +503,19 @@ class Settings(BaseSettings):
     worker_keepalive_interval: int = 60
     """How often, in seconds, should background workers update their status."""
 
+    worker_queue_concurrency: dict[str, int] = {"commit": 3, "autoindex": 2}
+    """Maximum number of messages from each named queue which a background
+    worker will process at once.
+
+    Background tasks are assigned to queues by type: ``commit`` for publish
+    commits, ``autoindex`` for generation of indexes, ``flush`` for CDN cache
+    flushes and ``default`` for everything else. Limiting the concurrency of
+    queues used for long-running bulk work ensures that some worker threads
+    always remain available for short interactive tasks.
+
+    Queues not listed here are limited only by the number of worker threads.
+    """
+
     cron_cleanup: str = "0 */12 * * *"
     """cron-style schedule for cleanup task.
 
@@ -418,10 +523,10 @@ class Settings(BaseSettings):
     data from the system."""
 
     scheduler_interval: int = 15
-    """How often, in minutes, exodus-gw should check if a scheduled task is ready to run.
+    """How often, in minutes, exodus-gw should check if a scheduled task is ready to run,
+    for tasks whose cron rule won't be triggered within the next year.
 
-    Note that the cron rules applied to each scheduled task are only as accurate as this
-    interval allows, i.e. each rule may be triggered up to ``scheduler_interval`` minutes late.
+    Other scheduled tasks are run at the exact time their cron rule is triggered.
     """
 
     scheduler_delay: int = 5
@@ -436,16 +541,51 @@ class Settings(BaseSettings):
     have been configured.
     """
 
+    cdn_flush_coalesce_window: int = 0
+    """Time, in seconds, over which CDN cache flush requests for an environment
+    are collected before being processed together.
+
+    When enabled, paths requested for flush by multiple tasks within the same
+    window are flushed only once, and each task completes only after the
+    flush has been done.
+
+    Can be set to 0 to disable this behavior, in which case every task
+    flushes cache separately.
+    """
+
     cdn_listing_flush: bool = True
     """Whether listing paths in the config should be flushed while deploying the
-    config."""
+    config. Only listings whose values have changed are flushed."""
 
     cdn_cookie_ttl: int = 60 * 720
     """Time (in seconds) cookies generated by ``cdn-redirect`` remain valid."""
 
+    cdn_cookie_reuse_window: int = 300
+    """Time (in seconds) over which cookies generated by ``cdn-redirect``
+    may be reused across requests, rather than signed anew for each request.
+
+    Cookies are reused only while their expiry time stays the same, so a
+    reused cookie remains valid for at least ``cdn_cookie_ttl`` minus this
+    window.
+
+    Can be set to 0 to disable this behavior; it is also disabled if the
+    window is not shorter than ``cdn_cookie_ttl``.
+    """
+
     cdn_signature_timeout: int = 60 * 30
     """Time (in seconds) signed URLs remain valid."""
 
+    cdn_sign_max_urls: int = 10000
+    """Maximum number of URLs which may be signed in a single request to the
+    ``cdn-sign`` endpoint."""
+
+    cdn_sign_workers: int = 4
+    """Number of threads used to sign URLs requested via the ``cdn-sign``
+    endpoint.
+
+    The threads are shared by all requests.
+    """
+
     cdn_max_expire_days: int = 365
     """Maximum permitted value for ``expire_days`` option on
     ``cdn-access`` endpoint.
@@ -455,7 +595,92 @@ class Settings(BaseSettings):
     """
 
     s3_pool_size: int = 3
-    """Number of S3 clients to cache"""
+    """Maximum number of S3 clients, per AWS profile, in each process.
+
+    Each client serves one request at a time; once this many requests are
+    using S3 clients, further requests wait for a client to be released.
+    """
+
+    s3_pool_warm_size: int = 1
+    """Number of S3 clients, per AWS profile, created in each process at
+    startup and kept even while idle.
+    """
+
+    s3_pool_idle_timeout: int = 300
+    """S3 clients left unused for longer than this (in seconds) are closed,
+    beyond those kept according to ``s3_pool_warm_size``.
+    """
+
+    upload_exists_max_keys: int = 10000
+    """Maximum number of object keys which may be checked by a single request
+    to the upload API's "exists" endpoint.
+    """
+
+    upload_exists_concurrency: int = 10
+    """Maximum number of concurrent S3 requests used by a single request to the
+    upload API's "exists" endpoint.
+    """
+
+    upload_verify_sha256: bool = True
+    """If enabled, uploaded content is checked against its object key (a SHA256
+    checksum) while being streamed to S3, and uploads of content not matching
+    the key are rejected.
+
+    Multipart uploads can only be checked if all parts are uploaded in order
+    via the same exodus-gw process; otherwise they are accepted unchecked.
+    """
+
+    upload_verify_max_uploads: int = 1000
+    """Maximum number of in-progress multipart uploads for which each process
+    tracks a running SHA256 checksum. Beyond this, the least recently used
+    uploads are accepted unchecked.
+    """
+
+    upload_presign_enabled: bool = False
+    """If enabled, clients may request presigned URLs allowing them to upload
+    content directly to S3, rather than via exodus-gw.
+    """
+
+    upload_presign_expiry: int = 900
+    """Validity period (in seconds) of presigned URLs for uploading content."""
+
+    upload_buffer_size: int = 1024 * 1024
+    """Size (in bytes) of the chunks in which uploaded content is sent to S3.
+
+    Content received in smaller chunks is buffered up to this size before
+    being sent, reducing the overhead of many small writes. Increasing this
+    increases memory usage per upload in progress.
+
+    Can be set to 0 to send content in whatever size chunks it's received.
+    """
+
+    upload_split_threshold: int = 256 * 1024 * 1024
+    """Size (in bytes) above which objects uploaded via a single PUT request are
+    written to S3 as a multipart upload managed by exodus-gw, allowing parts to
+    be uploaded concurrently and retried on failure.
+
+    Can be set to 0 to disable this behavior.
+    """
+
+    upload_split_part_size: int = 64 * 1024 * 1024
+    """Size (in bytes) of each part when exodus-gw splits an upload into parts.
+    Must be at least 5 MiB, as required by S3.
+    """
+
+    upload_split_concurrency: int = 4
+    """Maximum number of parts of a single split upload buffered or being
+    uploaded at once.
+    """
+
+    upload_split_spool_size: int = 16 * 1024 * 1024
+    """Maximum amount of each buffered part (in bytes) held in memory when
+    splitting an upload into parts; the remainder is buffered on disk.
+    """
+
+    upload_split_max_tries: int = 3
+    """Maximum number of attempts to upload each part when splitting an upload
+    into parts.
+    """
 
     model_config = SettingsConfigDict(env_prefix="exodus_gw_")
 
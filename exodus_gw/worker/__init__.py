@@ -11,7 +11,7 @@ dramatiq.set_broker(Broker())
 # pylint: disable=wrong-import-position
 
 from .autoindex import autoindex_partial  # noqa
-from .cache import flush_cdn_cache  # noqa
+from .cache import flush_cdn_cache, flush_cdn_requests  # noqa
 from .deploy import deploy_config  # noqa
 from .publish import commit  # noqa
 from .scheduled import cleanup  # noqa
@@ -6,23 +6,35 @@ import os
 import tempfile
 from datetime import datetime, timezone
 from time import monotonic
-from typing import AsyncGenerator, BinaryIO, Generator
+from typing import AsyncGenerator, BinaryIO
 
 import dramatiq
 from botocore.exceptions import ClientError
 from repo_autoindex import ContentError, Fetcher, autoindex
-from sqlalchemy import inspect
+from sqlalchemy import and_, case, func, inspect, or_
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.orm import Session, lazyload
+from sqlalchemy.orm import Session, aliased, lazyload
 
 from exodus_gw.aws.client import aioboto_session
+from exodus_gw.aws.util import known_objects
 from exodus_gw.database import db_engine
-from exodus_gw.models import Item, Publish
+from exodus_gw.models import AutoindexMemo, Item, Publish
+from exodus_gw.models.publish import web_uri_basename
 from exodus_gw.schemas import PublishStates
 from exodus_gw.settings import Environment, Settings, get_environment
 
 LOG = logging.getLogger("exodus-gw")
 
+# Paths, relative to a repo's base URI, of all files which may be read by
+# repo-autoindex when generating indexes for that repo. Index content is
+# fully determined by the content of these files.
+ENTRY_POINT_PATHS = [
+    "repodata/repomd.xml",
+    "PULP_MANIFEST",
+    "treeinfo",
+    "extra_files.json",
+]
+
 
 def object_key(content: bytes) -> str:
     hasher = hashlib.sha256()
@@ -121,67 +133,167 @@ class AutoindexEnricher:
         # Optional (Union[x, None]), doesn't have a 'query' attr.
         self.db: Session = ins.session  # type: ignore
 
-        self.item_query = self.db.query(Item).filter(
-            Item.publish_id == publish.id
+        # If set, autoindex has been requested for specific entry points.
+        self.web_uri_filter = web_uri_filter
+
+        self.known_objects = known_objects(self.env.bucket, settings)
+
+    @property
+    def uris_for_autoindex(self) -> list[str]:
+        # Finds base URIs of all repos in the publish which should have
+        # an index generated, using a single query.
+        entry = aliased(Item)
+        index = aliased(Item)
+
+        basename = web_uri_basename(entry.web_uri)
+        base_uri = case(
+            (
+                basename == "repomd.xml",
+                func.substr(
+                    entry.web_uri,
+                    1,
+                    func.length(entry.web_uri) - len("/repodata/repomd.xml"),
+                ),
+            ),
+            else_=func.substr(
+                entry.web_uri,
+                1,
+                func.length(entry.web_uri) - len("/PULP_MANIFEST"),
+            ),
         )
 
-        if web_uri_filter is not None:
-            # autoindex has been requested for specific entry points.
-            self.item_query = self.item_query.filter(
-                Item.web_uri.in_(web_uri_filter)
+        query = (
+            self.db.query(base_uri)
+            .filter(
+                entry.publish_id == self.publish.id,
+                # This matches the basename index, so only the entry points
+                # are visited rather than every item in the publish...
+                basename.in_(["repomd.xml", "PULP_MANIFEST"]),
+                # ...though repomd.xml must also be within repodata.
+                or_(
+                    basename == "PULP_MANIFEST",
+                    entry.web_uri.like("%/repodata/repomd.xml"),
+                ),
+                entry.object_key != "absent",
             )
+            .distinct()
+            .order_by(base_uri)
+        )
 
-    @property
-    def repomd_xml_items(self) -> list[Item]:
-        return self.item_query.filter(
-            Item.web_uri.like("%/repodata/repomd.xml"),
-            Item.object_key != "absent",
-        ).all()
+        if self.web_uri_filter is not None:
+            query = query.filter(entry.web_uri.in_(self.web_uri_filter))
+        else:
+            # Skip any repos which already have an index, e.g. because
+            # autoindex_partial already handled them, or we were interrupted
+            # partway through before.
+            #
+            # This is not done when specific entry points were requested,
+            # as that means the entry points may have just been updated and
+            # any existing index could be stale.
+            query = query.outerjoin(
+                index,
+                and_(
+                    index.publish_id == entry.publish_id,
+                    index.web_uri
+                    == base_uri.concat(f"/{self.settings.autoindex_filename}"),
+                ),
+            ).filter(index.id == None)
+
+        out = [row[0] for row in query]
+        for repo_base_uri in out:
+            LOG.debug(
+                "Should generate index for %s",
+                repo_base_uri,
+                extra={"event": "publish"},
+            )
 
-    @property
-    def pulp_manifest_items(self) -> list[Item]:
-        return self.item_query.filter(
-            Item.web_uri.like("%/PULP_MANIFEST"),
-            Item.object_key != "absent",
-        ).all()
+        return out
 
-    @property
-    def repo_base_uris(self) -> Generator[str, None, None]:
-        yielded = set()
+    def entry_point_key(self, base_uri: str) -> str:
+        # Returns a key identifying the content of all entry points
+        # under base_uri in this publish. If two publishes produce the
+        # same key for a repo, they will generate identical indexes.
+        uris = [f"{base_uri}/{path}" for path in ENTRY_POINT_PATHS]
+        rows = (
+            self.db.query(Item.web_uri, Item.object_key)
+            .filter(
+                Item.publish_id == self.publish.id,
+                Item.web_uri.in_(uris),
+                Item.object_key != "absent",
+            )
+            .order_by(Item.web_uri)
+            .all()
+        )
 
-        for item in self.repomd_xml_items:
-            repomd_uri: str = item.web_uri[: -len("/repodata/repomd.xml")]
-            if repomd_uri not in yielded:
-                yielded.add(repomd_uri)
-                yield repomd_uri
+        hasher = hashlib.sha256()
+        # The index filename is included since it's a part of every
+        # generated item.
+        hasher.update(self.settings.autoindex_filename.encode())
+        for web_uri, key in rows:
+            hasher.update(f"\0{web_uri}\0{key}".encode())
+        return hasher.hexdigest()
+
+    def memoized_items(
+        self, base_uri: str, entry_point_key: str
+    ) -> list[Item] | None:
+        # Returns the items generated by an earlier autoindex of base_uri,
+        # if any, and only if they were generated from the same entry points.
+        memo = (
+            self.db.query(AutoindexMemo)
+            .filter(
+                AutoindexMemo.env == self.env_name,
+                AutoindexMemo.base_uri == base_uri,
+                AutoindexMemo.entry_point_key == entry_point_key,
+            )
+            .first()
+        )
+        if not memo:
+            return None
 
-        for item in self.pulp_manifest_items:
-            manifest_uri: str = item.web_uri[: -len("/PULP_MANIFEST")]
-            if manifest_uri not in yielded:
-                yielded.add(manifest_uri)
-                yield manifest_uri
+        memo.updated = datetime.now(tz=timezone.utc)
 
-    @property
-    def uris_for_autoindex(self) -> list[str]:
-        out = []
-
-        for repo_base_uri in self.repo_base_uris:
-            index_uri = f"{repo_base_uri}/{self.settings.autoindex_filename}"
-            if self.item_query.filter(Item.web_uri == index_uri).count():
-                LOG.debug(
-                    "Index at %s already exists",
-                    index_uri,
-                    extra={"event": "publish"},
-                )
-            else:
-                LOG.debug(
-                    "Should generate index for %s",
-                    repo_base_uri,
-                    extra={"event": "publish"},
-                )
-                out.append(repo_base_uri)
+        return [
+            self.index_item(memo_item["web_uri"], memo_item["object_key"])
+            for memo_item in memo.items
+        ]
 
-        return out
+    def save_memo(
+        self, base_uri: str, entry_point_key: str, items: list[Item]
+    ):
+        # Record the items generated for base_uri so that they can be
+        # reused by later publishes with the same entry points.
+        statement = insert(AutoindexMemo).values(
+            [
+                {
+                    "env": self.env_name,
+                    "base_uri": base_uri,
+                    "entry_point_key": entry_point_key,
+                    "items": [
+                        {
+                            "web_uri": item.web_uri,
+                            "object_key": item.object_key,
+                        }
+                        for item in items
+                    ],
+                    "updated": datetime.now(tz=timezone.utc),
+                }
+            ]
+        )
+
+        statement = statement.on_conflict_do_update(
+            index_elements=["env", "base_uri"],
+            set_={c.name: c for c in statement.excluded if not c.primary_key},
+        )
+
+        self.db.execute(statement)
+
+    def index_item(self, web_uri: str, content_key: str) -> Item:
+        return Item(
+            web_uri=web_uri,
+            object_key=content_key,
+            content_type="text/html; charset=UTF-8",
+            publish_id=self.publish.id,
+        )
 
     def fetcher_for_client(self, s3_client) -> PublishContentFetcher:
         return PublishContentFetcher(
@@ -192,9 +304,14 @@ class AutoindexEnricher:
         )
 
     async def object_exists(self, s3_client, key: str) -> bool:
+        if key in self.known_objects:
+            # Already seen to exist, no need to ask S3 again.
+            return True
+
         try:
             await s3_client.head_object(Bucket=self.env.bucket, Key=key)
             # Any successful response indicates that the object exists.
+            self.known_objects.add(key)
             return True
         except ClientError as exc_info:
             code = (exc_info.response.get("Error") or {}).get("Code") or 500
@@ -245,6 +362,7 @@ class AutoindexEnricher:
                     Bucket=self.env.bucket,
                     Key=content_key,
                 )
+                self.known_objects.add(content_key)
 
                 LOG.info(
                     "Uploaded autoindex %s => %s (ETag: %s)",
@@ -254,13 +372,7 @@ class AutoindexEnricher:
                     extra={"event": "publish", "success": True},
                 )
 
-            item = Item(
-                web_uri=web_uri,
-                object_key=content_key,
-                content_type="text/html; charset=UTF-8",
-                publish_id=self.publish.id,
-            )
-            yield item
+            yield self.index_item(web_uri, content_key)
 
         duration = monotonic() - before
         LOG.info(
@@ -323,7 +435,27 @@ class AutoindexEnricher:
         ) as s3_client:
             fetcher = self.fetcher_for_client(s3_client)
             for base_uri in uris:
+                entry_point_key = self.entry_point_key(base_uri)
+
+                memo_items = self.memoized_items(base_uri, entry_point_key)
+                if memo_items is not None:
+                    # The same entry points were indexed before, so the
+                    # earlier result can be used without generating anything.
+                    for item in memo_items:
+                        self.upsert_item(item)
+                    self.db.commit()
+                    count += len(memo_items)
+
+                    LOG.info(
+                        "autoindex of %s: reused %s item(s) from earlier run",
+                        base_uri,
+                        len(memo_items),
+                        extra={"event": "publish", "success": True},
+                    )
+                    continue
+
                 try:
+                    generated: list[Item] = []
                     async for item in self.autoindex_items(
                         s3_client, fetcher, base_uri
                     ):
@@ -332,6 +464,10 @@ class AutoindexEnricher:
                         # interrupted, we won't lose the progress made so far.
                         self.db.commit()
                         count += 1
+                        generated.append(item)
+
+                    self.save_memo(base_uri, entry_point_key, generated)
+                    self.db.commit()
                 except ContentError:
                     # If we get here it means an index couldn't be generated due to
                     # problems in the content being published; for example, a yum repo
@@ -356,6 +492,7 @@ class AutoindexEnricher:
 
 
 @dramatiq.actor(
+    queue_name="autoindex",
     time_limit=Settings().actor_time_limit,
     max_backoff=Settings().actor_max_backoff,
 )
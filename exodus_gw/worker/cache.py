@@ -1,10 +1,16 @@
 import logging
 import os
 import re
+import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from datetime import datetime
+from time import monotonic, sleep
+from typing import Any
 
 import dramatiq
 import fastpurge
+from dramatiq.common import current_millis
 from dramatiq.middleware import CurrentMessage
 from sqlalchemy.orm import Session
 
@@ -12,11 +18,20 @@ from exodus_gw import models
 from exodus_gw.aws.dynamodb import DynamoDB
 from exodus_gw.aws.util import uris_with_aliases
 from exodus_gw.database import db_engine
+from exodus_gw.dramatiq import Broker
 from exodus_gw.schemas import TaskStates
 from exodus_gw.settings import Settings, get_environment
 
+from .progress import ProgressLogger
+
 LOG = logging.getLogger("exodus-gw")
 
+# Arbitrary constant UUID used as namespace when calculating message IDs
+# for processing of flush requests.
+FLUSH_REQUESTS_NS = uuid.UUID("3f0b7f6e94a24e8c9d3b5a1c27e6d410")
+
+OSTREE_REF_RE = re.compile(r".*/ostree/repo/refs/heads/.*/(base|standard)$")
+
 
 def exclude_path(path: str) -> bool:
     # Returns True for certain paths which should be excluded from cache flushing.
@@ -57,13 +72,12 @@ class Flusher:
         # This logic was originally sourced from rhsm-akamai-cache-purge.
 
         ttl = "30d"  # default ttl
-        ostree_re = r".*/ostree/repo/refs/heads/.*/(base|standard)$"
         if path.endswith(("/repodata/repomd.xml", "/")):
             ttl = "4h"
         elif (
             path.endswith(("/PULP_MANIFEST", "/listing"))
             or ("/repodata/" in path)
-            or re.match(ostree_re, path)
+            or OSTREE_REF_RE.match(path)
         ):
             ttl = "10m"
 
@@ -83,18 +97,18 @@ class Flusher:
 
         for path in path_list:
             # Figure out the templates applicable to this path
-            templates: list[str] = []
-            for rule in self.env.cache_flush_rules:
-                if rule.matches(path):
-                    templates.extend(rule.templates)
+            templates = self.env.cache_flush_matcher.templates_for(path)
+            if not templates:
+                continue
 
+            ttl = self.arl_ttl(path)
             for template in templates:
                 if "{path}" in template:
                     # interpret as a template with placeholders
                     out.append(
                         template.format(
                             path=path.removeprefix("/"),
-                            ttl=self.arl_ttl(path),
+                            ttl=ttl,
                         )
                     )
                 else:
@@ -108,8 +122,26 @@ class Flusher:
             LOG.info("fastpurge is not enabled for %s", self.env.name)
             return
 
+        chunk_size = max(self.settings.cache_flush_chunk_size, 1)
+        concurrency = max(self.settings.cache_flush_concurrency, 1)
+        retries = self.settings.cache_flush_retries
+        rate_limit = self.settings.cache_flush_rate_limit
+        min_interval = 1.0 / rate_limit if rate_limit > 0 else 0.0
+
+        # Chunks yet to be submitted, along with the number of
+        # attempts made so far for each.
+        queue: deque[tuple[list[str], int]] = deque(
+            (urls[i : i + chunk_size], 0)
+            for i in range(0, len(urls), chunk_size)
+        )
+
+        LOG.info(
+            "fastpurge: flushing %s URL(s) in %s request(s)",
+            len(urls),
+            len(queue),
+        )
         for url in urls:
-            LOG.info("fastpurge: flushing", extra=dict(url=url))
+            LOG.debug("fastpurge: flushing", extra=dict(url=url))
 
         fp = fastpurge.FastPurgeClient(
             auth=dict(
@@ -120,10 +152,56 @@ class Flusher:
             )
         )
 
-        responses = fp.purge_by_url(urls).result()
+        progress = ProgressLogger("Flushing CDN cache", items_total=len(urls))
+        running: dict[Future[Any], tuple[list[str], int]] = {}
+        last_start: float | None = None
+        requests = 0
+
+        while queue or running:
+            # Start as many requests as we're allowed to...
+            while queue and len(running) < concurrency:
+                if min_interval and last_start is not None:
+                    delay = last_start + min_interval - monotonic()
+                    if delay > 0:
+                        sleep(delay)
+
+                chunk, attempts = queue.popleft()
+                last_start = monotonic()
+                requests += 1
+                running[fp.purge_by_url(chunk)] = (chunk, attempts + 1)
+
+            # ...then wait for any of them to finish.
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for f in done:
+                chunk, attempts = running.pop(f)
+
+                if exc := f.exception():
+                    if attempts > retries:
+                        LOG.error(
+                            "fastpurge: request for %s URL(s) failed after %s attempt(s)",
+                            len(chunk),
+                            attempts,
+                        )
+                        raise exc
+
+                    LOG.warning(
+                        "fastpurge: request for %s URL(s) failed, will retry: %s",
+                        len(chunk),
+                        exc,
+                    )
+                    queue.append((chunk, attempts))
+                    continue
+
+                for r in f.result():
+                    LOG.info("fastpurge: response", extra=dict(response=r))
+                progress.update(len(chunk))
 
-        for r in responses:
-            LOG.info("fastpurge: response", extra=dict(response=r))
+        LOG.info(
+            "fastpurge: flushed %s URL(s) using %s request(s) in %.02f second(s)",
+            len(urls),
+            requests,
+            monotonic() - progress.start_time,
+        )
 
     def run(self):
         urls = self.urls_for_flush
@@ -137,6 +215,77 @@ class Flusher:
         )
 
 
+def request_flush(
+    db: Session,
+    env: str,
+    paths: list[str],
+    settings: Settings,
+    task_id: str | None = None,
+):
+    """Request a CDN cache flush to be processed together with any other
+    requests for the same environment, within cdn_flush_coalesce_window.
+
+    ``paths`` must already have had alias resolution applied.
+
+    If ``task_id`` is provided, that task will be marked as complete once
+    the flush has been done. The caller should not complete the task itself.
+
+    The request is added to ``db`` and the caller is responsible for
+    committing.
+    """
+    db.add(
+        models.CdnFlushRequest(
+            id=str(uuid.uuid4()),
+            env=env,
+            paths=sorted(set(paths)),
+            task_id=task_id,
+            created=datetime.utcnow(),
+        )
+    )
+
+    LOG.info(
+        "Requested flush of %s path(s) for %s",
+        len(paths),
+        env,
+        extra={"event": "cache"},
+    )
+
+    schedule_flush_requests(db, env, settings)
+
+
+def schedule_flush_requests(db: Session, env: str, settings: Settings):
+    # Ensures flush requests for env will be processed at the end of the
+    # current window.
+    #
+    # Every request made within a window shares a single message, keyed
+    # by the env and the end of the window. Since that message can't run
+    # until the window has ended, any request made during a window is
+    # certain to be processed by that window's message.
+    window = max(settings.cdn_flush_coalesce_window, 1) * 1000
+    now = current_millis()
+    window_end = (now // window + 1) * window
+
+    message_id = str(uuid.uuid5(FLUSH_REQUESTS_NS, f"{env}-{window_end}"))
+    if db.get(models.DramatiqMessage, message_id):
+        # Already scheduled.
+        return
+
+    message = flush_cdn_requests.message_with_options(
+        kwargs={"env": env}
+    ).copy(message_id=message_id)
+
+    broker = dramatiq.get_broker()
+    assert isinstance(broker, Broker)
+
+    # Enqueue using the caller's session, so the message is committed
+    # together with the request.
+    broker.set_session(db)
+    try:
+        broker.enqueue(message, delay=window_end - now)
+    finally:
+        broker.set_session(None)
+
+
 def load_task(db: Session, task_id: str):
     return (
         db.query(models.Task)
@@ -147,6 +296,7 @@ def load_task(db: Session, task_id: str):
 
 
 @dramatiq.actor(
+    queue_name="flush",
     time_limit=Settings().actor_time_limit,
     max_backoff=Settings().actor_max_backoff,
 )
@@ -190,6 +340,19 @@ def flush_cdn_cache(
         env_obj=get_environment(env, settings),
     )
 
+    if settings.cdn_flush_coalesce_window:
+        # Flush together with any other requests. The task will be
+        # completed once that's done.
+        request_flush(
+            db,
+            env,
+            uris_with_aliases(paths, ddb.aliases_for_flush),
+            settings,
+            task_id=task.id,
+        )
+        db.commit()
+        return
+
     flusher = Flusher(
         paths=paths,
         settings=settings,
@@ -200,3 +363,72 @@ def flush_cdn_cache(
 
     task.state = TaskStates.complete
     db.commit()
+
+
+@dramatiq.actor(
+    queue_name="flush",
+    time_limit=Settings().actor_time_limit,
+    max_backoff=Settings().actor_max_backoff,
+)
+def flush_cdn_requests(
+    env: str,
+    settings: Settings = Settings(),
+) -> None:
+    """Process all pending flush requests for an environment at once.
+
+    This actor is a hidden implementation detail of cdn_flush_coalesce_window
+    and does not update any user-visible task of its own.
+    """
+    db = Session(bind=db_engine(settings))
+
+    requests = (
+        db.query(models.CdnFlushRequest)
+        .filter(models.CdnFlushRequest.env == env)
+        .with_for_update()
+        .all()
+    )
+    if not requests:
+        LOG.debug("No flush requests pending for %s", env)
+        return
+
+    paths: set[str] = set()
+    for request in requests:
+        paths.update(request.paths)
+
+    LOG.info(
+        "Flushing %s path(s) for %s from %s request(s)",
+        len(paths),
+        env,
+        len(requests),
+        extra={"event": "cache"},
+    )
+
+    flusher = Flusher(
+        paths=sorted(paths),
+        settings=settings,
+        env=env,
+        # Requests contain paths with aliases already resolved.
+        aliases=[],
+    )
+    flusher.run()
+
+    # Complete any tasks which were waiting for the flush. Tasks may
+    # have already moved on, e.g. if they failed in the meantime, in which
+    # case they're left alone.
+    task_ids = [r.task_id for r in requests if r.task_id]
+    if task_ids:
+        db.query(models.Task).filter(
+            models.Task.id.in_(task_ids),
+            models.Task.state == TaskStates.in_progress,
+        ).update(
+            {
+                models.Task.state: TaskStates.complete,
+                models.Task.updated: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+
+    for request in requests:
+        db.delete(request)
+
+    db.commit()
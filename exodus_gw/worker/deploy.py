@@ -1,8 +1,10 @@
 import logging
+from collections.abc import Iterator
 from typing import Any
 
 import dramatiq
 from dramatiq.middleware import CurrentMessage
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from exodus_gw import models, schemas
@@ -10,7 +12,7 @@ from exodus_gw.aws.dynamodb import DynamoDB
 from exodus_gw.database import db_engine
 from exodus_gw.settings import Settings
 
-from .cache import Flusher
+from .cache import Flusher, request_flush
 
 LOG = logging.getLogger("exodus-gw")
 
@@ -39,6 +41,13 @@ def complete_deploy_config_task(
         )
         return
 
+    if env and flush_paths and settings.cdn_flush_coalesce_window:
+        # Flush together with any other requests. The task will be
+        # completed once that's done.
+        request_flush(db, env, flush_paths, settings, task_id=task.id)
+        db.commit()
+        return
+
     if env and flush_paths:
         flusher = Flusher(
             paths=flush_paths,
@@ -61,13 +70,55 @@ def complete_deploy_config_task(
     )
 
 
-def _listing_paths_for_flush(config: dict[str, Any]) -> set[str]:
-    # extract listing paths from config that might have
-    # updated values influencing the response of /listing
-    # endpoint
+def _published_paths_under(
+    db: Session, env: str, prefixes: list[str]
+) -> Iterator[str]:
+    # Yields web_uri of all published paths in env underneath any of the
+    # given prefixes, using a single query.
+    if not prefixes:
+        return
+
+    def like_pattern(prefix: str) -> str:
+        escaped = (
+            prefix.replace("\\", "\\\\")
+            .replace("%", "\\%")
+            .replace("_", "\\_")
+        )
+        return f"{escaped}/%"
+
+    query = (
+        db.query(models.PublishedPath.web_uri).filter(
+            models.PublishedPath.env == env,
+            or_(
+                *[
+                    models.PublishedPath.web_uri.like(
+                        like_pattern(prefix), escape="\\"
+                    )
+                    for prefix in prefixes
+                ]
+            ),
+        )
+        # There may be many matching paths, so stream them.
+        .execution_options(yield_per=1000)
+    )
+    for (web_uri,) in query:
+        yield web_uri
+
+
+def _listing_paths_for_flush(
+    config: dict[str, Any], original_config: dict[str, Any]
+) -> set[str]:
+    # extract listing paths from config that have updated values
+    # influencing the response of /listing endpoint, compared to
+    # the original config
     listing_paths: set[str] = set()
 
-    for path in config.get("listing", {}).keys():
+    listing = config.get("listing", {})
+    original_listing = original_config.get("listing", {})
+
+    for path in set(listing).union(original_listing):
+        if listing.get(path) == original_listing.get(path):
+            continue
         lpath = path + "/listing"
         LOG.info(
             "Listing %s will flush cache for %s",
@@ -94,6 +145,7 @@ def deploy_config(
     ddb = DynamoDB(env, settings, from_date)
 
     original_aliases = {src: dest for (src, dest) in ddb.aliases_for_flush}
+    original_config = ddb.definitions
 
     message = CurrentMessage.get_current_message()
     assert message
@@ -142,30 +194,38 @@ def deploy_config(
     # URLs depending on what changed in the config.
     flush_paths: set[str] = set()
 
-    for src, updated_dest in ddb.aliases_for_flush:
-        if original_aliases.get(src) != updated_dest:
-            for published_path in db.query(models.PublishedPath).filter(
-                models.PublishedPath.env == env,
-                models.PublishedPath.web_uri.like(f"{src}/%"),
-            ):
+    updated_aliases = list(
+        dict.fromkeys(
+            src
+            for src, updated_dest in ddb.aliases_for_flush
+            if original_aliases.get(src) != updated_dest
+        )
+    )
+    for web_uri in _published_paths_under(db, env, updated_aliases):
+        for src in updated_aliases:
+            if web_uri.startswith(f"{src}/"):
                 LOG.info(
                     "Updated alias %s will flush cache for %s",
                     src,
-                    published_path.web_uri,
+                    web_uri,
                     extra={"event": "deploy"},
                 )
-                flush_paths.add(published_path.web_uri)
+        flush_paths.add(web_uri)
 
-    # Include all the listing paths for flush when enabled in settings
+    # Include any updated listing paths for flush when enabled in settings
     flush_paths = (
-        flush_paths.union(_listing_paths_for_flush(config))
+        flush_paths.union(_listing_paths_for_flush(config, original_config))
         if settings.cdn_listing_flush
         else flush_paths
     )
 
     # TTL must be sent in milliseconds but the setting is in minutes for
-    # convenience and consistency with other components.
-    ttl = settings.config_cache_ttl * 60000
+    # convenience and consistency with other components. Components may
+    # have obtained config from exodus-gw's own cache, so that must expire
+    # too.
+    ttl = settings.config_cache_ttl * 60000 + 1000 * min(
+        settings.config_get_cache_ttl, settings.config_cache_ttl * 60
+    )
     msg = complete_deploy_config_task.send_with_options(
         kwargs={
             "task_id": str(task.id),
@@ -27,7 +27,7 @@ from exodus_gw.schemas import PublishStates, TaskStates
 from exodus_gw.settings import Settings, get_environment
 
 from .autoindex import AutoindexEnricher
-from .cache import Flusher
+from .cache import Flusher, request_flush
 from .progress import ProgressLogger
 
 LOG = logging.getLogger("exodus-gw")
@@ -463,9 +463,28 @@ class CommitPhase2(CommitBase):
         super().__init__(*args, **kwargs)
 
         self.flush_paths: list[str] = []
+        self.flush_requested = False
 
     def flush_cache(self) -> None:
-        if self.settings.cdn_flush_on_commit:
+        if not self.settings.cdn_flush_on_commit:
+            return
+
+        if self.settings.cdn_flush_coalesce_window:
+            if self.flush_paths:
+                # Flush together with any other requests. The request is
+                # committed along with the rest of the commit, and the
+                # task will be completed once the flush has been done.
+                request_flush(
+                    self.db,
+                    self.env,
+                    uris_with_aliases(
+                        self.flush_paths, self.dynamodb.aliases_for_flush
+                    ),
+                    self.settings,
+                    task_id=self.task.id,
+                )
+                self.flush_requested = True
+        else:
             flusher = Flusher(
                 self.flush_paths,
                 self.settings,
@@ -531,6 +550,10 @@ class CommitPhase2(CommitBase):
     def on_succeeded(self):
         super().on_succeeded()
 
+        if self.flush_requested:
+            # Task isn't complete until the requested flush is done.
+            self.task.state = TaskStates.in_progress
+
         # Record info on the published paths using an upsert.
         updated_paths = uris_with_aliases(
             self.flush_paths, self.dynamodb.aliases_for_flush
@@ -559,6 +582,7 @@ class CommitPhase2(CommitBase):
 
 
 @dramatiq.actor(
+    queue_name="commit",
     time_limit=Settings().actor_time_limit,
     max_backoff=Settings().actor_max_backoff,
 )
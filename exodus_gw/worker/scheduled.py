@@ -5,7 +5,7 @@ import dramatiq
 from sqlalchemy.orm import Session, noload
 
 from exodus_gw.database import db_engine
-from exodus_gw.models import Item, Publish, PublishedPath, Task
+from exodus_gw.models import AutoindexMemo, Item, Publish, PublishedPath, Task
 from exodus_gw.schemas import PublishStates, TaskStates
 from exodus_gw.settings import Settings
 
@@ -23,6 +23,7 @@ class Janitor:
         self.fix_abandoned()
         self.clean_old_publishes()
         self.clean_old_paths()
+        self.clean_old_autoindex_memos()
 
         self.db.commit()
 
@@ -144,6 +145,24 @@ class Janitor:
 
             self.db.delete(instance)
 
+    def clean_old_autoindex_memos(self):
+        # Deletes AutoindexMemo records which have not been used recently.
+        threshold = self.now - timedelta(
+            days=self.settings.autoindex_memo_timeout
+        )
+
+        for instance in self.db.query(AutoindexMemo).filter(
+            AutoindexMemo.updated < threshold,
+        ):
+            LOG.info(
+                "AutoindexMemo %s: cleaning old data (last updated: %s)",
+                (instance.env, instance.base_uri),
+                instance.updated,
+                extra={"event": "cleanup"},
+            )
+
+            self.db.delete(instance)
+
 
 @dramatiq.actor(scheduled=True)
 def cleanup():
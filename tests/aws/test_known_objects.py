@@ -0,0 +1,43 @@
+from exodus_gw.aws.util import KnownObjects, known_objects
+from exodus_gw.settings import load_settings
+
+
+def test_known_objects_bounded():
+    """KnownObjects forgets the least recently used keys once full."""
+
+    known = KnownObjects(maxsize=2)
+
+    known.add("key1")
+    known.add("key2")
+    assert "key1" in known
+
+    # key2 is now the least recently used, so it's dropped.
+    known.add("key3")
+    assert len(known) == 2
+    assert "key1" in known
+    assert "key2" not in known
+    assert "key3" in known
+
+
+def test_known_objects_disabled():
+    """KnownObjects with a maxsize of 0 never remembers anything."""
+
+    known = KnownObjects(maxsize=0)
+    known.add("key1")
+
+    assert "key1" not in known
+
+
+def test_known_objects_per_bucket():
+    """known_objects returns a separate, shared record per bucket."""
+
+    settings = load_settings()
+
+    known_objects("bucket1", settings).add("key1")
+
+    assert "key1" in known_objects("bucket1", settings)
+    assert "key1" not in known_objects("bucket2", settings)
+    assert (
+        known_objects("bucket1", settings).maxsize
+        == settings.known_objects_max_keys
+    )
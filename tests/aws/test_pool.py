@@ -0,0 +1,122 @@
+import asyncio
+
+import mock
+import pytest
+
+from exodus_gw.aws.pool import S3ClientPool
+
+
+class FakeClient:
+    def __init__(self, profile, max_connections):
+        self.profile = profile
+        self.max_connections = max_connections
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_client():
+    with mock.patch("exodus_gw.aws.pool.S3ClientWrapper", FakeClient):
+        yield
+
+
+async def test_pool_lazy():
+    """Clients are created only when needed, up to the maximum."""
+
+    pool = S3ClientPool("profile", maxsize=2, max_connections=7)
+    assert pool.size == 0
+
+    client1 = await pool.acquire()
+    assert pool.size == 1
+    assert client1.profile == "profile"
+    assert client1.max_connections == 7
+
+    # Released clients are reused rather than creating more.
+    await pool.release(client1)
+    assert await pool.acquire() is client1
+
+    client2 = await pool.acquire()
+    assert client2 is not client1
+    assert pool.size == 2
+    assert pool.created == 2
+    assert pool.wait.count == 3
+
+
+async def test_pool_waits_when_full():
+    """Requests wait for a client once the maximum is in use."""
+
+    pool = S3ClientPool("profile", maxsize=1)
+    client = await pool.acquire()
+
+    waiter = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0.01)
+
+    # It should be waiting, rather than creating a new client.
+    assert not waiter.done()
+    assert pool.waiting == 1
+
+    await pool.release(client)
+    assert await waiter is client
+    assert pool.waiting == 0
+    assert pool.size == 1
+
+
+async def test_pool_discards_broken():
+    """Clients released with an error are closed and not reused."""
+
+    pool = S3ClientPool("profile", maxsize=1)
+    client = await pool.acquire()
+
+    waiter = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0.01)
+
+    error = RuntimeError("simulated error")
+    await pool.release(client, (type(error), error, None))
+
+    # Waiter should get a new client.
+    new_client = await waiter
+    assert new_client is not client
+    assert client.closed
+    assert pool.discarded == 1
+    assert pool.size == 1
+
+
+async def test_pool_reaps_idle():
+    """Clients left idle for too long are closed, down to the minimum."""
+
+    pool = S3ClientPool("profile", maxsize=3, minsize=1, idle_timeout=60)
+    clients = [await pool.acquire() for _ in range(3)]
+    for client in clients:
+        await pool.release(client)
+
+    with mock.patch("time.monotonic", return_value=10**9):
+        client = await pool.acquire()
+
+    # Only the most recently used client should have been kept.
+    assert client is clients[-1]
+    assert [c.closed for c in clients] == [True, True, False]
+    assert pool.size == 1
+
+
+async def test_pool_warm():
+    """Pool can be warmed up in advance of requests."""
+
+    pool = S3ClientPool("profile", maxsize=3)
+    await pool.warm(2)
+
+    assert pool.size == 2
+    assert pool.idle == 2
+
+    # Warming again does nothing if enough clients exist.
+    await pool.warm(2)
+    assert pool.created == 2
+
+    # Closing the pool closes all idle clients.
+    await pool.close()
+    assert pool.size == 0
+    assert pool.idle == 0
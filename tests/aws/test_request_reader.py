@@ -1,6 +1,8 @@
+import hashlib
+
 import pytest
 
-from exodus_gw.aws.util import RequestReader
+from exodus_gw.aws.util import DigestMismatch, RequestReader
 
 
 class FakeRequest:
@@ -34,3 +36,99 @@ def test_no_blocking_operations():
     reader = RequestReader.get_reader(request)
     with pytest.raises(NotImplementedError):
         reader.read(123)
+
+
+async def test_hashed_stream():
+    """Reader can hash content as it streams, passing on the digest."""
+
+    request = FakeRequest([b"first ", b"second ", b"third"])
+    digests = []
+
+    reader = RequestReader.get_reader(
+        request,
+        sha256=hashlib.sha256(),
+        expected_sha256=hashlib.sha256(b"first second third").hexdigest(),
+        on_digest=digests.append,
+    )
+
+    content = b"".join([chunk async for chunk in reader])
+    assert content == b"first second third"
+
+    assert [d.hexdigest() for d in digests] == [
+        hashlib.sha256(b"first second third").hexdigest()
+    ]
+    assert not reader.digest_mismatch
+
+
+async def test_hashed_stream_continues():
+    """Reader can continue hashing from an earlier hash state."""
+
+    request = FakeRequest([b"second ", b"third"])
+    digests = []
+
+    reader = RequestReader.get_reader(
+        request,
+        sha256=hashlib.sha256(b"first "),
+        on_digest=digests.append,
+    )
+
+    content = b"".join([chunk async for chunk in reader])
+    assert content == b"second third"
+
+    assert [d.hexdigest() for d in digests] == [
+        hashlib.sha256(b"first second third").hexdigest()
+    ]
+
+
+async def test_hashed_stream_mismatch():
+    """Reader raises on mismatch without yielding the final chunk."""
+
+    request = FakeRequest([b"first ", b"second ", b"third"])
+    expected = hashlib.sha256(b"something else").hexdigest()
+
+    reader = RequestReader.get_reader(
+        request, sha256=hashlib.sha256(), expected_sha256=expected
+    )
+
+    chunks = []
+    with pytest.raises(DigestMismatch) as exc_info:
+        async for chunk in reader:
+            chunks.append(chunk)
+
+    # It should not have passed on all of the content
+    assert chunks == [b"first ", b"second "]
+
+    # It should tell us what went wrong
+    assert reader.digest_mismatch
+    assert expected in str(exc_info.value)
+
+
+async def test_buffered_stream():
+    """Reader can coalesce small chunks into larger ones."""
+
+    request = FakeRequest([b"a", b"bc", b"def", b"", b"ghij", b"k"])
+
+    reader = RequestReader.get_reader(request, buffer_size=3)
+
+    chunks = [chunk async for chunk in reader]
+    assert chunks == [b"abc", b"def", b"ghij", b"k"]
+
+
+async def test_buffered_hashed_stream_mismatch():
+    """Reader holds back the final buffered chunk on mismatch."""
+
+    request = FakeRequest([b"a", b"bc", b"def", b"gh"])
+
+    reader = RequestReader.get_reader(
+        request,
+        buffer_size=3,
+        sha256=hashlib.sha256(),
+        expected_sha256=hashlib.sha256(b"something else").hexdigest(),
+    )
+
+    chunks = []
+    with pytest.raises(DigestMismatch):
+        async for chunk in reader:
+            chunks.append(chunk)
+
+    assert chunks == [b"abc", b"def"]
@@ -0,0 +1,106 @@
+import hashlib
+
+from exodus_gw.aws.util import UploadDigests
+
+
+def hash_part(digests, upload_id, part_number, content):
+    # Simulates a successful upload of one part.
+    hasher = digests.start_part(upload_id, part_number)
+    if hasher is not None:
+        hasher = hasher.copy()
+        hasher.update(content)
+    digests.end_part(upload_id, part_number, hasher)
+
+
+def test_digest_in_order():
+    """Digest is calculated for parts uploaded in order."""
+
+    digests = UploadDigests(maxsize=10)
+
+    hash_part(digests, "upload1", 1, b"first ")
+    hash_part(digests, "upload1", 2, b"second")
+
+    assert (
+        digests.pop("upload1", 2)
+        == hashlib.sha256(b"first second").hexdigest()
+    )
+
+    # Once popped, the upload is forgotten.
+    assert digests.pop("upload1", 2) is None
+
+
+def test_digest_part_count_mismatch():
+    """Digest is not returned if not all parts were hashed."""
+
+    digests = UploadDigests(maxsize=10)
+
+    hash_part(digests, "upload1", 1, b"first ")
+
+    assert digests.pop("upload1", 2) is None
+
+
+def test_digest_retried_part():
+    """A part which failed may be retried."""
+
+    digests = UploadDigests(maxsize=10)
+
+    hash_part(digests, "upload1", 1, b"first ")
+
+    assert digests.start_part("upload1", 2) is not None
+    digests.end_part("upload1", 2)
+
+    hash_part(digests, "upload1", 2, b"second")
+
+    assert (
+        digests.pop("upload1", 2)
+        == hashlib.sha256(b"first second").hexdigest()
+    )
+
+
+def test_digest_out_of_order():
+    """Parts uploaded out of order make an upload unverifiable."""
+
+    digests = UploadDigests(maxsize=10)
+
+    hash_part(digests, "upload1", 1, b"first ")
+    assert digests.start_part("upload1", 3) is None
+
+    # Even after the missing part arrives.
+    assert digests.start_part("upload1", 2) is None
+    assert digests.pop("upload1", 3) is None
+
+    # An upload not starting from part 1 is never tracked.
+    assert digests.start_part("upload2", 2) is None
+    assert digests.pop("upload2", 2) is None
+
+
+def test_digest_concurrent_parts():
+    """Parts uploaded concurrently make an upload unverifiable."""
+
+    digests = UploadDigests(maxsize=10)
+
+    assert digests.start_part("upload1", 1) is not None
+    assert digests.start_part("upload1", 2) is None
+
+    digests.end_part("upload1", 1, hashlib.sha256(b"first "))
+    assert digests.pop("upload1", 2) is None
+
+
+def test_digest_bounded():
+    """UploadDigests forgets the least recently used uploads once full."""
+
+    digests = UploadDigests(maxsize=1)
+
+    hash_part(digests, "upload1", 1, b"first")
+    hash_part(digests, "upload2", 1, b"second")
+
+    assert digests.pop("upload1", 1) is None
+    assert digests.pop("upload2", 1) == hashlib.sha256(b"second").hexdigest()
+
+
+def test_digest_disabled():
+    """UploadDigests with a maxsize of 0 never tracks anything."""
+
+    digests = UploadDigests(maxsize=0)
+
+    assert digests.start_part("upload1", 1) is None
@@ -33,6 +33,20 @@ def mock_aws_client():
         yield aws_client
 
 
+@pytest.fixture(autouse=True)
+def clean_known_objects():
+    """Ensure no object keys are remembered as existing across tests."""
+    with mock.patch.dict("exodus_gw.aws.util._KNOWN_OBJECTS", clear=True):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clean_config_cache():
+    """Ensure no config is cached across tests."""
+    with mock.patch.dict("exodus_gw.aws.dynamodb._CONFIG_CACHE", clear=True):
+        yield
+
+
 @pytest.fixture(params=["binary-config", "text-config"])
 def fake_dynamodb_query(
     fake_config: dict[str, Any], request: pytest.FixtureRequest
@@ -1,4 +1,5 @@
 import dramatiq
+import mock
 import pytest
 from asgi_correlation_id import correlation_id
 from fastapi.testclient import TestClient
@@ -86,3 +87,83 @@ def test_enqueue_with_session(db):
     # after commit)
     db.commit()
     assert not db.new
+
+
+def test_local_notify_targets_queue(db):
+    """Enqueue and ack only notify consumers of the affected queue."""
+
+    with TestClient(app):
+        broker = Broker()
+
+        @dramatiq.actor(broker=broker, queue_name="queue-a")
+        def fn_a():
+            pass
+
+        @dramatiq.actor(broker=broker, queue_name="queue-b")
+        def fn_b():
+            pass
+
+        with mock.patch.object(broker, "notify") as notify:
+            fn_a.send()
+            fn_b.send_with_options(delay=1000)
+
+            assert notify.mock_calls == [
+                mock.call("queue-a"),
+                mock.call("queue-b.DQ"),
+            ]
+
+
+def test_enqueue_many(db):
+    """Enqueuing many messages at once creates or replaces DB records as
+    expected, and notifies each queue only once."""
+
+    with TestClient(app):
+        broker = Broker()
+
+        @dramatiq.actor(broker=broker, queue_name="queue-a")
+        def fn_a(x):
+            pass
+
+        @dramatiq.actor(broker=broker, queue_name="queue-b")
+        def fn_b():
+            pass
+
+        # One message already exists and was claimed by some consumer.
+        existing = fn_a.send(0)
+        db.get(DramatiqMessage, existing.message_id).consumer_id = "consumer"
+        db.commit()
+
+        messages = [fn_a.message(1), fn_a.message(2), fn_b.message()]
+        messages.append(fn_a.message(3).copy(message_id=existing.message_id))
+
+        with mock.patch.object(broker, "notify") as notify:
+            out = broker.enqueue_many(messages)
+
+        assert out == messages
+        assert sorted(notify.mock_calls) == [
+            mock.call("queue-a"),
+            mock.call("queue-b"),
+        ]
+
+        # Delayed messages go to the delay queues.
+        delayed = broker.enqueue_many([fn_b.message()], delay=1000)
+
+    db.expire_all()
+    db_messages = {m.id: m for m in db.query(DramatiqMessage)}
+    assert len(db_messages) == 5
+
+    for message in messages:
+        db_message = db_messages[message.message_id]
+        assert db_message.actor == message.actor_name
+        assert db_message.queue == message.queue_name
+        assert db_message.eta is None
+        assert db_message.body["args"] == list(message.args)
+        assert db_message.body["kwargs"]["correlation_id"] is None
+
+    # The existing message was replaced and is no longer claimed.
+    assert db_messages[existing.message_id].body["args"] == [3]
+    assert db_messages[existing.message_id].consumer_id is None
+
+    db_delayed = db_messages[delayed[0].message_id]
+    assert db_delayed.queue == "queue-b.DQ"
+    assert db_delayed.eta == delayed[0].options["eta"]
@@ -1,4 +1,5 @@
 from datetime import datetime
+from unittest import mock
 
 import dramatiq
 from fastapi.testclient import TestClient
@@ -180,3 +181,147 @@ def test_rescue_dead_messages(db):
             .count()
             == 0
         )
+
+
+def test_consume_batch(db):
+    """Consumer claims messages in batches, up to prefetch, and gives back
+    any unused messages when closed."""
+
+    with TestClient(app):
+        broker = Broker()
+
+        @dramatiq.actor(broker=broker)
+        def fn1():
+            pass
+
+        for _ in range(5):
+            fn1.send()
+
+        consumer = broker.consume("default", prefetch=3)
+        consumer_iter = consumer.__iter__()
+
+        # Getting one message should have claimed three of them at once.
+        msg1 = next(consumer_iter)
+        claimed = db.query(DramatiqMessage).filter(
+            DramatiqMessage.consumer_id != None
+        )
+        assert claimed.count() == 3
+
+        # The next message is handed out without claiming any more.
+        msg2 = next(consumer_iter)
+        db.expire_all()
+        assert claimed.count() == 3
+
+        # Having reached prefetch, consumer won't claim more, even if
+        # notified, until some messages are acked.
+        msg3 = next(consumer_iter)
+        broker.notify()
+        assert next(consumer_iter) is None
+
+        consumer.ack(msg1)
+        consumer.ack(msg2)
+        broker.notify()
+        msg4 = next(consumer_iter)
+        assert msg4
+
+        # We've now got msg3, msg4 and one more claimed but not handed out.
+        db.expire_all()
+        assert claimed.count() == 3
+
+        # If we close, the unused message is released.
+        consumer.close()
+        db.expire_all()
+        assert sorted(m.id for m in claimed) == sorted(
+            [msg3.message_id, msg4.message_id]
+        )
+
+
+def test_delay_queue_schedules(db):
+    """Consumer of a delay queue moves due messages to the ready queue,
+    without ever handing out messages itself."""
+
+    with TestClient(app):
+        broker = Broker()
+
+        @dramatiq.actor(broker=broker)
+        def fn1():
+            pass
+
+        due = fn1.send_with_options(delay=0)
+        later = fn1.send_with_options(delay=60000)
+
+        # The messages should be on the delay queue with their eta.
+        db_due = db.get(DramatiqMessage, due.message_id)
+        db_later = db.get(DramatiqMessage, later.message_id)
+        assert db_due.queue == "default.DQ"
+        assert db_due.eta == due.options["eta"]
+        assert db_later.eta == later.options["eta"]
+
+        with mock.patch.object(broker, "notify") as notify:
+            consumer = broker.consume("default.DQ")
+            consumer_iter = consumer.__iter__()
+
+            # The scheduler doesn't return any message...
+            assert next(consumer_iter) is None
+
+        # ...but it moved the due message to the ready queue and notified
+        # consumers of that queue.
+        notify.assert_called_once_with("default")
+        db.expire_all()
+        assert (db_due.queue, db_due.eta) == ("default", None)
+        assert (db_later.queue, db_later.eta) == (
+            "default.DQ",
+            later.options["eta"],
+        )
+
+        # The moved message can be consumed from the ready queue, and as
+        # it's no longer delayed, the eta is not passed along.
+        consumer = broker.consume("default")
+        msg = next(consumer.__iter__())
+        assert msg.message_id == due.message_id
+        assert "eta" not in msg.options
+
+        # Acking it deletes it as usual.
+        consumer.ack(msg)
+        db.expire_all()
+        assert [m.id for m in db.query(DramatiqMessage)] == [later.message_id]
+
+
+def test_consume_queue_concurrency(db, monkeypatch, caplog):
+    """Consumer claims no more messages than its queue's concurrency limit,
+    and reports on the state of its queue."""
+
+    monkeypatch.setenv(
+        "EXODUS_GW_WORKER_QUEUE_CONCURRENCY", '{"limited-queue": 2}'
+    )
+
+    with TestClient(app):
+        broker = Broker()
+
+        @dramatiq.actor(broker=broker, queue_name="limited-queue")
+        def fn1():
+            pass
+
+        for _ in range(5):
+            fn1.send()
+
+        consumer = broker.consume("limited-queue", prefetch=10)
+        consumer_iter = consumer.__iter__()
+
+        msg1 = next(consumer_iter)
+        msg2 = next(consumer_iter)
+
+        # Having reached the limit, consumer won't claim more.
+        broker.notify()
+        assert next(consumer_iter) is None
+
+        claimed = db.query(DramatiqMessage).filter(
+            DramatiqMessage.consumer_id != None
+        )
+        assert sorted(m.id for m in claimed) == sorted(
+            [msg1.message_id, msg2.message_id]
+        )
+
+    # It should have reported the depth of the queue, as of before it
+    # claimed anything.
+    assert "queue limited-queue has 5 waiting message(s)" in caplog.text
@@ -0,0 +1,68 @@
+from dramatiq import Message
+from dramatiq.common import current_millis
+
+from exodus_gw.dramatiq.consumer import DbMessageProxy
+from exodus_gw.dramatiq.metrics import BUCKETS, Histogram, Metrics
+from exodus_gw.dramatiq.middleware import MetricsMiddleware
+
+
+def test_histogram():
+    """Histogram estimates percentiles from bucketed values."""
+
+    histogram = Histogram()
+    assert histogram.percentile(50) is None
+
+    for value in [1, 20, 20, 400, 10**9]:
+        histogram.observe(value)
+
+    assert histogram.count == 5
+    assert histogram.percentile(0) == 10
+    assert histogram.percentile(50) == 25
+    assert histogram.percentile(70) == 500
+
+    # Values beyond the last bucket are capped.
+    assert histogram.percentile(100) == BUCKETS[-1]
+
+    # Histograms can be merged, including from serialized counts.
+    other = Histogram(list(histogram.counts))
+    other.merge(histogram)
+    assert other.count == 10
+    assert other.percentile(50) == 25
+
+
+def test_metrics_middleware():
+    """Middleware records wait and run time of processed messages."""
+
+    metrics = Metrics()
+    mw = MetricsMiddleware(metrics)
+
+    message = DbMessageProxy(
+        Message(
+            queue_name="some-queue",
+            actor_name="some-actor",
+            args=(),
+            kwargs={},
+            options={},
+        ),
+        enqueued=current_millis() - 2000,
+    )
+
+    mw.before_process_message(None, message)
+    mw.after_process_message(None, message)
+
+    snapshot = metrics.snapshot("some-queue")
+    assert snapshot["queue"] == "some-queue"
+
+    histograms = snapshot["actors"]["some-actor"]
+    wait = Histogram(histograms["wait"])
+    run = Histogram(histograms["run"])
+
+    # It should have waited ~2 seconds, and run (almost) instantly.
+    assert (wait.count, wait.percentile(50)) == (1, 2500)
+    assert (run.count, run.percentile(50)) == (1, 10)
+
+    # Nothing recorded for other queues.
+    assert metrics.snapshot("other-queue") == {
+        "queue": "other-queue",
+        "actors": {},
+    }
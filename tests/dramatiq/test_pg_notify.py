@@ -1,5 +1,6 @@
 import logging
 import threading
+from types import SimpleNamespace
 from unittest import mock
 
 import dramatiq
@@ -27,9 +28,11 @@ class FakeBroker(dramatiq.Broker):
         super().__init__(middleware=[])
 
         self.notifies = threading.Semaphore(0)
+        self.notified_queues = []
         self.session = None
 
-    def notify(self):
+    def notify(self, queue_name=None):
+        self.notified_queues.append(queue_name)
         self.notifies.release()
 
 
@@ -85,6 +88,42 @@ def test_listen_thread(caplog):
         broker.emit_before("worker_shutdown", object())
 
 
+def test_listen_thread_queue_names():
+    """Listen thread notifies only the queues named in notifications."""
+
+    db_engine = mock.MagicMock()
+    db_engine.url = "postgresql://whatever"
+    pg_conn = (
+        db_engine.connect()
+        .execution_options()
+        .__enter__()
+        .connection.connection
+    )
+    select = FakeSelect()
+    broker = FakeBroker()
+    mw = PostgresNotifyMiddleware(lambda: db_engine, 0.1)
+    broker.add_middleware(mw)
+
+    with mock.patch("select.select", new=select):
+        broker.emit_before("worker_boot", object())
+
+        # Notifications for some queues (with duplicates) arrive.
+        pg_conn.notifies = [
+            SimpleNamespace(payload="queue2"),
+            SimpleNamespace(payload="queue1"),
+            SimpleNamespace(payload="queue2"),
+        ]
+        select.event.set()
+
+        # It should notify each of those queues, once.
+        assert broker.notifies.acquire(timeout=2.0)
+        assert broker.notifies.acquire(timeout=2.0)
+        assert not broker.notifies.acquire(timeout=0.2)
+        assert broker.notified_queues == ["queue1", "queue2"]
+
+        broker.emit_before("worker_shutdown", object())
+
+
 def test_notifies():
     """Middleware executes postgres NOTIFY statements when relevant events occur."""
 
@@ -95,19 +134,70 @@ def test_notifies():
     mw = PostgresNotifyMiddleware(lambda: db_engine)
     broker.add_middleware(mw)
 
-    # These should all result in notifies occurring
-    broker.emit_after("ack", None)
-    broker.emit_after("nack", None)
-    broker.emit_after("enqueue", None, None)
+    message = dramatiq.Message(
+        queue_name="some-queue",
+        actor_name="some-actor",
+        args=(),
+        kwargs={},
+        options={},
+    )
+
+    # These should not result in any notifies, as nothing new is
+    # available for consumers
+    broker.emit_after("ack", message)
+    broker.emit_after("nack", message)
+    assert not db_conn.execute.mock_calls
+
+    # Enqueues result in notifies for the relevant queue
+    broker.emit_after("enqueue", message, None)
+    broker.emit_after("enqueue", message, 1000)
 
-    assert [call.args[0].text for call in db_conn.execute.mock_calls] == 3 * [
-        "NOTIFY dramatiq"
+    assert [
+        (call.args[0].text, call.args[1])
+        for call in db_conn.execute.mock_calls
+    ] == [
+        ("SELECT pg_notify('dramatiq', :queue)", {"queue": "some-queue"}),
+        ("SELECT pg_notify('dramatiq', :queue)", {"queue": "some-queue.DQ"}),
     ]
 
     # And if the broker has a session, it should use that
     broker.session = mock.MagicMock()
-    broker.emit_after("ack", None)
+    broker.emit_after("enqueue", message, None)
 
     assert [
-        call.args[0].text for call in broker.session.execute.mock_calls
-    ] == ["NOTIFY dramatiq"]
+        (call.args[0].text, call.args[1])
+        for call in broker.session.execute.mock_calls
+    ] == [
+        ("SELECT pg_notify('dramatiq', :queue)", {"queue": "some-queue"}),
+    ]
+
+
+def test_notify_enqueue_many():
+    """Enqueuing many messages results in one notify per queue."""
+
+    db_engine = mock.MagicMock()
+    db_engine.url = "postgresql://whatever"
+    db_conn = db_engine.connect().__enter__()
+    broker = FakeBroker()
+    mw = PostgresNotifyMiddleware(lambda: db_engine)
+
+    messages = [
+        dramatiq.Message(
+            queue_name=queue_name,
+            actor_name="some-actor",
+            args=(),
+            kwargs={},
+            options={},
+        )
+        for queue_name in ["queue-b", "queue-a", "queue-b", "queue-a"]
+    ]
+
+    mw.after_enqueue_many(broker, messages, None)
+    mw.after_enqueue_many(broker, messages, 1000)
+
+    assert [call.args[1] for call in db_conn.execute.mock_calls] == [
+        {"queue": "queue-a"},
+        {"queue": "queue-b"},
+        {"queue": "queue-a.DQ"},
+        {"queue": "queue-b.DQ"},
+    ]
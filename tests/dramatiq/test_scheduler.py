@@ -6,6 +6,7 @@ import dramatiq
 import pytest
 
 from exodus_gw.dramatiq import Broker
+from exodus_gw.dramatiq.middleware.scheduler import next_fire
 from exodus_gw.models import DramatiqMessage
 from exodus_gw.settings import Settings
 
@@ -159,3 +160,45 @@ def test_scheduled_actor_enqueued_on_startup(db):
             "schedule_test2",
         ),
     ]
+
+
+def test_next_fire():
+    """next_fire calculates the next time a cron rule is hit."""
+
+    rule = "5 1,2,3 * * *"
+
+    assert next_fire(rule, datetime(1999, 1, 1)) == datetime(1999, 1, 1, 1, 5)
+    assert next_fire(rule, datetime(1999, 1, 1, 1, 5)) == datetime(
+        1999, 1, 1, 2, 5
+    )
+    assert next_fire(rule, datetime(1999, 1, 1, 3, 5, 30)) == datetime(
+        1999, 1, 2, 1, 5
+    )
+
+    # A rule which never fires gives None.
+    assert next_fire("0 0 31 2 *", datetime(1999, 1, 1)) is None
+
+
+def test_scheduled_actor_enqueued_for_next_fire(db, mock_utcnow):
+    """Scheduled actors enqueue themselves for the next time the rule is hit."""
+
+    settings = ExtendedSettings()
+    settings.cron_schedule_test1 = "5 1,2,3 * * *"
+    broker = Broker(settings=settings)
+
+    @dramatiq.actor(scheduled=True, broker=broker)
+    def schedule_test1():
+        pass
+
+    # Run at 1:05:10, just after the rule was hit.
+    mock_utcnow.return_value = datetime(1999, 1, 1, 1, 5, 10)
+    schedule_test1.fn()
+
+    # It should have enqueued one delayed message...
+    messages = db.query(DramatiqMessage).all()
+    assert len(messages) == 1
+    assert messages[0].queue == "default.DQ"
+
+    # ...to run again at exactly 2:05.
+    delay = messages[0].eta - messages[0].body["message_timestamp"]
+    assert abs(delay - (60 * 60 - 10) * 1000) < 1000
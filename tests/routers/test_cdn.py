@@ -2,16 +2,18 @@ import json
 import logging
 from base64 import b64decode
 from datetime import datetime, timedelta, timezone
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlparse
 
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from freezegun import freeze_time
 
 from exodus_gw.main import app
 from exodus_gw.routers import cdn
-from exodus_gw.settings import get_environment
+from exodus_gw.settings import Settings, get_environment
 
 
 @freeze_time("2022-02-16")
@@ -173,3 +175,125 @@ def test_sign_url_without_cdn_url(monkeypatch, dummy_private_key):
         cdn.sign_url("some/uri", 60, env, "tester")
 
     assert "Missing cdn_url, nowhere to redirect request" in str(exc_info)
+
+
+def test_signing_key_cached(monkeypatch, dummy_private_key):
+    """Private keys are parsed once and reloaded only when changed."""
+    monkeypatch.setattr(cdn, "SIGNING_KEYS", {})
+    monkeypatch.setenv("EXODUS_GW_CDN_PRIVATE_KEY_TEST", dummy_private_key)
+
+    env = get_environment("test")
+
+    key = cdn.signing_key(env)
+    assert key
+    assert cdn.signing_key(env) is key
+
+    # Rotating the key results in the new key being loaded.
+    rotated = rsa.generate_private_key(public_exponent=65537, key_size=1024)
+    rotated_pem = rotated.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ).decode("utf-8")
+    monkeypatch.setenv("EXODUS_GW_CDN_PRIVATE_KEY_TEST", rotated_pem)
+
+    new_key = cdn.signing_key(env)
+    assert new_key is not key
+    assert new_key.pem == rotated_pem
+
+    # And an unset key is reported as missing.
+    monkeypatch.delenv("EXODUS_GW_CDN_PRIVATE_KEY_TEST")
+    assert cdn.signing_key(env) is None
+
+
+def test_cdn_redirect_reuses_cookies(monkeypatch, dummy_private_key):
+    """Redirects within the reuse window share signed cookies."""
+    monkeypatch.setattr(cdn, "SIGNING_KEYS", {})
+    monkeypatch.setenv("EXODUS_GW_CDN_PRIVATE_KEY_TEST", dummy_private_key)
+
+    settings = Settings()
+    env = get_environment("test")
+
+    def cookies(url):
+        query = parse_qs(urlparse(url).query)
+        encoded = query["CloudFront-Cookies"][0]
+        encoded = encoded.replace("-", "+").replace("_", "=").replace("~", "/")
+        return json.loads(b64decode(encoded))
+
+    with freeze_time("2022-02-16 00:00:10") as frozen:
+        first = cdn.sign_url("some/url", settings, env, "tester")
+
+        frozen.tick(60)
+        second = cdn.sign_url("other/url", settings, env, "tester")
+
+        frozen.tick(300)
+        third = cdn.sign_url("some/url", settings, env, "tester")
+
+    # Cookies expire at the start of the reuse window, and Max-Age is
+    # adjusted accordingly.
+    assert "Max-Age=43190" in cookies(first)[0]
+    assert "Max-Age=43130" in cookies(second)[0]
+
+    def signatures(url):
+        return [
+            c.split(";")[0]
+            for c in cookies(url)
+            if c.startswith("CloudFront-Signature=")
+        ]
+
+    # Cookies were reused within the window...
+    assert signatures(first) == signatures(second)
+    # ...but not beyond it.
+    assert signatures(first) != signatures(third)
+
+    # Only the cookies for the latest window are retained.
+    key = cdn.signing_key(env)
+    assert key
+    assert len(key.cookies) == 2
+
+
+@freeze_time("2022-02-16")
+def test_cdn_sign(monkeypatch, dummy_private_key):
+    """Bulk signing gives the same URLs as redirects would."""
+    monkeypatch.setenv("EXODUS_GW_CDN_PRIVATE_KEY_TEST", dummy_private_key)
+
+    urls = ["some/url", "some/url-with-^-character", "other/url"]
+
+    with TestClient(app) as client:
+        redirects = [
+            client.get(f"/test/cdn/{url}", follow_redirects=False)
+            for url in urls
+        ]
+        r = client.post("/test/cdn-sign", json=urls)
+
+    assert r.status_code == 200
+    assert r.json() == {
+        "expires": "2022-02-16T00:30:00Z",
+        "urls": [
+            {"url": url, "signed_url": redirect.headers["location"]}
+            for (url, redirect) in zip(urls, redirects)
+        ],
+    }
+
+
+def test_cdn_sign_too_many(monkeypatch, dummy_private_key):
+    """Requests to sign too many URLs are rejected."""
+    monkeypatch.setenv("EXODUS_GW_CDN_PRIVATE_KEY_TEST", dummy_private_key)
+    monkeypatch.setenv("EXODUS_GW_CDN_SIGN_MAX_URLS", "2")
+
+    with TestClient(app) as client:
+        r = client.post("/test/cdn-sign", json=["a", "b", "c"])
+
+    assert r.status_code == 400
+    assert r.json() == {
+        "detail": "Cannot sign more than 2 URLs in a single request"
+    }
+
+
+def test_cdn_sign_without_private_key():
+    """Bulk signing fails cleanly if the environment can't sign."""
+    with TestClient(app) as client:
+        r = client.post("/test/cdn-sign", json=["some/url"])
+
+    assert r.status_code == 500
+    assert r.json() == {"detail": "Missing private key for CDN access"}
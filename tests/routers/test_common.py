@@ -52,6 +52,8 @@ def test_requires_auth(api_route):
         # system is up
         "/healthcheck",
         "/healthcheck-worker",
+        "/worker-metrics",
+        "/s3-pool-metrics",
         # this should not need auth as the endpoint is designed to tell you
         # whether or not you're authorized
         "/whoami",
@@ -62,6 +64,7 @@ def test_requires_auth(api_route):
         # authorization for the CDN is handled elsewhere, by other means, we
         # don't want to restrict it in Exodus gateway
         "/{env}/cdn/{url:path}",
+        "/{env}/cdn-sign",
     ]:
         pytest.skip("auth not required")
 
@@ -1,7 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
 
+from exodus_gw.aws.dynamodb import _CONFIG_CACHE, DynamoDB
 from exodus_gw.main import app
+from exodus_gw.settings import Settings
 
 
 def test_config_get(auth_header, fake_config, mock_boto3_client):
@@ -15,6 +17,107 @@ def test_config_get(auth_header, fake_config, mock_boto3_client):
     assert r.status_code == 200
     assert r.json() == fake_config
 
+    # It should have provided an ETag
+    assert r.headers["etag"].startswith('"')
+
+
+def test_config_get_cached(auth_header, fake_config, mock_boto3_client):
+    """Config is loaded from DynamoDB once and reused until it expires."""
+    headers = auth_header(roles=["test-config-consumer"])
+
+    with TestClient(app) as client:
+        r1 = client.get("/test/config", headers=headers)
+        r2 = client.get("/test/config", headers=headers)
+
+        # Two requests, but only one query
+        assert mock_boto3_client.query.call_count == 1
+
+        # Simulate passage of time until cache expiry
+        _CONFIG_CACHE["test"].expires -= 30
+        r3 = client.get("/test/config", headers=headers)
+
+        # Cache expired, so config was queried again
+        assert mock_boto3_client.query.call_count == 2
+
+    for r in (r1, r2, r3):
+        assert r.status_code == 200
+        assert r.json() == fake_config
+        assert r.headers["etag"] == r1.headers["etag"]
+
+
+def test_config_get_not_cached(
+    auth_header, fake_config, mock_boto3_client, monkeypatch
+):
+    """Caching can be disabled."""
+    monkeypatch.setenv("EXODUS_GW_CONFIG_GET_CACHE_TTL", "0")
+    headers = auth_header(roles=["test-config-consumer"])
+
+    with TestClient(app) as client:
+        client.get("/test/config", headers=headers)
+        client.get("/test/config", headers=headers)
+
+    assert mock_boto3_client.query.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "if_none_match,expected_status",
+    [
+        ("{etag}", 304),
+        ("W/{etag}", 304),
+        ('"other", {etag}', 304),
+        ("*", 304),
+        ('"other"', 200),
+    ],
+)
+def test_config_get_if_none_match(
+    auth_header,
+    fake_config,
+    mock_boto3_client,
+    if_none_match,
+    expected_status,
+):
+    """Conditional requests for unchanged config get a 304 response."""
+    headers = auth_header(roles=["test-config-consumer"])
+
+    with TestClient(app) as client:
+        etag = client.get("/test/config", headers=headers).headers["etag"]
+        r = client.get(
+            "/test/config",
+            headers={
+                **headers,
+                "If-None-Match": if_none_match.format(etag=etag),
+            },
+        )
+
+    assert r.status_code == expected_status
+    assert r.headers["etag"] == etag
+    if expected_status == 304:
+        assert not r.content
+    else:
+        assert r.json() == fake_config
+
+
+def test_config_get_after_write(auth_header, fake_config, mock_boto3_client):
+    """Writing config discards any cached config."""
+    headers = auth_header(roles=["test-config-consumer"])
+    mock_boto3_client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+    with TestClient(app) as client:
+        etag = client.get("/test/config", headers=headers).headers["etag"]
+
+        ddb = DynamoDB("test", Settings(), "2024-01-01")
+        new_config = {**fake_config, "origin_alias": []}
+        ddb.write_config(new_config)
+
+        # Config is queried again, returning the stored config (which
+        # is unchanged, as the query is mocked).
+        r = client.get(
+            "/test/config", headers={**headers, "If-None-Match": etag}
+        )
+
+    assert mock_boto3_client.query.call_count == 2
+    assert r.status_code == 304
+
 
 @pytest.mark.parametrize("endpoint", ["config", "deploy-config"])
 def test_deploy_config_typical(fake_config, auth_header, endpoint):
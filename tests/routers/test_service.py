@@ -1,10 +1,11 @@
 from datetime import datetime
 
+from dramatiq.common import current_millis
 from fastapi.testclient import TestClient
 
 from exodus_gw import models
 from exodus_gw.main import app
-from exodus_gw.models import DramatiqConsumer
+from exodus_gw.models import DramatiqConsumer, DramatiqMessage
 from exodus_gw.routers import service
 
 
@@ -113,3 +114,153 @@ def test_root_non_browser():
     with TestClient(app) as client:
         resp = client.get("/")
         assert resp.status_code == 404
+
+
+def test_worker_metrics(db):
+    """Worker metrics endpoint reports on queues, actors and consumers."""
+
+    now = current_millis()
+    with TestClient(app) as client:
+        db.add_all(
+            [
+                # Two waiting messages, one claimed, one delayed.
+                DramatiqMessage(
+                    id="f74bd91e-4a4e-4cb9-b9d7-a5a2b4bb41f3",
+                    queue="commit",
+                    actor="commit",
+                    body={},
+                    enqueued=now - 30000,
+                ),
+                DramatiqMessage(
+                    id="6d73dfd2-7a33-4b39-a0d1-8a9af7c4a1c5",
+                    queue="commit",
+                    actor="commit",
+                    body={},
+                    enqueued=now - 1000,
+                ),
+                DramatiqMessage(
+                    id="89cbb2b5-0d64-4e69-a0a3-d8e0a8c1a0f0",
+                    queue="commit",
+                    actor="commit",
+                    body={},
+                    enqueued=now - 90000,
+                    consumer_id="commit-live",
+                ),
+                DramatiqMessage(
+                    id="2c1e4f92-9df3-4c37-8d1b-6c1d6d4c0c7e",
+                    queue="commit.DQ",
+                    actor="commit",
+                    body={},
+                    eta=now + 60000,
+                ),
+                DramatiqConsumer(
+                    id="commit-live",
+                    last_alive=datetime.utcnow(),
+                    metrics={
+                        "queue": "commit",
+                        "actors": {
+                            "commit": {
+                                # 3 waits of <= 100ms, 1 of <= 30s
+                                "wait": [0, 0, 0, 3, 0, 0, 0, 0, 0, 0, 1],
+                                "run": [0, 0, 0, 0, 0, 0, 0, 0, 2],
+                            }
+                        },
+                    },
+                ),
+                DramatiqConsumer(
+                    id="commit-other",
+                    last_alive=datetime.utcnow(),
+                    metrics={
+                        "queue": "commit",
+                        "actors": {
+                            "commit": {
+                                "wait": [0, 0, 0, 1],
+                                "run": [0, 0, 0, 0, 0, 0, 0, 0, 0, 2],
+                            }
+                        },
+                    },
+                ),
+                # Dead consumer doesn't contribute metrics.
+                DramatiqConsumer(
+                    id="commit-dead",
+                    last_alive=datetime(1999, 1, 1),
+                    metrics={
+                        "queue": "commit",
+                        "actors": {"commit": {"wait": [100], "run": [100]}},
+                    },
+                ),
+            ]
+        )
+        db.commit()
+
+        r = client.get("/worker-metrics")
+
+    assert r.status_code == 200
+    body = r.json()
+
+    queues = {q["name"]: q for q in body["queues"]}
+
+    # All declared queues are reported, even if empty.
+    assert queues["default"] == {
+        "name": "default",
+        "waiting": 0,
+        "in_progress": 0,
+        "delayed": 0,
+        "oldest_wait": None,
+    }
+
+    commit = queues["commit"]
+    assert (commit["waiting"], commit["in_progress"], commit["delayed"]) == (
+        2,
+        1,
+        1,
+    )
+    assert 30 <= commit["oldest_wait"] < 40
+
+    assert body["actors"] == [
+        {
+            "name": "commit",
+            "queue": "commit",
+            "wait": {"count": 5, "p50": 0.1, "p90": 30.0, "p99": 30.0},
+            "run": {"count": 4, "p50": 5.0, "p90": 10.0, "p99": 10.0},
+        }
+    ]
+
+    assert [(c["id"], c["alive"]) for c in body["consumers"]] == [
+        ("commit-dead", False),
+        ("commit-live", True),
+        ("commit-other", True),
+    ]
+
+
+def test_s3_pool_metrics(mock_aws_client, auth_header):
+    """S3 pool metrics endpoint reports on usage of S3 clients."""
+
+    mock_aws_client.head_object.return_value = {
+        "ETag": "a1b2c3",
+        "Metadata": {},
+    }
+
+    with TestClient(app) as client:
+        # Do a request needing an S3 client.
+        r = client.head(
+            "/upload/test/%s" % ("a" * 64),
+            headers=auth_header(roles=["test-blob-uploader"]),
+        )
+        assert r.status_code == 200
+
+        r = client.get("/s3-pool-metrics")
+
+    assert r.status_code == 200
+
+    metrics = {m["profile"]: m for m in r.json()}
+    test_pool = metrics["test"]
+
+    # The client should have been returned to the pool.
+    assert test_pool["size"] >= 1
+    assert test_pool["idle"] == test_pool["size"]
+    assert test_pool["max_size"] == 3
+    assert test_pool["waiting"] == 0
+    assert test_pool["discarded"] == 0
+    assert test_pool["created"] >= 1
+    assert test_pool["wait"]["count"] >= 1
@@ -0,0 +1,107 @@
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+
+from exodus_gw.aws.util import known_objects
+from exodus_gw.main import app
+from exodus_gw.settings import load_settings
+
+KEY1 = "b5bb9d8014a0f9b1d61e21e796d78dccdf1352f23cd32812f4850b878ae4944c"
+KEY2 = "7d865e959b2466918c9863afca942d0fb89d7c9ac0c99bafc3749504ded97730"
+KEY3 = "aec070645fe53ee3b3763059376134f058cc337247c978add178b6ccdfb0019f"
+
+
+def not_found():
+    return ClientError(
+        {
+            "Error": {"Code": "404", "Message": "Not Found"},
+            "ResponseMetadata": {"HTTPStatusCode": 404},
+        },
+        "HeadObject",
+    )
+
+
+def test_exists(mock_aws_client, auth_header):
+    """Existence of many objects can be checked at once."""
+
+    # KEY1 is already known to exist, so S3 won't be asked about it.
+    known_objects("my-bucket", load_settings()).add(KEY1)
+
+    def head_object(Bucket, Key):
+        assert Bucket == "my-bucket"
+        if Key == KEY2:
+            return {"ETag": "abc"}
+        raise not_found()
+
+    mock_aws_client.head_object.side_effect = head_object
+
+    with TestClient(app) as client:
+        r = client.post(
+            "/upload/test/exists",
+            json={"keys": [KEY3, KEY2, KEY1, KEY3]},
+            headers=auth_header(roles=["test-blob-uploader"]),
+        )
+
+    assert r.status_code == 200
+    assert r.json() == {"present": [KEY2, KEY1], "missing": [KEY3]}
+
+    # Duplicate keys and known objects didn't result in any extra requests.
+    assert sorted(
+        call.kwargs["Key"] for call in mock_aws_client.head_object.mock_calls
+    ) == sorted([KEY2, KEY3])
+
+    # The newly found object is now known to exist.
+    assert KEY2 in known_objects("my-bucket", load_settings())
+
+
+def test_exists_invalid_key(mock_aws_client, auth_header):
+    """Invalid object keys are rejected."""
+
+    with TestClient(app) as client:
+        r = client.post(
+            "/upload/test/exists",
+            json={"keys": [KEY1, "not-a-key"]},
+            headers=auth_header(roles=["test-blob-uploader"]),
+        )
+
+    # Like other upload APIs, errors are returned in S3's XML format.
+    assert r.status_code == 400
+    assert "<Message>Invalid object key: 'not-a-key'</Message>" in r.text
+    mock_aws_client.head_object.assert_not_called()
+
+
+def test_exists_too_many_keys(mock_aws_client, auth_header, monkeypatch):
+    """Requests checking too many keys at once are rejected."""
+
+    monkeypatch.setenv("EXODUS_GW_UPLOAD_EXISTS_MAX_KEYS", "2")
+
+    with TestClient(app) as client:
+        r = client.post(
+            "/upload/test/exists",
+            json={"keys": [KEY1, KEY2, KEY3]},
+            headers=auth_header(roles=["test-blob-uploader"]),
+        )
+
+    assert r.status_code == 400
+    assert "<Message>Too many object keys (3 &gt; 2)</Message>" in r.text
+
+
+def test_exists_s3_error(mock_aws_client, auth_header):
+    """Unexpected errors from S3 are passed through to the caller."""
+
+    mock_aws_client.head_object.side_effect = ClientError(
+        {
+            "Error": {"Code": "403", "Message": "Forbidden"},
+            "ResponseMetadata": {"HTTPStatusCode": 403},
+        },
+        "HeadObject",
+    )
+
+    with TestClient(app) as client:
+        r = client.post(
+            "/upload/test/exists",
+            json={"keys": [KEY1]},
+            headers=auth_header(roles=["test-blob-uploader"]),
+        )
+
+    assert r.status_code == 403
+    assert "<Code>403</Code>" in r.text
@@ -1,3 +1,5 @@
+import base64
+import hashlib
 import textwrap
 
 import mock
@@ -77,7 +79,7 @@ async def test_complete_mpu(mock_aws_client):
     request = mock.Mock()
     request.body = fake_body
     request.app.state.settings = settings
-    request.app.state.s3_queues = {}
+    request.app.state.s3_pools = {}
 
     s3_client = await get_s3_client(
         request=request, env=env, settings=settings
@@ -90,6 +92,7 @@ async def test_complete_mpu(mock_aws_client):
         key=TEST_KEY,
         uploadId="my-better-upload",
         uploads=None,
+        settings=settings,
     )
 
     # It should delegate request to real S3
@@ -155,3 +158,84 @@ async def test_abort_mpu(mock_aws_client, auth_header):
     # It should be a successful, empty response
     assert r.status_code == 200
     assert r.content == b""
+
+
+def upload_and_complete(client, mock_aws_client, headers, parts):
+    # Uploads the given parts in order, then completes the upload.
+    async def consume_body(Body, **_):
+        async for _chunk in Body:
+            pass
+        return {"ETag": "tag"}
+
+    mock_aws_client.upload_part.side_effect = consume_body
+    mock_aws_client.complete_multipart_upload.return_value = {
+        "Location": "https://example.com/some-object",
+        "Bucket": "my-bucket",
+        "Key": TEST_KEY,
+        "ETag": "my-etag",
+    }
+
+    for i, content in enumerate(parts, start=1):
+        r = client.put(
+            "/upload/test/%s?uploadId=verified-upload&partNumber=%s"
+            % (TEST_KEY, i),
+            content=content,
+            headers={
+                **headers,
+                "Content-MD5": base64.b64encode(
+                    hashlib.md5(content).digest()
+                ).decode(),
+            },
+        )
+        assert r.status_code == 200
+
+    body = "".join(
+        "<Part><ETag>tag</ETag><PartNumber>%s</PartNumber></Part>" % i
+        for i in range(1, len(parts) + 1)
+    )
+    return client.post(
+        "/upload/test/%s?uploadId=verified-upload" % TEST_KEY,
+        content=(
+            '<CompleteMultipartUpload xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            "%s</CompleteMultipartUpload>" % body
+        ),
+        headers=headers,
+    )
+
+
+async def test_complete_mpu_verified(mock_aws_client, auth_header):
+    """Completing a multipart upload whose content matches the key succeeds."""
+
+    headers = auth_header(roles=["test-blob-uploader"])
+
+    with TestClient(app) as client:
+        r = upload_and_complete(
+            client, mock_aws_client, headers, [b"fo", b"o\n"]
+        )
+
+    # It should succeed
+    assert r.status_code == 200
+    mock_aws_client.complete_multipart_upload.assert_called_once()
+
+
+async def test_complete_mpu_mismatch(mock_aws_client, auth_header):
+    """Completing a multipart upload whose content doesn't match the key
+    aborts the upload.
+    """
+
+    headers = auth_header(roles=["test-blob-uploader"])
+
+    with TestClient(app) as client:
+        r = upload_and_complete(
+            client, mock_aws_client, headers, [b"ba", b"r\n"]
+        )
+
+    # It should fail with the correct error
+    assert r.status_code == 400
+    assert "Content does not match object key" in r.text
+
+    # It should have aborted rather than completed the upload
+    mock_aws_client.complete_multipart_upload.assert_not_called()
+    mock_aws_client.abort_multipart_upload.assert_called_once_with(
+        Bucket="my-bucket", Key=TEST_KEY, UploadId="verified-upload"
+    )
@@ -0,0 +1,149 @@
+import base64
+
+import mock
+from fastapi.testclient import TestClient
+
+from exodus_gw.main import app
+
+TEST_KEY = "b5bb9d8014a0f9b1d61e21e796d78dccdf1352f23cd32812f4850b878ae4944c"
+
+
+def test_presign_disabled(mock_aws_client, auth_header):
+    """Presigned URLs can't be obtained unless enabled."""
+
+    with TestClient(app) as client:
+        r = client.post(
+            "/upload/test/%s/presign" % TEST_KEY,
+            json={},
+            headers=auth_header(roles=["test-blob-uploader"]),
+        )
+
+    assert r.status_code == 403
+    assert "Presigned uploads are not enabled" in r.text
+    mock_aws_client.generate_presigned_url.assert_not_called()
+
+
+def test_presign_object(mock_aws_client, auth_header, monkeypatch):
+    """Can obtain a presigned URL for uploading an entire object."""
+
+    monkeypatch.setenv("EXODUS_GW_UPLOAD_PRESIGN_ENABLED", "true")
+    monkeypatch.setenv(
+        "EXODUS_GW_UPLOAD_META_FIELDS",
+        '{"exodus-migration-src": "^.{1,2000}$"}',
+    )
+    mock_aws_client.generate_presigned_url.return_value = "https://s3/put"
+
+    with TestClient(app) as client:
+        r = client.post(
+            "/upload/test/%s/presign" % TEST_KEY,
+            json={"metadata": {"exodus-migration-src": "some/source"}},
+            headers=auth_header(roles=["test-blob-uploader"]),
+        )
+
+    assert r.status_code == 200
+
+    checksum = base64.b64encode(bytes.fromhex(TEST_KEY)).decode()
+
+    # It should have signed a PUT including the checksum and metadata
+    mock_aws_client.generate_presigned_url.assert_called_once_with(
+        "put_object",
+        Params={
+            "Bucket": "my-bucket",
+            "Key": TEST_KEY,
+            "ChecksumSHA256": checksum,
+            "Metadata": {
+                "exodus-migration-src": "some/source",
+                "gw-uploader": "user fake-user",
+            },
+        },
+        ExpiresIn=900,
+    )
+
+    body = r.json()
+    assert body["expires"]
+    assert body["urls"] == [{"part_number": None, "url": "https://s3/put"}]
+
+    # It should tell the client which headers to send
+    assert body["headers"] == {
+        "x-amz-checksum-sha256": checksum,
+        "x-amz-meta-exodus-migration-src": "some/source",
+        "x-amz-meta-gw-uploader": "user fake-user",
+    }
+
+
+def test_presign_parts(mock_aws_client, auth_header, monkeypatch):
+    """Can obtain presigned URLs for uploading parts of an object."""
+
+    monkeypatch.setenv("EXODUS_GW_UPLOAD_PRESIGN_ENABLED", "true")
+    monkeypatch.setenv("EXODUS_GW_UPLOAD_PRESIGN_EXPIRY", "60")
+    mock_aws_client.generate_presigned_url.side_effect = (
+        lambda op, Params, ExpiresIn: "https://s3/part%s"
+        % Params["PartNumber"]
+    )
+
+    with TestClient(app) as client:
+        r = client.post(
+            "/upload/test/%s/presign" % TEST_KEY,
+            json={"upload_id": "my-upload", "part_numbers": [2, 1, 2]},
+            headers=auth_header(roles=["test-blob-uploader"]),
+        )
+
+    assert r.status_code == 200
+
+    # It should have signed each distinct part
+    assert mock_aws_client.generate_presigned_url.mock_calls == [
+        mock.call(
+            "upload_part",
+            Params={
+                "Bucket": "my-bucket",
+                "Key": TEST_KEY,
+                "UploadId": "my-upload",
+                "PartNumber": i,
+            },
+            ExpiresIn=60,
+        )
+        for i in (1, 2)
+    ]
+
+    body = r.json()
+    assert body["headers"] == {}
+    assert body["urls"] == [
+        {"part_number": 1, "url": "https://s3/part1"},
+        {"part_number": 2, "url": "https://s3/part2"},
+    ]
+
+
+def test_presign_bad_request(mock_aws_client, auth_header, monkeypatch):
+    """Invalid combinations of arguments are rejected."""
+
+    monkeypatch.setenv("EXODUS_GW_UPLOAD_PRESIGN_ENABLED", "true")
+
+    requests = [
+        ({"upload_id": "my-upload"}, "part_numbers must be provided"),
+        ({"part_numbers": [1]}, "part_numbers must not be provided"),
+        (
+            {
+                "upload_id": "my-upload",
+                "part_numbers": [1],
+                "metadata": {"a": "b"},
+            },
+            "metadata must not be provided",
+        ),
+        (
+            {"upload_id": "my-upload", "part_numbers": [10001]},
+            "Invalid part number: 10001",
+        ),
+        ({"metadata": {"a": "b"}}, "Invalid metadata field"),
+    ]
+
+    with TestClient(app) as client:
+        for body, message in requests:
+            r = client.post(
+                "/upload/test/%s/presign" % TEST_KEY,
+                json=body,
+                headers=auth_header(roles=["test-blob-uploader"]),
+            )
+            assert r.status_code == 400
+            assert message in r.text
+
+    mock_aws_client.generate_presigned_url.assert_not_called()
@@ -0,0 +1,194 @@
+import base64
+import hashlib
+
+import pytest
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+
+from exodus_gw.aws.util import known_objects
+from exodus_gw.main import app
+from exodus_gw.settings import load_settings
+
+CONTENT = b"some content to be split into parts\n"
+KEY = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def split_settings(monkeypatch):
+    monkeypatch.setenv("EXODUS_GW_UPLOAD_SPLIT_THRESHOLD", "10")
+    monkeypatch.setenv("EXODUS_GW_UPLOAD_SPLIT_PART_SIZE", "16")
+    monkeypatch.setenv("EXODUS_GW_UPLOAD_SPLIT_CONCURRENCY", "2")
+    monkeypatch.setenv("EXODUS_GW_UPLOAD_SPLIT_SPOOL_SIZE", "4")
+
+
+def put(client, content, auth_header):
+    return client.put(
+        "/upload/test/%s" % KEY,
+        content=content,
+        headers={
+            **auth_header(roles=["test-blob-uploader"]),
+            "Content-MD5": base64.b64encode(
+                hashlib.md5(content).digest()
+            ).decode(),
+        },
+    )
+
+
+def s3_error(status):
+    return ClientError(
+        {
+            "Error": {"Code": str(status), "Message": "simulated error"},
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        },
+        "UploadPart",
+    )
+
+
+@pytest.fixture()
+def uploaded_parts(mock_aws_client):
+    parts = {}
+
+    async def upload_part(Body, PartNumber, ContentMD5, ContentLength, **_):
+        data = Body.read()
+        assert len(data) == ContentLength
+        assert (
+            ContentMD5 == base64.b64encode(hashlib.md5(data).digest()).decode()
+        )
+        parts[PartNumber] = data
+        return {"ETag": "tag%s" % PartNumber}
+
+    mock_aws_client.create_multipart_upload.return_value = {
+        "UploadId": "split-upload"
+    }
+    mock_aws_client.upload_part.side_effect = upload_part
+    mock_aws_client.complete_multipart_upload.return_value = {
+        "ETag": "split-etag"
+    }
+
+    yield parts
+
+
+def test_split_upload(mock_aws_client, uploaded_parts, auth_header):
+    """Large uploads are written to S3 in parts."""
+
+    with TestClient(app) as client:
+        r = put(client, CONTENT, auth_header)
+
+    # It should succeed
+    assert r.status_code == 200
+    assert r.headers["etag"] == "split-etag"
+
+    # It should have created an upload with the usual metadata
+    mock_aws_client.create_multipart_upload.assert_called_once_with(
+        Bucket="my-bucket",
+        Key=KEY,
+        Metadata={"gw-uploader": "user fake-user"},
+    )
+
+    # It should have split the content into parts of the configured size
+    assert uploaded_parts == {
+        1: CONTENT[0:16],
+        2: CONTENT[16:32],
+        3: CONTENT[32:],
+    }
+
+    # And completed the upload with all parts
+    mock_aws_client.complete_multipart_upload.assert_called_once_with(
+        Bucket="my-bucket",
+        Key=KEY,
+        UploadId="split-upload",
+        MultipartUpload={
+            "Parts": [
+                {"ETag": "tag1", "PartNumber": 1},
+                {"ETag": "tag2", "PartNumber": 2},
+                {"ETag": "tag3", "PartNumber": 3},
+            ]
+        },
+    )
+
+    # The object should now be known to exist
+    assert KEY in known_objects("my-bucket", load_settings())
+
+
+def test_split_upload_retries(mock_aws_client, uploaded_parts, auth_header):
+    """Parts failing with transient errors are retried."""
+
+    upload_part = mock_aws_client.upload_part.side_effect
+    errors = [s3_error(503)]
+
+    async def flaky_upload_part(**kwargs):
+        if kwargs["PartNumber"] == 2 and errors:
+            # Consume some of the body before failing, as a real
+            # request might.
+            kwargs["Body"].read(3)
+            raise errors.pop()
+        return await upload_part(**kwargs)
+
+    mock_aws_client.upload_part.side_effect = flaky_upload_part
+
+    with TestClient(app) as client:
+        r = put(client, CONTENT, auth_header)
+
+    # It should succeed, with the complete content of each part
+    assert r.status_code == 200
+    assert b"".join(uploaded_parts[i] for i in (1, 2, 3)) == CONTENT
+    assert mock_aws_client.upload_part.call_count == 4
+
+
+def test_split_upload_fails(mock_aws_client, uploaded_parts, auth_header):
+    """Parts failing with client errors are not retried, and the upload
+    is aborted.
+    """
+
+    mock_aws_client.upload_part.side_effect = s3_error(403)
+
+    with TestClient(app) as client:
+        r = put(client, CONTENT, auth_header)
+
+    # It should fail with the error from S3
+    assert r.status_code == 403
+
+    # It should not have retried
+    assert mock_aws_client.upload_part.call_count <= 2
+
+    # It should have aborted the upload
+    mock_aws_client.complete_multipart_upload.assert_not_called()
+    mock_aws_client.abort_multipart_upload.assert_called_once_with(
+        Bucket="my-bucket", Key=KEY, UploadId="split-upload"
+    )
+
+
+def test_split_upload_mismatch(mock_aws_client, uploaded_parts, auth_header):
+    """Large uploads whose content doesn't match the key are aborted."""
+
+    with TestClient(app) as client:
+        r = put(client, CONTENT.upper(), auth_header)
+
+    # It should fail with the correct error
+    assert r.status_code == 400
+    assert "Content does not match object key" in r.text
+
+    # It should have aborted the upload
+    mock_aws_client.complete_multipart_upload.assert_not_called()
+    mock_aws_client.abort_multipart_upload.assert_called_once_with(
+        Bucket="my-bucket", Key=KEY, UploadId="split-upload"
+    )
+
+
+def test_split_upload_bad_md5(mock_aws_client, uploaded_parts, auth_header):
+    """Large uploads whose content doesn't match Content-MD5 are aborted."""
+
+    with TestClient(app) as client:
+        r = client.put(
+            "/upload/test/%s" % KEY,
+            content=CONTENT,
+            headers={
+                **auth_header(roles=["test-blob-uploader"]),
+                "Content-MD5": base64.b64encode(b"x" * 16).decode(),
+            },
+        )
+
+    assert r.status_code == 400
+    assert "Content does not match Content-MD5" in r.text
+    mock_aws_client.complete_multipart_upload.assert_not_called()
+    mock_aws_client.abort_multipart_upload.assert_called_once()
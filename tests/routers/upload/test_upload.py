@@ -1,9 +1,14 @@
+import base64
+import hashlib
+
 import mock
 import pytest
 from botocore.exceptions import ClientError
 from fastapi.testclient import TestClient
 
+from exodus_gw.aws.util import known_objects
 from exodus_gw.main import app
+from exodus_gw.settings import load_settings
 
 TEST_KEY = "b5bb9d8014a0f9b1d61e21e796d78dccdf1352f23cd32812f4850b878ae4944c"
 
@@ -54,6 +59,9 @@ async def test_full_upload(
     # It should have an empty body
     assert r.content == b""
 
+    # The object should now be known to exist
+    assert TEST_KEY in known_objects("my-bucket", load_settings())
+
 
 async def test_part_upload(mock_aws_client, mock_request_reader, auth_header):
     """Uploading part of an object is delegated correctly to S3."""
@@ -155,3 +163,77 @@ async def test_put_error(mock_aws_client, mock_request_reader, auth_header):
         "<RequestId>aabbccdd</RequestId>"
         "</Error>"
     )
+
+
+async def consume_body(Body, **_):
+    # Simulates S3 reading the entire request body.
+    async for _chunk in Body:
+        pass
+    return {"ETag": "a1b2c3"}
+
+
+def md5_header(content: bytes) -> str:
+    return base64.b64encode(hashlib.md5(content).digest()).decode()
+
+
+async def test_full_upload_verified(mock_aws_client, auth_header):
+    """Uploading an object whose content matches the key succeeds."""
+
+    mock_aws_client.put_object.side_effect = consume_body
+
+    headers = {
+        **auth_header(roles=["test-blob-uploader"]),
+        "Content-MD5": md5_header(b"foo\n"),
+    }
+
+    with TestClient(app) as client:
+        r = client.put(
+            "/upload/test/%s" % TEST_KEY, content=b"foo\n", headers=headers
+        )
+
+    assert r.status_code == 200
+    assert r.headers["etag"] == "a1b2c3"
+
+
+async def test_full_upload_mismatch(mock_aws_client, auth_header):
+    """Uploading an object whose content doesn't match the key fails."""
+
+    mock_aws_client.put_object.side_effect = consume_body
+
+    headers = {
+        **auth_header(roles=["test-blob-uploader"]),
+        "Content-MD5": md5_header(b"bar\n"),
+    }
+
+    with TestClient(app) as client:
+        r = client.put(
+            "/upload/test/%s" % TEST_KEY, content=b"bar\n", headers=headers
+        )
+
+    # It should fail with the correct error
+    assert r.status_code == 400
+    assert "Content does not match object key" in r.text
+
+    # The object should not be considered to exist
+    assert TEST_KEY not in known_objects("my-bucket", load_settings())
+
+
+async def test_full_upload_unverified(
+    mock_aws_client, auth_header, monkeypatch
+):
+    """Content is not checked if verification is disabled."""
+
+    monkeypatch.setenv("EXODUS_GW_UPLOAD_VERIFY_SHA256", "false")
+    mock_aws_client.put_object.side_effect = consume_body
+
+    headers = {
+        **auth_header(roles=["test-blob-uploader"]),
+        "Content-MD5": md5_header(b"bar\n"),
+    }
+
+    with TestClient(app) as client:
+        r = client.put(
+            "/upload/test/%s" % TEST_KEY, content=b"bar\n", headers=headers
+        )
+
+    assert r.status_code == 200
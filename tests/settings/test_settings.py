@@ -1,7 +1,14 @@
+import re
+
 import pytest
 from fastapi import HTTPException
 
-from exodus_gw.settings import get_environment, load_settings
+from exodus_gw.settings import (
+    CacheFlushMatcher,
+    CacheFlushRule,
+    get_environment,
+    load_settings,
+)
 
 
 def test_load_settings_default():
@@ -84,3 +91,54 @@ def test_get_environment(env, expected):
 
         assert exc_info.value.status_code == 404
         assert exc_info.value.detail == "Invalid environment='bad'"
+
+
+def test_cache_flush_rule_matches():
+    """CacheFlushRule matches paths using all includes and excludes."""
+
+    rule = CacheFlushRule(
+        name="test",
+        templates=["https://cdn.example.com/"],
+        includes=[re.compile("/foo/"), re.compile("(?i)/BAR/")],
+        excludes=[re.compile("/x$"), re.compile("/y$")],
+    )
+
+    assert rule.matches("foo/a")
+    assert rule.matches("/some/bar/a")
+    assert not rule.matches("/baz/a")
+    assert not rule.matches("/foo/x")
+    assert not rule.matches("/bar/y")
+
+
+def test_cache_flush_matcher():
+    """CacheFlushMatcher combines templates from all matching rules and
+    remembers results per path.
+    """
+
+    rules = [
+        CacheFlushRule(
+            name="rule1",
+            templates=["template1"],
+            includes=[re.compile(".*")],
+            excludes=[re.compile("/excluded")],
+        ),
+        CacheFlushRule(
+            name="rule2",
+            templates=["template2", "template3"],
+            includes=[re.compile("/repodata/")],
+            excludes=[],
+        ),
+    ]
+    matcher = CacheFlushMatcher(rules)
+
+    assert matcher.templates_for("/foo/repodata/repomd.xml") == (
+        "template1",
+        "template2",
+        "template3",
+    )
+    assert matcher.templates_for("/foo/PULP_MANIFEST") == ("template1",)
+    assert matcher.templates_for("/excluded/PULP_MANIFEST") == ()
+
+    # Asking again for the same path doesn't evaluate rules again.
+    matcher.templates_for("/foo/PULP_MANIFEST")
+    assert matcher.templates_for.cache_info().hits == 1
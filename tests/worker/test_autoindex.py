@@ -192,7 +192,11 @@ def mixed_publish(db: Session, mock_aws_client):
     # head_object will be called per each object we're about to upload.
     # There are 5 in total. We'll make it so there's a mix of successful
     # calls and 404 errors (missing objects).
+    #
+    # Repos are processed in order of base URI, so the first response here
+    # is for file-repo and the remainder are for yum-repo.
     mock_aws_client.head_object.side_effect = [
+        {},
         {},
         ClientError(
             {"Error": {"Code": "404"}},
@@ -203,7 +207,6 @@ def mixed_publish(db: Session, mock_aws_client):
             {"Error": {"Code": "404"}},
             "HeadObject",
         ),
-        {},
     ]
 
     db.commit()
@@ -350,6 +353,205 @@ async def test_enricher_mixed(
     )
 
 
+def test_uris_for_autoindex(db: Session, mixed_publish: Publish):
+    """uris_for_autoindex should find exactly those repos needing an index."""
+
+    db.add_all(
+        [
+            # Not an entry point since it's outside of repodata
+            Item(
+                publish_id=mixed_publish.id,
+                web_uri="/some/not-a-repo/repomd.xml",
+                object_key="key2",
+            ),
+            # Not an entry point due to basename
+            Item(
+                publish_id=mixed_publish.id,
+                web_uri="/some/not-a-repo/OTHER_PULP_MANIFEST",
+                object_key="key1",
+            ),
+            # Repo with multiple entry points is only returned once
+            Item(
+                publish_id=mixed_publish.id,
+                web_uri="/some/yum-repo/PULP_MANIFEST",
+                object_key="key1",
+            ),
+        ]
+    )
+    db.commit()
+
+    settings = load_settings()
+    enricher = AutoindexEnricher(mixed_publish, "test", settings)
+
+    assert enricher.uris_for_autoindex == [
+        "/some/file-repo",
+        "/some/invalid-yum-repo",
+        "/some/yum-repo",
+    ]
+
+    # If specific entry points are requested, those are returned even if
+    # an index already exists, since the index could be outdated.
+    enricher = AutoindexEnricher(
+        mixed_publish,
+        "test",
+        settings,
+        web_uri_filter=[
+            "/some/other-file-repo/PULP_MANIFEST",
+            "/some/not-a-repo/repomd.xml",
+        ],
+    )
+
+    assert enricher.uris_for_autoindex == ["/some/other-file-repo"]
+
+
+async def test_enricher_reuses_memo(
+    db: Session,
+    caplog: LogCaptureFixture,
+    mixed_publish: Publish,
+    mock_aws_client,
+):
+    """AutoindexEnricher should reuse earlier results for unchanged repos
+    rather than generating indexes again.
+    """
+
+    caplog.set_level("INFO", "exodus-gw")
+
+    settings = load_settings()
+    await AutoindexEnricher(mixed_publish, "test", settings).run()
+
+    db.refresh(mixed_publish)
+    generated = {
+        item.web_uri: item.object_key
+        for item in mixed_publish.items
+        if item.web_uri.endswith("/.__exodus_autoindex")
+        and item.object_key != "existing-index-key"
+    }
+
+    # Make a new publish with the same content, but without any
+    # of the indexes generated above.
+    publish = Publish(env="test", state="PENDING")
+    db.add(publish)
+    db.commit()
+    db.add_all(
+        [
+            Item(
+                publish_id=publish.id,
+                web_uri=item.web_uri,
+                object_key=item.object_key,
+            )
+            for item in mixed_publish.items
+            if item.web_uri not in generated
+        ]
+    )
+    db.commit()
+
+    mock_aws_client.reset_mock()
+    caplog.clear()
+
+    await AutoindexEnricher(publish, "test", settings).run()
+
+    # It should have added the same indexes as before...
+    db.refresh(publish)
+    assert {
+        item.web_uri: item.object_key
+        for item in publish.items
+        if item.web_uri in generated
+    } == generated
+
+    # ...without checking or uploading anything.
+    mock_aws_client.head_object.assert_not_called()
+    mock_aws_client.put_object.assert_not_called()
+
+    assert (
+        "autoindex of /some/yum-repo: reused 4 item(s) from earlier run"
+        in caplog.text
+    )
+    assert (
+        "autoindex of /some/file-repo: reused 1 item(s) from earlier run"
+        in caplog.text
+    )
+
+    # The only content fetched is for the invalid repo, which had nothing
+    # remembered and so is tried again.
+    assert set(
+        call.kwargs["Key"] for call in mock_aws_client.get_object.mock_calls
+    ) == set(["key2", "key4"])
+    assert (
+        "autoindex for /some/invalid-yum-repo skipped due to invalid content"
+        in caplog.text
+    )
+
+
+async def test_enricher_memo_changed_entry_point(
+    db: Session,
+    mixed_publish: Publish,
+    mock_aws_client,
+):
+    """AutoindexEnricher should not reuse earlier results for a repo
+    if its entry point has changed.
+    """
+
+    settings = load_settings()
+    enricher = AutoindexEnricher(mixed_publish, "test", settings)
+    await enricher.run()
+
+    key = enricher.entry_point_key("/some/file-repo")
+    assert enricher.memoized_items("/some/file-repo", key)
+
+    # Update the entry point on the publish.
+    item = (
+        db.query(Item)
+        .filter(
+            Item.publish_id == mixed_publish.id,
+            Item.web_uri == "/some/file-repo/PULP_MANIFEST",
+        )
+        .one()
+    )
+    item.object_key = "key2"
+    db.commit()
+
+    # The key should have changed and so the memo no longer applies.
+    new_key = enricher.entry_point_key("/some/file-repo")
+    assert new_key != key
+    assert enricher.memoized_items("/some/file-repo", new_key) is None
+
+
+async def test_enricher_known_objects(
+    db: Session,
+    mixed_publish: Publish,
+    mock_aws_client,
+):
+    """AutoindexEnricher should not check for existence of objects which
+    are already known to exist.
+    """
+
+    settings = load_settings()
+    enricher = AutoindexEnricher(mixed_publish, "test", settings)
+    await enricher.run()
+
+    db.refresh(mixed_publish)
+    generated = {
+        item.object_key
+        for item in mixed_publish.items
+        if item.web_uri.endswith("/.__exodus_autoindex")
+        and item.object_key != "existing-index-key"
+    }
+
+    # Everything generated was either found by HEAD or uploaded,
+    # and so should now be known to exist.
+    assert generated
+    for key in generated:
+        assert key in enricher.known_objects
+
+    mock_aws_client.reset_mock()
+
+    for key in generated:
+        assert await enricher.object_exists(mock_aws_client, key)
+
+    # It didn't need to ask S3 about any of them.
+    mock_aws_client.head_object.assert_not_called()
+
+
 async def test_enricher_head_errors(
     db: Session, caplog: LogCaptureFixture, mock_aws_client
 ):
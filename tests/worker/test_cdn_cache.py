@@ -1,16 +1,22 @@
 import json
 import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import fastpurge
 import pytest
 from dramatiq.middleware import CurrentMessage
-from more_executors import f_return
+from freezegun import freeze_time
+from more_executors import f_return, f_return_error
 from sqlalchemy.orm import Session
 
+from exodus_gw.models import CdnFlushRequest, DramatiqMessage
 from exodus_gw.models.service import Task
-from exodus_gw.settings import load_settings
-from exodus_gw.worker import flush_cdn_cache
+from exodus_gw.settings import Settings, load_settings
+from exodus_gw.worker import flush_cdn_cache, flush_cdn_requests
+from exodus_gw.worker.cache import Flusher
 
 
 class FakeFastPurgeClient:
@@ -35,6 +41,38 @@ def fake_fastpurge_client(monkeypatch: pytest.MonkeyPatch):
     FakeFastPurgeClient.INSTANCE = None
 
 
+@pytest.fixture
+def fastpurge_settings(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> Settings:
+    # Settings with a "cachetest" env having fastpurge enabled and a
+    # single template applying to all paths.
+    conf_path = tmp_path / "exodus-gw.ini"
+    conf_path.write_text(
+        """
+[env.cachetest]
+aws_profile = cachetest
+bucket = my-bucket
+table = my-table
+config_table = my-config
+
+cdn_url = http://localhost:8049/_/cookie
+cdn_key_id = XXXXXXXXXXXXXX
+
+cache_flush_urls =
+    https://cdn1.example.com
+"""
+    )
+
+    monkeypatch.setenv("EXODUS_GW_INI_PATH", str(conf_path))
+    monkeypatch.setenv("EXODUS_GW_FASTPURGE_HOST_CACHETEST", "fphost")
+    monkeypatch.setenv("EXODUS_GW_FASTPURGE_CLIENT_TOKEN_CACHETEST", "ctok")
+    monkeypatch.setenv("EXODUS_GW_FASTPURGE_CLIENT_SECRET_CACHETEST", "csec")
+    monkeypatch.setenv("EXODUS_GW_FASTPURGE_ACCESS_TOKEN_CACHETEST", "atok")
+
+    return load_settings()
+
+
 @pytest.fixture
 def fake_message_id(monkeypatch: pytest.MonkeyPatch) -> str:
     class FakeMessage:
@@ -403,3 +441,234 @@ cache_flush_arl_templates =
             "https://cdn2.example.com/path/to/repo2/repodata/repomd.xml",
         ]
     )
+
+
+def test_flush_chunked_concurrent(
+    fastpurge_settings: Settings,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+):
+    """Flusher submits URLs in chunks, with bounded concurrency."""
+
+    caplog.set_level("INFO", "exodus-gw")
+
+    class SlowFastPurgeClient:
+        # A fake which takes some time to respond to each request,
+        # and records the number of requests in progress at once.
+        INSTANCE = None
+
+        def __init__(self, **_kwargs):
+            self.executor = ThreadPoolExecutor()
+            self.lock = threading.Lock()
+            self.chunks: list[list[str]] = []
+            self.in_progress = 0
+            self.max_in_progress = 0
+            SlowFastPurgeClient.INSTANCE = self
+
+        def purge(self, urls):
+            with self.lock:
+                self.in_progress += 1
+                self.max_in_progress = max(
+                    self.max_in_progress, self.in_progress
+                )
+            time.sleep(0.02)
+            with self.lock:
+                self.in_progress -= 1
+                self.chunks.append(urls)
+            return [{"purged": len(urls)}]
+
+        def purge_by_url(self, urls):
+            return self.executor.submit(self.purge, urls)
+
+    monkeypatch.setattr(fastpurge, "FastPurgeClient", SlowFastPurgeClient)
+
+    fastpurge_settings.cache_flush_chunk_size = 2
+    fastpurge_settings.cache_flush_concurrency = 2
+    fastpurge_settings.cache_flush_rate_limit = 0
+
+    paths = ["/path/%s" % i for i in range(7)]
+    Flusher(
+        paths=paths, settings=fastpurge_settings, env="cachetest", aliases=[]
+    ).run()
+
+    fp_client = SlowFastPurgeClient.INSTANCE
+    assert fp_client
+
+    # It should have split the URLs into chunks...
+    assert sorted(len(chunk) for chunk in fp_client.chunks) == [1, 2, 2, 2]
+    assert sorted(url for chunk in fp_client.chunks for url in chunk) == [
+        "https://cdn1.example.com/path/%s" % i for i in range(7)
+    ]
+
+    # ...which were flushed concurrently, but within the limit.
+    assert fp_client.max_in_progress == 2
+
+    # It should log a summary rather than each URL
+    assert "fastpurge: flushing 7 URL(s) in 4 request(s)" in caplog.text
+    assert "fastpurge: flushed 7 URL(s) using 4 request(s)" in caplog.text
+    assert "https://cdn1.example.com/path/1" not in caplog.text
+
+
+def test_flush_rate_limited(
+    fastpurge_settings: Settings,
+):
+    """Flusher does not start requests faster than the rate limit."""
+
+    fastpurge_settings.cache_flush_chunk_size = 1
+    fastpurge_settings.cache_flush_rate_limit = 20
+
+    before = time.monotonic()
+    Flusher(
+        paths=["/path/1", "/path/2", "/path/3"],
+        settings=fastpurge_settings,
+        env="cachetest",
+        aliases=[],
+    ).run()
+    duration = time.monotonic() - before
+
+    # 3 requests at 20 per second means two waits of 0.05 seconds.
+    assert duration >= 0.1
+    assert len(FakeFastPurgeClient.INSTANCE._purged_urls) == 3  # type: ignore
+
+
+def test_flush_retries(
+    fastpurge_settings: Settings,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+):
+    """Flusher retries failed requests, up to a limit."""
+
+    attempts: list[list[str]] = []
+
+    def purge_by_url(_self, urls):
+        attempts.append(urls)
+        # Only the first attempt of each chunk fails.
+        if attempts.count(urls) == 1:
+            return f_return_error(RuntimeError("simulated error"))
+        return f_return([{"purged": len(urls)}])
+
+    monkeypatch.setattr(FakeFastPurgeClient, "purge_by_url", purge_by_url)
+
+    fastpurge_settings.cache_flush_chunk_size = 1
+    fastpurge_settings.cache_flush_rate_limit = 0
+
+    # With a retry, it should succeed.
+    fastpurge_settings.cache_flush_retries = 1
+    Flusher(
+        paths=["/path/1", "/path/2"],
+        settings=fastpurge_settings,
+        env="cachetest",
+        aliases=[],
+    ).run()
+
+    assert sorted(attempts) == [
+        ["https://cdn1.example.com/path/1"],
+        ["https://cdn1.example.com/path/1"],
+        ["https://cdn1.example.com/path/2"],
+        ["https://cdn1.example.com/path/2"],
+    ]
+    assert (
+        "fastpurge: request for 1 URL(s) failed, will retry: simulated error"
+        in caplog.text
+    )
+
+    # Without retries, it should fail.
+    attempts.clear()
+    fastpurge_settings.cache_flush_retries = 0
+    with pytest.raises(RuntimeError, match="simulated error"):
+        Flusher(
+            paths=["/path/1"],
+            settings=fastpurge_settings,
+            env="cachetest",
+            aliases=[],
+        ).run()
+
+    assert (
+        "fastpurge: request for 1 URL(s) failed after 1 attempt(s)"
+        in caplog.text
+    )
+
+
+def test_flush_cdn_cache_coalesced(
+    db: Session,
+    mock_boto3_client,
+    fastpurge_settings: Settings,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """flush_cdn_cache with a coalesce window defers flush so that
+    multiple tasks can be handled together.
+    """
+
+    fastpurge_settings.cdn_flush_coalesce_window = 60
+
+    task_ids = [
+        "3ce55238-f7d7-46d1-a302-c79674108dc9",
+        "d4c1e9a2-6f1b-4b8e-9a57-1f2d3c4b5a69",
+    ]
+    for task_id in task_ids:
+        db.add(Task(id=task_id, state="NOT_STARTED"))
+    db.commit()
+
+    # Two tasks request flush of overlapping paths within the same window.
+    with freeze_time("2024-01-01 12:00:10"):
+        for task_id, paths in zip(
+            task_ids, [["/foo", "/bar"], ["/bar", "/baz"]]
+        ):
+            monkeypatch.setattr(
+                CurrentMessage,
+                "get_current_message",
+                lambda task_id=task_id: type(
+                    "FakeMessage", (), {"message_id": task_id}
+                ),
+            )
+            flush_cdn_cache(
+                paths=paths, env="cachetest", settings=fastpurge_settings
+            )
+
+    # Nothing has been flushed yet, and the tasks are waiting on the flush.
+    assert FakeFastPurgeClient.INSTANCE is None
+    for task in db.query(Task):
+        db.refresh(task)
+        assert task.state == "IN_PROGRESS"
+
+    # Both requests were recorded...
+    assert db.query(CdnFlushRequest).count() == 2
+
+    # ...and a single message was enqueued to process them, delayed
+    # until the end of the window.
+    messages = (
+        db.query(DramatiqMessage)
+        .filter(DramatiqMessage.actor == "flush_cdn_requests")
+        .all()
+    )
+    assert len(messages) == 1
+    assert messages[0].body["kwargs"]["env"] == "cachetest"
+    assert messages[0].body["options"]["eta"] == 1704110460000
+
+    # Now process the requests.
+    flush_cdn_requests(env="cachetest", settings=fastpurge_settings)
+
+    # Each path was flushed only once.
+    fp_client = FakeFastPurgeClient.INSTANCE
+    assert fp_client
+    assert sorted(fp_client._purged_urls) == [
+        "https://cdn1.example.com/bar",
+        "https://cdn1.example.com/baz",
+        "https://cdn1.example.com/foo",
+    ]
+
+    # Both tasks are now complete and the requests are gone.
+    for task in db.query(Task):
+        db.refresh(task)
+        assert task.state == "COMPLETE"
+    assert db.query(CdnFlushRequest).count() == 0
+
+
+def test_flush_cdn_requests_none_pending(
+    db: Session, fastpurge_settings: Settings
+):
+    """flush_cdn_requests does nothing if there are no requests."""
+
+    flush_cdn_requests(env="cachetest", settings=fastpurge_settings)
+
+    assert FakeFastPurgeClient.INSTANCE is None
@@ -5,7 +5,13 @@ from datetime import datetime, timedelta
 import pytest
 from sqlalchemy.orm.exc import ObjectDeletedError
 
-from exodus_gw.models import CommitTask, Item, Publish, PublishedPath
+from exodus_gw.models import (
+    AutoindexMemo,
+    CommitTask,
+    Item,
+    Publish,
+    PublishedPath,
+)
 from exodus_gw.schemas import PublishStates, TaskStates
 from exodus_gw.worker import cleanup
 
@@ -249,3 +255,50 @@ def test_cleanup_mixed(caplog, db):
             "Scheduled cleanup has completed",
         ]
     )
+
+
+def test_cleanup_autoindex_memos(caplog, db):
+    """Cleanup removes autoindex memos which have not been used recently."""
+
+    logging.getLogger("exodus-gw").setLevel(logging.INFO)
+
+    now = datetime.utcnow()
+    two_days_ago = now - timedelta(days=2)
+    sixty_days_ago = now - timedelta(days=60)
+
+    memo_recent = AutoindexMemo(
+        env="test",
+        base_uri="/some/recent/repo",
+        entry_point_key="abc123",
+        items=[],
+        updated=two_days_ago,
+    )
+    memo_old = AutoindexMemo(
+        env="test",
+        base_uri="/some/old/repo",
+        entry_point_key="abc123",
+        items=[],
+        updated=sixty_days_ago,
+    )
+    db.add_all([memo_recent, memo_old])
+    db.commit()
+
+    cleanup()
+
+    db.expire_all()
+
+    # Old memo should be gone, recent memo should remain.
+    with pytest.raises(ObjectDeletedError):
+        memo_old.id
+    assert memo_recent.base_uri == "/some/recent/repo"
+
+    messages = [
+        record.message
+        for record in caplog.records
+        if record.name == "exodus-gw"
+    ]
+    assert messages == [
+        "AutoindexMemo ('test', '/some/old/repo'): cleaning old data "
+        "(last updated: %s)" % sixty_days_ago,
+        "Scheduled cleanup has completed",
+    ]
@@ -95,7 +95,7 @@ def test_deploy_config(
 
     # And actor call should have been delayed by this long.
     delay = body["options"]["eta"] - body["message_timestamp"]
-    assert abs(delay - 120000) < 1000
+    assert abs(delay - 150000) < 1000
 
 
 @mock.patch("exodus_gw.worker.deploy.CurrentMessage.get_current_message")
@@ -148,6 +148,16 @@ def test_deploy_config_with_flush(
             "src": "/content/testproduct/1",
         },
     ]
+    # We're also updating one listing, adding another and leaving
+    # the rest unchanged.
+    updated_config["listing"]["/content/dist/rhel/server"]["values"] = [
+        "8",
+        "9",
+    ]
+    updated_config["listing"]["/content/dist/rhel/server/9"] = {
+        "values": ["x86_64"],
+        "var": "basearch",
+    }
     worker.deploy_config(updated_config, "test", NOW_UTC)
 
     # It should've created an appropriate put request.
@@ -197,7 +207,8 @@ def test_deploy_config_with_flush(
     assert body["kwargs"]["env"] == "test"
     assert body["kwargs"]["flush_paths"] == [
         # It figured out that cache will need to be flushed for these.
-        "/content/dist/rhel/server/8/listing",
+        # Note that the unchanged listing is not included.
+        "/content/dist/rhel/server/9/listing",
         "/content/dist/rhel/server/listing",
         "/content/testproduct/1/file1",
         "/content/testproduct/1/file2",
@@ -205,7 +216,7 @@ def test_deploy_config_with_flush(
 
     # And actor call should have been delayed by this long.
     delay = body["options"]["eta"] - body["message_timestamp"]
-    assert abs(delay - 120000) < 1000
+    assert abs(delay - 150000) < 1000
 
 
 @mock.patch("exodus_gw.worker.deploy.CurrentMessage.get_current_message")
@@ -317,6 +328,39 @@ def test_complete_deploy_config_task_with_flush(db, caplog):
     )
 
 
+def test_complete_deploy_config_task_coalesced_flush(db):
+    # Construct task that would be generated by caller.
+    t = _task()
+    t.state = "IN_PROGRESS"
+
+    db.add(t)
+    db.commit()
+
+    gw_settings = settings.load_settings()
+    gw_settings.cdn_flush_coalesce_window = 30
+
+    with mock.patch("exodus_gw.worker.deploy.Flusher") as mock_flusher:
+        worker.deploy.complete_deploy_config_task(
+            t.id,
+            env="test",
+            flush_paths=["/some/path1", "/some/path2"],
+            settings=gw_settings,
+        )
+
+    # It should not have flushed anything itself.
+    mock_flusher.assert_not_called()
+
+    # It should've requested a flush on behalf of the task...
+    request = db.query(models.CdnFlushRequest).one()
+    assert request.env == "test"
+    assert request.paths == ["/some/path1", "/some/path2"]
+    assert request.task_id == t.id
+
+    # ...leaving the task to be completed once that's done.
+    db.refresh(t)
+    assert t.state == "IN_PROGRESS"
+
+
 def test_complete_deploy_config_task_bad_state(db, caplog):
     caplog.set_level(logging.INFO, logger="exodus-gw")
 
@@ -334,3 +378,33 @@ def test_complete_deploy_config_task_bad_state(db, caplog):
     # It shouldn't alter the task's state.
     db.refresh(t)
     assert t.state == "NOT_STARTED"
+
+
+def test_published_paths_under(db):
+    """_published_paths_under finds paths beneath any given prefix, treating
+    prefixes literally rather than as patterns.
+    """
+    now = datetime.now(tz=timezone.utc)
+    for env, web_uri in [
+        ("test", "/content/a_1/file1"),
+        ("test", "/content/a_1/sub/file2"),
+        ("test", "/content/aX1/file3"),
+        ("test", "/content/a_10/file4"),
+        ("test", "/content/b%/file5"),
+        ("test", "/content/bb/file6"),
+        ("test2", "/content/a_1/file7"),
+    ]:
+        db.add(PublishedPath(env=env, web_uri=web_uri, updated=now))
+    db.commit()
+
+    paths = worker.deploy._published_paths_under(
+        db, "test", ["/content/a_1", "/content/b%"]
+    )
+
+    assert sorted(paths) == [
+        "/content/a_1/file1",
+        "/content/a_1/sub/file2",
+        "/content/b%/file5",
+    ]
+
+    assert not list(worker.deploy._published_paths_under(db, "test", []))
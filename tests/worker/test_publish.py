@@ -116,6 +116,69 @@ def test_commit(
     )
 
 
+@mock.patch("exodus_gw.worker.publish.AutoindexEnricher.run")
+@mock.patch("exodus_gw.worker.publish.CurrentMessage.get_current_message")
+@mock.patch("exodus_gw.worker.publish.DynamoDB.write_batch")
+@mock.patch("exodus_gw.worker.publish.Flusher")
+def test_commit_coalesced_flush(
+    mock_flusher,
+    mock_write_batch,
+    mock_get_message,
+    mock_autoindex_run,
+    fake_publish,
+    db: sqlalchemy.orm.Session,
+):
+    """Commit with a flush coalesce window requests a flush and leaves
+    the task to be completed once the flush is done.
+    """
+    settings = load_settings()
+    settings.cdn_flush_coalesce_window = 30
+
+    task = _task(fake_publish.id)
+    mock_get_message.return_value = mock.MagicMock(
+        message_id=task.id, kwargs={"publish_id": fake_publish.id}
+    )
+    mock_write_batch.return_value = True
+
+    db.add(fake_publish)
+    db.add(task)
+    fake_publish.state = "COMMITTING"
+    db.commit()
+
+    worker.commit(
+        str(fake_publish.id),
+        fake_publish.env,
+        str(NOW_UTC),
+        settings=settings,
+    )
+
+    # The publish is committed...
+    db.refresh(fake_publish)
+    assert fake_publish.state == "COMMITTED"
+
+    # ...but the task is waiting for the flush.
+    db.refresh(task)
+    assert task.state == "IN_PROGRESS"
+
+    # It didn't flush anything itself.
+    mock_flusher.assert_not_called()
+
+    # It requested flush of the paths after alias resolution.
+    request = db.query(models.CdnFlushRequest).one()
+    assert request.env == "test"
+    assert request.task_id == task.id
+    assert request.paths == [
+        "/content/testproduct/1.1.0/repo/",
+        "/content/testproduct/1.1.0/repo/repomd.xml",
+        "/content/testproduct/1/repo/",
+        "/content/testproduct/1/repo/repomd.xml",
+        "/content/testproduct/rhui/1.1.0/repo/",
+        "/content/testproduct/rhui/1.1.0/repo/repomd.xml",
+        "/content/testproduct/rhui/1/repo/",
+        "/content/testproduct/rhui/1/repo/repomd.xml",
+    ]
+
+
 @mock.patch("exodus_gw.worker.publish.CurrentMessage.get_current_message")
 def test_commit_expired_task(mock_get_message, fake_publish, db, caplog):
     # Construct task that would be generated by caller.